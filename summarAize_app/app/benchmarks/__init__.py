@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for the summarization pipeline.
+
+Run them from the app directory, e.g. ``python -m benchmarks.bench_chunker``.
+"""
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: single-pass TokenChunker vs the previous split_into_chunks
+
+The legacy path is what summarize_pdf used to do: encode the whole text for
+the token count, encode it again in split_into_chunks and then encode every
+sentence separately. The new path encodes once and chunks by token offsets.
+
+    python -m benchmarks.bench_chunker --pages 300
+"""
+import argparse
+import json
+import re
+
+import tiktoken
+
+from benchmarks.common import load_corpus_text, time_call
+from services.chunker import TokenChunker
+
+CHARS_PER_PAGE = 3000
+
+
+def legacy_pipeline(encoding, text, budget):
+    """The pre-TokenChunker summarize_pdf + split_into_chunks(method="sentence") path."""
+    tokens = encoding.encode(text)  # token count in summarize_pdf
+    tokens = encoding.encode(text)  # split_into_chunks
+    if len(tokens) <= budget:
+        return [text]
+
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks, current_chunk = [], ""
+    current_tokens = 0
+    for sentence in sentences:
+        sentence_tokens = encoding.encode(sentence)
+        if current_tokens + len(sentence_tokens) > budget:
+            chunks.append(current_chunk.strip())
+            current_chunk = sentence
+            current_tokens = len(sentence_tokens)
+        else:
+            current_chunk += " " + sentence if current_chunk else sentence
+            current_tokens += len(sentence_tokens)
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def single_pass_pipeline(encoding, text, budget, overlap, method):
+    tokens = encoding.encode(text)
+    return TokenChunker(encoding, budget, overlap).split(text, method=method, tokens=tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text chunking")
+    parser.add_argument("--pages", type=int, default=300, help="Approximate document size in pages (default: 300)")
+    parser.add_argument("--model", default="gpt-4o", help="Model whose tokenizer to use (default: gpt-4o)")
+    parser.add_argument("--max-tokens", type=int, default=8192, help="PdfSummarizer max_tokens (default: 8192)")
+    parser.add_argument("--overlap", type=int, default=200, help="Overlap in tokens (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoding = tiktoken.encoding_for_model(args.model)
+    text = load_corpus_text(args.pages * CHARS_PER_PAGE)
+    budget = args.max_tokens - 1500
+
+    results = {
+        "chars": len(text),
+        "tokens": len(encoding.encode(text)),
+        "legacy_sentence": time_call(lambda: legacy_pipeline(encoding, text, budget), args.repeat),
+        "single_pass_sentence": time_call(lambda: single_pass_pipeline(encoding, text, budget, args.overlap, "sentence"), args.repeat),
+        "single_pass_token": time_call(lambda: single_pass_pipeline(encoding, text, budget, args.overlap, "token"), args.repeat),
+    }
+    results["chunks"] = {
+        "legacy_sentence": len(legacy_pipeline(encoding, text, budget)),
+        "single_pass_sentence": len(single_pass_pipeline(encoding, text, budget, args.overlap, "sentence")),
+    }
+    results["speedup_sentence"] = results["legacy_sentence"]["median_s"] / results["single_pass_sentence"]["median_s"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark: PDF text extraction throughput (pages/second) per backend,
+serial vs sharded across the process pool
+
+    python -m benchmarks.bench_extraction [--pdf big.pdf ...] [--workers 8]
+"""
+import argparse
+import json
+import os
+
+from benchmarks.common import CORPUS, time_call
+from services.pdf_text import BACKENDS, count_pages, extract_page_texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction backends")
+    parser.add_argument("--pdf", action="append", help="PDF to extract (repeatable, default: bundled test PDFs)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for path in args.pdf or CORPUS:
+        pages = count_pages(path)
+        per_pdf = {"pages": pages}
+        for backend in BACKENDS:
+            serial_texts = extract_page_texts(path, backend=backend, workers=1)
+            parallel_texts = extract_page_texts(path, backend=backend, workers=args.workers)  # also warms the pool
+            serial = time_call(lambda: extract_page_texts(path, backend=backend, workers=1), args.repeat)
+            parallel = time_call(lambda: extract_page_texts(path, backend=backend, workers=args.workers), args.repeat)
+            per_pdf[backend] = {
+                "serial_pages_per_s": pages / serial["median_s"],
+                "parallel_pages_per_s": pages / parallel["median_s"],
+                "deterministic": serial_texts == parallel_texts,
+            }
+        results[os.path.basename(path)] = per_pdf
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
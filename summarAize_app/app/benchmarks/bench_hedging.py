@@ -0,0 +1,102 @@
+"""
+Benchmark: map-step latency with and without hedged chunk requests, against
+a fake OpenAI server where a fraction of responses are stragglers
+
+Each iteration summarizes --chunks chunks concurrently, like one document's
+map step; its latency is that of the slowest chunk. Reports p50/p95/p99 per
+budget, how many extra requests hedging sent and how often the hedge won.
+
+    python -m benchmarks.bench_hedging --chunks 16 --slow-rate 0.05 --slow-ms 3000 --budget 0 0.1
+
+With --max-concurrency below --chunks, calls queue for a slot; only their
+time after admission counts towards the hedge deadline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import _configure_environment
+from benchmarks.common import percentiles
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+
+
+def _hedge_counts():
+    from services.metrics import LLM_HEDGES
+
+    counts = {}
+    for metric in LLM_HEDGES.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total") and sample.labels["call"] == "chunk":
+                counts[sample.labels["event"]] = sample.value
+    return counts
+
+
+async def _run_budget(budget: float, args) -> dict:
+    from services.hedging import HedgePolicy
+    from textSummarize import AsyncPdfSummarizer
+
+    policy = HedgePolicy(budget=budget, percentile=args.percentile, min_samples=args.min_samples,
+                         min_delay=args.min_delay)
+    summarizer = AsyncPdfSummarizer(max_concurrency=args.max_concurrency or args.chunks * 2, hedge_policy=policy)
+    before = _hedge_counts()
+    samples = []
+    for iteration in range(args.warmup + args.iterations):
+        # Distinct chunk text per iteration; the chunk cache is disabled by the environment anyway
+        chunks = [f"Chunk {iteration}-{index}: " + "lorem ipsum dolor sit amet " * 50 for index in range(args.chunks)]
+        start = time.perf_counter()
+        await asyncio.gather(*(summarizer.summarize_chunk(chunk) for chunk in chunks))
+        if iteration >= args.warmup:
+            samples.append(time.perf_counter() - start)
+    after = _hedge_counts()
+    events = {event: after.get(event, 0) - before.get(event, 0) for event in after}
+    requests = args.chunks * (args.warmup + args.iterations)
+    return {
+        "latency": percentiles(samples),
+        "hedges_issued": events.get("issued", 0),
+        "hedge_rate": events.get("issued", 0) / requests,
+        "hedges_won": events.get("hedge_won", 0),
+        "refused_by_budget": events.get("over_budget", 0),
+        "deadline_s": policy.deadline("chunk"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hedged chunk requests")
+    parser.add_argument("--chunks", type=int, default=16, help="Concurrent chunk calls per iteration")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="Summarizer's in-flight request cap (default: twice --chunks, so nothing queues)")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed iterations that fill the latency window")
+    parser.add_argument("--budget", type=float, nargs="+", default=[0.0, 0.1], help="Hedge budgets to compare")
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--min-delay", type=float, default=0.05)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Fraction of responses delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed,
+                              slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    server = FakeOpenAIServer(config=config).start()
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="summaraize-bench-") as workdir:
+        try:
+            _configure_environment(server, workdir)
+            for budget in args.budget:
+                results[f"budget_{budget:g}"] = asyncio.run(_run_budget(budget, args))
+        finally:
+            os.chdir(cwd)
+            server.stop()
+    print(json.dumps({"chunks": args.chunks, "slow_rate": args.slow_rate, "slow_ms": args.slow_ms,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
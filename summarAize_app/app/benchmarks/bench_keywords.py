@@ -0,0 +1,48 @@
+"""
+Micro-benchmark: local keyword extraction (RAKE + section TF-IDF) at
+several document sizes, with the keywords it picks for the bundled PDFs
+
+    python -m benchmarks.bench_keywords --pages 10 100 300
+"""
+import argparse
+import json
+import os
+
+from benchmarks.common import CORPUS, time_call
+from services.keywords import extract_keywords_local
+from services.parsed_document import ParsedDocument
+from services.references import strip_references_section
+from services.text_normalizer import normalize_pdf_text
+
+CHARS_PER_PAGE = 3000
+
+
+def keyword_text(text: str) -> str:
+    """What main.run_summarize_pipeline hands the keyword extractor."""
+    return normalize_pdf_text(strip_references_section(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local keyword extraction")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300],
+                        help="Document sizes to time, in pages (default: 10 100 300)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts, keywords = [], {}
+    for path in CORPUS:
+        with ParsedDocument.from_pdf(path) as document:
+            texts.append(keyword_text(document.text))
+        keywords[os.path.basename(path)] = [item["keyword"] for item in extract_keywords_local(texts[-1])]
+
+    corpus = " ".join(texts)
+    timings = {}
+    for pages in args.pages:
+        text = " ".join([corpus] * (pages * CHARS_PER_PAGE // len(corpus) + 1))
+        timings[f"{pages}_pages"] = time_call(lambda: extract_keywords_local(text), args.repeat)
+
+    print(json.dumps({"timings": timings, "keywords": keywords}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
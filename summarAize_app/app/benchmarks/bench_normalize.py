@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: single-pass normalize_pdf_text vs the previous clean_pdf_text,
+reported as throughput in MB/s of input text
+
+The legacy function made five re.sub passes over the whole document. The
+word-level agreement check compares the two outputs with line breaks turned
+into spaces first, since the old function deleted newlines (gluing the last
+word of a line to the first word of the next) where the new one keeps a space.
+
+    python -m benchmarks.bench_normalize --pages 300
+"""
+import argparse
+import json
+import re
+
+from benchmarks.common import load_corpus_text, time_call
+from services.text_normalizer import normalize_pdf_text, normalize_pdf_text_with_offsets
+
+CHARS_PER_PAGE = 3000
+
+
+def legacy_clean_pdf_text(text: str) -> str:
+    """The pre-normalizer clean_pdf_text from main.py."""
+    text = re.sub(r'\n\d+\n', '\n', text)
+    text = re.sub(r'\n\d+\s', '\n', text)
+    text = re.sub(r'\s\d+\n', '\n', text)
+    text = re.sub(r'[\x00-\x1F\x7F]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text
+
+
+def word_agreement(legacy: str, current: str) -> float:
+    """Fraction of the current output's words that the legacy output also produced, in order-insensitive counts."""
+    counts = {}
+    for word in legacy.split():
+        counts[word] = counts.get(word, 0) + 1
+    matched = 0
+    words = current.split()
+    for word in words:
+        if counts.get(word):
+            counts[word] -= 1
+            matched += 1
+    return matched / len(words) if words else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text normalization")
+    parser.add_argument("--pages", type=int, default=300, help="Approximate document size in pages (default: 300)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = load_corpus_text(args.pages * CHARS_PER_PAGE)
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+
+    timings = {
+        "legacy": time_call(lambda: legacy_clean_pdf_text(text), args.repeat),
+        "single_pass": time_call(lambda: normalize_pdf_text(text), args.repeat),
+        "single_pass_with_offsets": time_call(lambda: normalize_pdf_text_with_offsets(text), args.repeat),
+    }
+    current, offsets = normalize_pdf_text_with_offsets(text)
+    results = {
+        "input_mb": megabytes,
+        "mb_per_s": {name: megabytes / timing["median_s"] for name, timing in timings.items()},
+        "timings": timings,
+        "speedup": timings["legacy"]["median_s"] / timings["single_pass"]["median_s"],
+        "offset_map_entries": len(offsets),
+        "same_output_with_and_without_offsets": current == normalize_pdf_text(text),
+        # Feed the legacy function newlines as spaces so both treat line breaks as word boundaries
+        "word_agreement_with_legacy": word_agreement(legacy_clean_pdf_text(re.sub(r'\n(?!\d)', ' \n', text)), current),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmark: end-to-end pipeline stages against a local fake OpenAI server,
+reported as JSON (p50/p95/p99 latency, throughput, peak RSS per stage)
+
+    python -m benchmarks.bench_pipeline [--iterations 5] [--latency-ms 200] [--error-rate 0.02]
+                                        [--output run.json] [--compare baseline.json]
+
+No network access or API key is needed: the OpenAI clients are pointed at
+benchmarks.fake_openai and gTTS at the same server. Result caches are
+disabled so every iteration measures the cold path. Runs inside a scratch
+working directory, so uploads/images/videos never land in the repo.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import APP_DIR, CORPUS, RssSampler, peak_rss_bytes, percentiles
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+
+STAGES = (
+    "summarize_pdf",
+    "refine_summary",
+    "answer_question",
+    "api_summarize",
+    "api_summarize_fast",
+    "api_generate_audio",
+    "api_generate_visuals_video",
+    "image_generation",
+)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=APP_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    """Swallow the pipeline's progress output so it does not pollute the JSON report."""
+    if not enabled:
+        yield
+        return
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        yield
+
+
+def _configure_environment(server: FakeOpenAIServer, workdir: str):
+    """Point every outbound call at the fake server. Must run before the app modules are imported."""
+    os.environ["OPENAI_BASE_URL"] = f"{server.base_url}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    # Measure the cold path: nothing is ever stored in the result caches
+    os.environ["SUMMARY_CACHE_MAX_BYTES"] = "0"
+    os.environ["CHUNK_CACHE_MAX_BYTES"] = "0"
+    os.environ["SUMMARY_CACHE_DIR"] = os.path.join(workdir, "cache", "summaries")
+    os.environ["CHUNK_CACHE_DIR"] = os.path.join(workdir, "cache", "chunks")
+    os.environ["JOB_DB_PATH"] = os.path.join(workdir, "jobs", "jobs.db")
+    # Keep the scheduler out of the way unless a run sets explicit limits
+    os.environ.setdefault("LLM_DEFAULT_RPM", "1000000")
+    os.environ.setdefault("LLM_DEFAULT_TPM", "1000000000")
+
+    import gtts.tts
+    gtts.tts._translate_url = lambda tld="com", path="": f"{server.base_url}/{path}"
+
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+
+
+def _build_stages(corpus: List[str], workdir: str) -> Dict[str, Callable[[int], List[Callable[[], Any]]]]:
+    """For each stage, a factory returning the calls (one latency sample each) for one iteration."""
+
+    def summarize_pdf(_):
+        from textSummarize import PdfSummarizer
+        summarizer = PdfSummarizer()
+        return [lambda path=path: summarizer.summarize_pdf(path) for path in corpus]
+
+    summary = ("The paper proposes a transformer-based method for document summarization. "
+               "It is evaluated on three datasets and improves ROUGE by two points over the baseline. ") * 8
+    keywords = ["transformer", "summarization", "ROUGE"]
+
+    def refine_summary(_):
+        from chatbot import SummaryRefiner
+        refiner = SummaryRefiner()
+        return [lambda: refiner.refine_summary(summary, "Make it shorter and simpler", keywords=keywords)]
+
+    def answer_question(_):
+        from chatbot import SummaryRefiner
+        refiner = SummaryRefiner()
+        return [lambda: refiner.answer_question(summary, "Which datasets were used?", keywords=keywords)]
+
+    client = None
+
+    def api_client():
+        nonlocal client
+        if client is None:
+            from fastapi.testclient import TestClient
+            import main
+            client = TestClient(main.app)
+        return client
+
+    def post(path: str, **kwargs):
+        response = api_client().post(path, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    def upload(path: str, iteration: int):
+        with open(path, "rb") as f:
+            data = f.read()
+        # A fresh name per iteration, like distinct user uploads
+        return {"file": (f"{iteration}-{os.path.basename(path)}", data, "application/pdf")}
+
+    def api_summarize(iteration):
+        return [lambda path=path: post("/summarize", files=upload(path, iteration)) for path in corpus]
+
+    def api_summarize_fast(iteration):
+        # The local extractive mode: the latency floor for /summarize
+        return [lambda path=path: post("/summarize", files=upload(path, iteration), data={"mode": "fast"}) for path in corpus]
+
+    def api_generate_audio(_):
+        return [lambda: post("/generate-audio", json={"summary": summary})]
+
+    def api_generate_visuals_video(iteration):
+        return [lambda path=path: post("/generate-visuals-video", files=upload(path, iteration)) for path in corpus]
+
+    def image_generation(iteration):
+        from imageGen import generate_and_save_images
+        output_dir = os.path.join(workdir, "generated_images", str(iteration))
+
+        def run():
+            paths = generate_and_save_images(["A transformer encoder", "A ROUGE comparison"], output_dir)
+            if None in paths:
+                raise RuntimeError("image generation failed")
+        return [run]
+
+    return {
+        "summarize_pdf": summarize_pdf,
+        "refine_summary": refine_summary,
+        "answer_question": answer_question,
+        "api_summarize": api_summarize,
+        "api_summarize_fast": api_summarize_fast,
+        "api_generate_audio": api_generate_audio,
+        "api_generate_visuals_video": api_generate_visuals_video,
+        "image_generation": image_generation,
+    }
+
+
+def run_stage(factory: Callable[[int], List[Callable[[], Any]]], iterations: int, warmup: int, quiet: bool) -> Dict[str, Any]:
+    samples: List[float] = []
+    errors: List[str] = []
+    with _quiet(quiet):
+        for iteration in range(warmup):
+            for call in factory(-1 - iteration):
+                try:
+                    call()
+                except Exception:
+                    pass
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        for iteration in range(iterations):
+            for call in factory(iteration):
+                call_start = time.perf_counter()
+                try:
+                    with _quiet(quiet):
+                        call()
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                samples.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+
+    result = {"count": len(samples), "errors": len(errors)}
+    result.update(percentiles(samples))
+    result["throughput_per_s"] = len(samples) / elapsed if elapsed else 0.0
+    result["peak_rss_mb"] = rss.peak / (1024 * 1024)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Relative change (current / baseline - 1) of the headline metrics for stages present in both runs."""
+    deltas = {}
+    for stage, current in report["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous:
+            continue
+        deltas[stage] = {
+            metric: (current[metric] / previous[metric] - 1) if previous.get(metric) else 0.0
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "peak_rss_mb")
+        }
+    return deltas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the summarization pipeline against a fake OpenAI server")
+    parser.add_argument("--pdf", action="append", help="PDF to use (repeatable, default: bundled test PDFs)")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Stage to run (repeatable, default: all)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed iterations per stage")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean fake API latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Uniform +/- jitter on the fake API latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake API requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="Baseline report to diff against")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own progress output")
+    args = parser.parse_args()
+
+    corpus = [os.path.abspath(path) for path in (args.pdf or CORPUS)]
+    config = FakeOpenAIConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate, seed=args.seed)
+    server = FakeOpenAIServer(config=config).start()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="summaraize-bench-") as workdir:
+        try:
+            _configure_environment(server, workdir)
+            factories = _build_stages(corpus, workdir)
+            stages = {}
+            for name in args.stage or STAGES:
+                stages[name] = run_stage(factories[name], args.iterations, args.warmup, quiet=not args.verbose)
+        finally:
+            os.chdir(cwd)
+            server.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": [os.path.basename(path) for path in corpus],
+            "iterations": args.iterations,
+            "fake_api": vars(config),
+        },
+        "fake_api_requests": dict(server.counts),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_bytes() / (1024 * 1024),
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["compare"] = {"baseline_commit": baseline.get("meta", {}).get("commit"),
+                             "stages": compare(report, baseline)}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
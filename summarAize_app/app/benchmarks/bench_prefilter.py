@@ -0,0 +1,52 @@
+"""
+Benchmark: token reduction of the extractive (TF-IDF + TextRank) prefilter
+
+For each keep ratio, reports the tokens and map-step chunks left for the LLM,
+the reduction against the unfiltered document and the time the prefilter
+itself takes.
+
+    python -m benchmarks.bench_prefilter --pages 300 [--ratio 0.5 --ratio 0.3] [--max-tokens 60000]
+"""
+import argparse
+import json
+
+import tiktoken
+
+from benchmarks.common import load_corpus_text, time_call
+from services.chunker import TokenChunker
+from services.extractive import select_sentences
+
+CHARS_PER_PAGE = 3000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractive prefilter")
+    parser.add_argument("--pages", type=int, default=300, help="Approximate document size in pages (default: 300)")
+    parser.add_argument("--model", default="gpt-4o", help="Model whose tokenizer to use (default: gpt-4o)")
+    parser.add_argument("--max-tokens", type=int, default=0, help="Prefilter token cap (default: none)")
+    parser.add_argument("--chunk-tokens", type=int, default=8192 - 1500, help="Map-step chunk budget (default: 6692)")
+    parser.add_argument("--ratio", type=float, action="append", help="Keep ratio (repeatable, default: 0.75, 0.5, 0.3)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    encoding = tiktoken.encoding_for_model(args.model)
+    chunker = TokenChunker(encoding, args.chunk_tokens, overlap=200)
+    text = load_corpus_text(args.pages * CHARS_PER_PAGE)
+    tokens = len(encoding.encode(text))
+    chunks = len(chunker.split(text))
+
+    results = {"chars": len(text), "tokens": tokens, "chunks": chunks, "ratios": {}}
+    for ratio in args.ratio or [0.75, 0.5, 0.3]:
+        filtered = select_sentences(text, ratio, args.max_tokens, encoding)
+        kept = len(encoding.encode(filtered))
+        results["ratios"][str(ratio)] = {
+            "tokens": kept,
+            "chunks": len(chunker.split(filtered)),
+            "token_reduction": 1 - kept / tokens,
+            "prefilter_s": time_call(lambda: select_sentences(text, ratio, args.max_tokens, encoding), args.repeat)["median_s"],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: reference-section location and splitting on adversarial inputs
+
+Each generator builds a document of a given size designed to make the old
+regex strategies backtrack (long whitespace runs, headers with no section
+terminator, numbered markers with nothing to close them). The new scanner
+is timed at doubling sizes and the log-log slope of time vs size is
+reported; a slope near 1 means linear time. The legacy regex path is timed
+too, up to --legacy-max-kb, since it grows quadratically on these inputs.
+
+    python -m benchmarks.bench_references [--max-kb 4096] [--check]
+"""
+import argparse
+import json
+import math
+import re
+import sys
+
+from benchmarks.common import load_corpus_text, time_call
+from services.references import find_numbered_references, find_references_section, split_reference_entries
+
+
+def legacy_extract(text):
+    """The pre-scanner _extract_references_locally: three header regexes, five split strategies, numbered refs."""
+    reference_patterns = [
+        r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*(?:APPENDIX|Appendix|SUPPLEMENT|Supplement|ACKNOWLEDGMENT|Acknowledgment|AUTHOR|Author|AFFILIATION|Affiliation|FIGURE|Figure|TABLE|Table)|\Z)',
+        r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*\n\s*[A-Z][A-Z\s]+\n|\Z)',
+        r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*\n|\Z)'
+    ]
+    references_text = None
+    for pattern in reference_patterns:
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            references_text = match.group(1).strip()
+            break
+
+    if references_text:
+        references = []
+        clean_text = re.sub(r'\n+', '\n', references_text.strip())
+        for pattern in [r'((?:19|20)\d{2}[a-z]?\.)\s*\n', r'(\((?:19|20)\d{2}[a-z]?\)\.)\s*\n',
+                        r'(\((?:19|20)\d{2}[a-z]?\))\s*\n', r'((?:19|20)\d{2}[a-z]?)\.\s*\n']:
+            parts = re.split(pattern, clean_text)
+            if len(parts) > 2:
+                refs = [(parts[i] + parts[i + 1]).strip() for i in range(0, len(parts) - 1, 2)]
+                refs = [ref for ref in refs if len(ref) > 10]
+                if refs:
+                    references.extend(refs)
+                    break
+        for pattern in [r'\n(?=\s*(?:\[\d+\]|\d+\.)\s*[A-Z])',
+                        r'\n(?=\s*[A-Z][a-z]+,\s+[A-Z]\.(?:\s+[A-Z]\.)?(?:\s+[A-Z]\.)*\s+(?:\(\d{4}\)|[\"\']|[A-Z]))']:
+            if not references:
+                parts = re.split(pattern, clean_text)
+                if len(parts) > 1:
+                    references.extend(part.strip() for part in parts if len(part.strip()) > 10)
+        if not references:
+            current_ref = ""
+            for line in clean_text.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                if re.match(r'^\s*(?:\[\d+\]|\d+\.)\s*[A-Z]', line) or re.match(r'^\s*[A-Z][a-z]+,\s+[A-Z]\.', line):
+                    if len(current_ref) > 10:
+                        references.append(current_ref.strip())
+                    current_ref = line
+                else:
+                    current_ref += " " + line if current_ref else line
+            if len(current_ref) > 10:
+                references.append(current_ref.strip())
+        # The last strategy used a variable-width look-behind, which re rejects, so it always raised;
+        # extract_references then returned an error entry. It is left out here.
+        unique = list(dict.fromkeys(re.sub(r'^\s*(?:\[\d+\]|\d+\.)\s*', '', ref).strip() for ref in references))
+        if unique:
+            return unique[:100]
+
+    numbered = re.findall(r'\[(\d+)\]\s*([A-Z][^\[\]]+?)(?=\s*\[\d+\]|\s*$|\n\s*\n)', text, re.DOTALL)
+    return [re.sub(r'\s+', ' ', ref.strip()) for _, ref in numbered if len(ref.strip()) > 5]
+
+
+def scanner_extract(text):
+    """The same strategies through services.references."""
+    section = find_references_section(text)
+    if section:
+        references = split_reference_entries(section)
+        if references:
+            return references
+    return find_numbered_references(text)
+
+
+def _fill(unit: str, size: int) -> str:
+    return unit * (size // len(unit) + 1)
+
+
+GENERATORS = {
+    # Header followed by whitespace-only lines: every newline starts a \s* scan to the end
+    "blank_lines_after_header": lambda size: "Introduction\nSome text.\nReferences\n" + _fill("\n \t", size) + "x",
+    # A reference list whose lines never end in a year and are separated by space-padded newlines
+    "padded_section": lambda size: "References\n" + _fill("Smith, J.  \n   \n", size),
+    # An opening [n] marker followed by a long whitespace run and no terminator
+    "unterminated_marker": lambda size: "[1] A" + " " * size + ".",
+    # Many markers that never close: each lazily scans forward
+    "marker_flood": lambda size: _fill("[1] Ab ", size),
+    # One enormous line, so line-based scanning cannot rely on short lines
+    "single_long_line": lambda size: "References\n" + _fill("word 2020 ", size),
+}
+
+
+def scaling(results):
+    """Least-squares slope of log(time) vs log(size)."""
+    points = [(math.log(size), math.log(max(seconds, 1e-9))) for size, seconds in results]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator if denominator else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reference extraction on adversarial inputs")
+    parser.add_argument("--min-kb", type=int, default=64)
+    parser.add_argument("--max-kb", type=int, default=4096)
+    parser.add_argument("--legacy-max-kb", type=int, default=64, help="Largest input to run the legacy regexes on")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if any scaling slope exceeds --max-slope")
+    parser.add_argument("--max-slope", type=float, default=1.3)
+    args = parser.parse_args()
+
+    sizes = []
+    size = args.min_kb * 1024
+    while size <= args.max_kb * 1024:
+        sizes.append(size)
+        size *= 2
+
+    results = {}
+    worst_slope = 0.0
+    for name, generate in GENERATORS.items():
+        scanner_times, legacy_times = [], []
+        for size in sizes:
+            text = generate(size)
+            scanner_times.append((size, time_call(lambda: scanner_extract(text), args.repeat)["median_s"]))
+            if size <= args.legacy_max_kb * 1024:
+                legacy_times.append((size, time_call(lambda: legacy_extract(text), 1)["median_s"]))
+        slope = scaling(scanner_times)
+        worst_slope = max(worst_slope, slope)
+        results[name] = {
+            "scanner_s": {str(size): seconds for size, seconds in scanner_times},
+            "scanner_slope": slope,
+            "legacy_s": {str(size): seconds for size, seconds in legacy_times},
+            "legacy_slope": scaling(legacy_times),
+        }
+
+    corpus = load_corpus_text()
+    results["corpus"] = {
+        "scanner_s": time_call(lambda: scanner_extract(corpus), args.repeat)["median_s"],
+        "legacy_s": time_call(lambda: legacy_extract(corpus), args.repeat)["median_s"],
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.check and worst_slope > args.max_slope:
+        print(f"Scaling slope {worst_slope:.2f} exceeds {args.max_slope}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
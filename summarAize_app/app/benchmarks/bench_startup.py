@@ -0,0 +1,118 @@
+"""
+Startup benchmark: how long `import main` takes in a fresh interpreter, which
+modules dominate it, and whether any subsystem that should load lazily was
+pulled in at import time
+
+Each run is a separate `python -X importtime -c "import main"` process with
+warm-up disabled, so the numbers are what a new replica pays before it can
+bind its port. Exits non-zero when the median exceeds --budget-ms or a
+forbidden module was imported, so it can gate CI.
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 2500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+# Subsystems main must not import until a request (or a warm-up hook) needs them
+# (firebase_admin itself is expected: auth verifies tokens on every request)
+FORBIDDEN = [
+    "moviepy", "aeneas", "pdfplumber", "fitz", "gtts", "openai", "tiktoken",
+    "google.cloud.storage", "google.cloud.firestore",
+    "textSummarize", "chatbot", "extractVisuals", "imageExtract",
+]
+
+_PROBE = (
+    "import json, sys\n"
+    "import main\n"
+    "print(json.dumps(sorted(sys.modules)))\n"
+)
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(total ms, [(top-level module, cumulative ms)]) from -X importtime output."""
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        # Top-level imports are not indented beyond the single separating space
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative) / 1000))
+    main_ms = next((ms for module, ms in top_level if module == "main"), sum(ms for _, ms in top_level))
+    return main_ms, top_level
+
+
+def _nested_cost(stderr: str) -> Dict[str, float]:
+    """Cumulative ms of every module imported (at any depth), largest entry per name."""
+    costs = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if cumulative.strip().isdigit():
+            name = name.strip()
+            costs[name] = max(costs.get(name, 0.0), int(cumulative) / 1000)
+    return costs
+
+
+def measure_once() -> Tuple[float, Dict[str, float], List[str]]:
+    env = dict(os.environ, WARMUP="", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    total_ms, _ = _parse_importtime(result.stderr)
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    return total_ms, _nested_cost(result.stderr), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API process startup (import main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2500.0,
+                        help="Fail when the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to report")
+    args = parser.parse_args()
+
+    totals, costs, modules = [], {}, []
+    for _ in range(args.runs):
+        total_ms, run_costs, modules = measure_once()
+        totals.append(total_ms)
+        for name, ms in run_costs.items():
+            costs.setdefault(name, []).append(ms)
+
+    median = statistics.median(totals)
+    loaded = set(modules)
+    forbidden = sorted(
+        name for name in FORBIDDEN
+        if name in loaded or any(module.startswith(name + ".") for module in loaded)
+    )
+    slowest = sorted(((name, statistics.median(ms)) for name, ms in costs.items() if name != "main"),
+                     key=lambda item: item[1], reverse=True)[:args.top]
+    ok = median <= args.budget_ms and not forbidden
+    print(json.dumps({
+        "runs": args.runs,
+        "import_main_ms": {"median": round(median, 1), "min": round(min(totals), 1), "max": round(max(totals), 1)},
+        "budget_ms": args.budget_ms,
+        "modules_loaded": len(modules),
+        "forbidden_loaded": forbidden,
+        "slowest_modules_ms": {name: round(ms, 1) for name, ms in slowest},
+        "ok": ok,
+    }, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
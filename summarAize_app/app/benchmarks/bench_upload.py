@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: saving an upload with await file.read() (then hashing the
+saved file) vs services.uploads.save_upload, reported as time and peak
+Python heap (tracemalloc) per upload size
+
+    python -m benchmarks.bench_upload --sizes-mb 1 10 50
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from services.summary_cache import hash_file
+from services.uploads import save_upload
+
+
+def _upload(size: int) -> UploadFile:
+    """An UploadFile backed by a temporary file, as Starlette hands over bodies over 1 MB."""
+    spooled = tempfile.TemporaryFile()
+    block = bytes(range(256)) * 4096
+    for offset in range(0, size, len(block)):
+        spooled.write(block[:size - offset])
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename="paper.pdf")
+
+
+async def legacy_save(file: UploadFile, folder: Path) -> str:
+    """What the endpoints did before: read the whole upload, write it, hash the file."""
+    path = folder / "legacy.pdf"
+    with open(path, "wb") as f:
+        f.write(await file.read())
+    digest = await asyncio.to_thread(hash_file, path)
+    path.unlink()
+    return digest
+
+
+async def streamed_save(file: UploadFile, folder: Path) -> str:
+    upload = await save_upload(file, folder, max_bytes=0)
+    upload.path.unlink()
+    return upload.sha256
+
+
+def measure(save, size: int, folder: Path):
+    file = _upload(size)
+    tracemalloc.start()
+    start = time.perf_counter()
+    digest = asyncio.run(save(file, folder))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    file.file.close()
+    return {"seconds": elapsed, "peak_heap_mb": peak / (1024 * 1024)}, digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload ingestion")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="summaraize-bench-") as workdir:
+        for size_mb in args.sizes_mb:
+            size = size_mb * 1024 * 1024
+            legacy, legacy_digest = measure(legacy_save, size, Path(workdir))
+            streamed, streamed_digest = measure(streamed_save, size, Path(workdir))
+            results[f"{size_mb}_mb"] = {
+                "legacy": legacy,
+                "streamed": streamed,
+                "same_hash": legacy_digest == streamed_digest,
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+import math
+import os
+import resource
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Sequence
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = [os.path.join(APP_DIR, "test.pdf"), os.path.join(APP_DIR, "test1.pdf")]
+
+
+def load_corpus_text(min_chars: int = 0) -> str:
+    """Text of the bundled test PDFs, repeated until it is at least min_chars long."""
+    from services.parsed_document import ParsedDocument
+
+    texts = []
+    for path in CORPUS:
+        with ParsedDocument.from_pdf(path) as document:
+            texts.append(document.text)
+    text = "\n".join(texts)
+    if min_chars and len(text) < min_chars:
+        text = "\n".join([text] * (min_chars // len(text) + 1))
+    return text
+
+
+def time_call(fn: Callable, repeat: int = 5) -> Dict[str, float]:
+    """Run fn repeat times and return min/median wall time in seconds."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"min_s": min(samples), "median_s": statistics.median(samples)}
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latency samples (seconds), reported in milliseconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        # Nearest-rank percentile: stable for the small sample counts benchmarks produce
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000
+
+    return {
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "mean_ms": statistics.fmean(ordered) * 1000
+    }
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc; falls back to the peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process since it started."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024  # kilobytes on Linux
+
+
+class RssSampler:
+    """Samples RSS in a background thread to find the peak within one block of work."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
@@ -0,0 +1,244 @@
+"""
+Local stand-in for the OpenAI chat/images endpoints (and the Google TTS
+endpoint used by gTTS) so the pipeline can be benchmarked offline.
+
+Responses are deterministic for a given seed. Latency, jitter, the rate
+of injected 429s (chat and images only) and a tail of slow responses are
+configurable; 429s carry retry-after headers so the OpenAI SDK's own retry
+logic is exercised.
+
+    python -m benchmarks.fake_openai --port 8765 --latency-ms 300 --error-rate 0.05
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+"""
+import argparse
+import base64
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# 1x1 transparent PNG served for generated images
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+# About one second of silent MPEG-1 Layer III frames (128 kbps, 44.1 kHz), served as TTS audio
+_MP3 = (b"\xff\xfb\x90\x64" + b"\x00" * 413) * 38
+
+_WORDS = (
+    "model data results method analysis training performance network approach evaluation "
+    "baseline dataset learning accuracy proposed experiments features representation task"
+).split()
+
+
+class FakeOpenAIConfig:
+    def __init__(self, latency_ms: float = 200.0, jitter_ms: float = 50.0, error_rate: float = 0.0,
+                 completion_words: int = 120, seed: int = 0, slow_rate: float = 0.0, slow_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Fraction of requests delayed by an extra slow_ms (stragglers, for tail-latency experiments)
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.completion_words = completion_words
+        self.seed = seed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        if self.path.startswith("/files/"):
+            self._send(200, _PNG, "image/png")
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        body = self._read_body()
+        endpoint = self.path.split("?", 1)[0]
+        if endpoint.endswith("/chat/completions"):
+            kind = "chat"
+        elif endpoint.endswith("/images/generations"):
+            kind = "images"
+        elif endpoint.endswith("/batchexecute"):
+            kind = "tts"
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        if self.server.simulate(kind):
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (injected)", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after-ms": "50", "retry-after": "0"}
+            )
+            return
+
+        if kind == "chat":
+            self._chat(json.loads(body or b"{}"))
+        elif kind == "images":
+            self._images(json.loads(body or b"{}"))
+        else:
+            audio = base64.b64encode(_MP3).decode("ascii")
+            self._send(200, f')]}}\'\n\n[["wrb.fr","jQ1olc","[\\"{audio}\\"]",null,null,null,"generic"]]'.encode("ascii"),
+                       "application/json; charset=utf-8")
+
+    def _chat(self, request: Dict[str, Any]):
+        prompt = " ".join(message.get("content") or "" for message in request.get("messages", []))
+        content = self.server.completion_text(prompt)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        model = request.get("model", "gpt-4o")
+
+        if request.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in re.findall(r"\S+\s*", content):
+                chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                }
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+            return
+
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _images(self, request: Dict[str, Any]):
+        host, port = self.server.server_address[:2]
+        self._send_json(200, {
+            "created": int(time.time()),
+            "data": [{"url": f"http://{host}:{port}/files/{i}.png"} for i in range(int(request.get("n") or 1))]
+        })
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server; start() runs it in a daemon thread for in-process benchmarks."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FakeOpenAIConfig] = None):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeOpenAIConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def simulate(self, kind: str) -> bool:
+        """Sleep for the configured latency; return True if this request should get a 429."""
+        with self._lock:
+            delay = max(0.0, self.config.latency_ms + self._random.uniform(-1, 1) * self.config.jitter_ms) / 1000
+            if self._random.random() < self.config.slow_rate:
+                delay += self.config.slow_ms / 1000
+            # Only the OpenAI endpoints are throttled; the TTS stand-in just adds latency
+            throttled = kind != "tts" and self._random.random() < self.config.error_rate
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            if throttled:
+                self.counts["429"] = self.counts.get("429", 0) + 1
+        time.sleep(delay)
+        return throttled
+
+    def completion_text(self, prompt: str) -> str:
+        """A plausible answer shaped like what the caller's parser expects."""
+        with self._lock:
+            words = [self._random.choice(_WORDS) for _ in range(self.config.completion_words)]
+        if '"keyword"' in prompt:
+            return json.dumps([
+                {"keyword": word, "score": 10 - i, "explanation": f"Central to the {words[-1]} of the paper."}
+                for i, word in enumerate(dict.fromkeys(words[:20]))
+            ][:8])
+        if "reference section" in prompt.lower():
+            return "\n".join(
+                f"{word.title()}, A. ({2000 + i}). On the {words[i + 1]} of {words[i + 2]}. Journal of {words[i + 3].title()}, {i}."
+                for i, word in enumerate(words[:10])
+            )
+        sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+        return " ".join(sentences)
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (cancelled hedges, timeouts); only report real failures
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake OpenAI API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, FakeOpenAIConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms
+    ))
+    print(f"Fake OpenAI API listening on {server.base_url}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
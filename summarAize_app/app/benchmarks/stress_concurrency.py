@@ -0,0 +1,122 @@
+"""
+Concurrency stress test: many summarizations sharing one summarizer, against
+a local fake OpenAI server, checking that no per-document state leaks
+between them
+
+Runs --concurrency summarize_pdf calls at once over the bundled PDFs (mixed
+options) on one AsyncPdfSummarizer, then the same on one PdfSummarizer from a
+thread pool. Every result must carry the references of its own PDF (as found
+by a solo run), and the tokens attributed to the documents' contexts must add
+up to what the summarizer spent. Exits non-zero on any mismatch.
+
+    python -m benchmarks.stress_concurrency --concurrency 32 --rounds 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.bench_pipeline import _configure_environment, _quiet
+from benchmarks.common import CORPUS
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+
+
+def _jobs(concurrency: int) -> List[Dict[str, Any]]:
+    """concurrency summarize_pdf arguments cycling through the corpus and option combinations."""
+    options = [(False, False), (True, False), (False, True), (True, True)]
+    return [
+        {"pdf_path": CORPUS[i % len(CORPUS)], "detailed": options[i % len(options)][0],
+         "include_citations": options[(i // len(CORPUS)) % len(options)][1]}
+        for i in range(concurrency)
+    ]
+
+
+def _check(name: str, jobs, results, contexts, tokens_spent: int, expected: Dict[str, List[str]], elapsed: float):
+    mismatched = [
+        os.path.basename(job["pdf_path"]) for job, result in zip(jobs, results)
+        if result["references"] != expected[job["pdf_path"]]
+    ]
+    attributed = sum(context.tokens_used for context in contexts)
+    return {
+        "mode": name,
+        "documents": len(jobs),
+        "elapsed_s": round(elapsed, 3),
+        "reference_mismatches": mismatched,
+        "tokens_spent": tokens_spent,
+        "tokens_attributed": attributed,
+        "ok": not mismatched and attributed == tokens_spent,
+    }
+
+
+async def _run_async(concurrency: int, expected) -> Dict[str, Any]:
+    from services.summary_context import SummaryContext
+    from textSummarize import AsyncPdfSummarizer
+
+    summarizer = AsyncPdfSummarizer()
+    jobs = _jobs(concurrency)
+    contexts = [SummaryContext() for _ in jobs]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        summarizer.summarize_pdf(job["pdf_path"], detailed=job["detailed"], include_citations=job["include_citations"],
+                                 context=context)
+        for job, context in zip(jobs, contexts)
+    ))
+    return _check("async", jobs, results, contexts, summarizer.tokens_used, expected, time.perf_counter() - start)
+
+
+def _run_threads(concurrency: int, expected) -> Dict[str, Any]:
+    from services.summary_context import SummaryContext
+    from textSummarize import PdfSummarizer
+
+    summarizer = PdfSummarizer()
+    jobs = _jobs(concurrency)
+    contexts = [SummaryContext() for _ in jobs]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(
+            lambda pair: summarizer.summarize_pdf(pair[0]["pdf_path"], detailed=pair[0]["detailed"],
+                                                  include_citations=pair[0]["include_citations"], context=pair[1]),
+            zip(jobs, contexts)
+        ))
+    return _check("threads", jobs, results, contexts, summarizer.tokens_used, expected, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test concurrent summarizations on one shared summarizer")
+    parser.add_argument("--concurrency", type=int, default=16, help="Summarizations in flight at once")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="Wide jitter reorders the documents' calls")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own progress output")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(config=FakeOpenAIConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)).start()
+    cwd = os.getcwd()
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="summaraize-stress-") as workdir:
+        try:
+            _configure_environment(server, workdir)
+            from textSummarize import PdfSummarizer
+
+            with _quiet(not args.verbose):
+                solo = PdfSummarizer()
+                expected = {path: solo.summarize_pdf(path)["references"] for path in CORPUS}
+                for _ in range(args.rounds):
+                    runs.append(asyncio.run(_run_async(args.concurrency, expected)))
+                    runs.append(_run_threads(args.concurrency, expected))
+        finally:
+            os.chdir(cwd)
+            server.stop()
+
+    ok = all(run["ok"] for run in runs)
+    print(json.dumps({"concurrency": args.concurrency, "ok": ok, "runs": runs}, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import os
 import json
+import time
 from openai import OpenAI
 from typing import List, Dict, Optional, Any
+from services.llm_scheduler import llm_scheduler, estimate_tokens, CHATBOT_MODEL, INTERACTIVE
+from services.metrics import record_error, record_llm_call
 
 class SummaryRefiner:
     """
@@ -66,8 +69,9 @@ The summary should be comprehensive, well-structured, and maintain academic inte
             ]
             
             # Call OpenAI API to get the refined summary
-            summary_response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+            summary_response = self._complete(
+                "refine_summary",
+                model=CHATBOT_MODEL,
                 messages=summary_messages,
                 temperature=0.5,
                 max_tokens=2000
@@ -92,8 +96,9 @@ The summary should be comprehensive, well-structured, and maintain academic inte
                     explanation_messages.append(msg)
             
             # Call OpenAI API to get the explanation
-            chat_response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+            chat_response = self._complete(
+                "refine_explanation",
+                model=CHATBOT_MODEL,
                 messages=explanation_messages,
                 temperature=0.7,
                 max_tokens=500  # Shorter response for the explanation
@@ -188,8 +193,9 @@ If the summary doesn't contain enough information to fully answer the question,
                     qa_messages.append(msg)
             
             # Call OpenAI API to get the answer
-            qa_response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+            qa_response = self._complete(
+                "answer_question",
+                model=CHATBOT_MODEL,
                 messages=qa_messages,
                 temperature=0.7,
                 max_tokens=800
@@ -214,6 +220,22 @@ If the summary doesn't contain enough information to fully answer the question,
                 "success": False
             }
     
+    def _complete(self, call, **request):
+        """Send a chat completion through the LLM scheduler at interactive priority; call names it in the metrics"""
+        estimate = estimate_tokens(request)
+        grant = llm_scheduler.acquire(request["model"], estimate, INTERACTIVE)
+        started = time.perf_counter()
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(**request)
+            response = raw.parse()
+        except Exception:
+            record_error(f"llm_{call}")
+            raise
+        llm_scheduler.record_usage(request["model"], grant.cost, getattr(response.usage, "total_tokens", None))
+        record_llm_call(call, request["model"], time.perf_counter() - started, response.usage, raw.retries_taken,
+                        grant.waited)
+        return response
+
     def _create_system_message(self, references=None, keywords=None) -> str:
         """
         Create a detailed system message with context for the refinement.
@@ -4,16 +4,19 @@ import re
 import argparse
 import glob
 from PIL import Image
-from moviepy.editor import *
-import moviepy.video.fx.all as vfx
+from services.metrics import timed
 
 
+@timed("video_encode")
 def generate_visuals_video(
     visuals_folder, 
     output_video="visuals_walkthrough.mp4", 
     duration_per_visual=3, 
     voiceover_path=None  # <-- NEW
 ):
+    # moviepy (and its ffmpeg probing) is only loaded by the processes that render video
+    from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip
+
     print(f"\n🎬 Generating video from visuals in: {visuals_folder}")
 
     # Get all extracted visuals (PNG)
@@ -57,6 +60,7 @@ def generate_visuals_video(
 def clean_caption_text(text):
     return re.sub(r'[^a-zA-Z0-9_]', '_', text.strip())[:50]
 
+@timed("visual_extraction")
 def extract_visual_elements(pdf_path, output_folder="extracted_visuals"):
     os.makedirs(output_folder, exist_ok=True)
 
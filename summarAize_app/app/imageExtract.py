@@ -1,26 +1,27 @@
-import fitz  # PyMuPDF
 import os
 import argparse
-from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip 
+from services.parsed_document import ParsedDocument
+from services.metrics import timed
 
 
-def extract_images(pdf_path, output_folder):
-    """Extracts images from a PDF and saves them to the output folder."""
+@timed("image_extraction")
+def extract_images(pdf_path, output_folder, document=None):
+    """
+    Extracts images from a PDF and saves them to the output folder.
+
+    Pass an already built ParsedDocument as document to reuse its open file
+    instead of parsing the PDF again.
+    """
     os.makedirs(output_folder, exist_ok=True)
-    doc = fitz.open(pdf_path)
+    owns_document = document is None
+    if owns_document:
+        document = ParsedDocument.from_pdf(pdf_path)
     saved = []
 
-    for page_number, page in enumerate(doc, start=1):
-        image_list = page.get_images(full=True)
-        if not image_list:
-            continue
-
-        for img_index, img_info in enumerate(image_list, start=1):
-            xref = img_info[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image.get("ext", "png")
-            image_name = f"page{page_number}_img{img_index}.{image_ext}"
+    try:
+        for ref in document.image_refs:
+            image_bytes, image_ext = document.extract_image(ref.xref)
+            image_name = f"page{ref.page_number}_img{ref.index}.{image_ext}"
             image_path = os.path.join(output_folder, image_name)
 
             with open(image_path, "wb") as img_file:
@@ -28,6 +29,9 @@ def extract_images(pdf_path, output_folder):
 
             saved.append(os.path.basename(image_path))
             print(f"Extracted {image_name}")
+    finally:
+        if owns_document:
+            document.close()
 
     return saved
 
@@ -43,6 +47,8 @@ def create_video_from_images(image_paths, output_video_path, fps=1, image_durati
         transition_duration (float): Duration (in seconds) of crossfade between images. (Default: 1)
     audio_path (str or None): Path to an audio file (MP3, WAV, etc.) to add as background. (Default: None)
     """
+    from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip
+
     if not image_paths:
         print("No images.")
         return
@@ -5,6 +5,7 @@ import json
 from pathlib import Path
 import argparse
 from dotenv import load_dotenv
+from services.metrics import timed
 
 load_dotenv()
 
@@ -33,6 +34,7 @@ def extract_sentences_from_alignment(alignment_path: str):
     sentences = [frag["lines"][0] for frag in fragments if frag.get("lines") and frag["lines"][0].strip()]
     return sentences
 
+@timed("image_generation")
 def generate_and_save_images(sentences, output_dir):
     os.makedirs(output_dir, exist_ok=True)
     image_paths = []
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, UploadFile, File, Form, Body, HTTPException, Depends
 from fastapi import FastAPI, UploadFile, File, Form, Body, HTTPException, Depends
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
@@ -8,17 +8,24 @@ from typing import List, Dict, Optional
 from pydantic import BaseModel
 from pathlib import Path
 import os, uuid, pathlib, time
-from gtts import gTTS
-from textSummarize import PdfSummarizer
-from extractVisuals import extract_visual_elements, generate_visuals_video
-from imageExtract import extract_images
-from chatbot import SummaryRefiner
+import importlib
+import asyncio
+import json
 import requests
 from auth import get_current_user, UserInfo
-from storage_service import storage_service
-from firestore_service import firestore_service
 
-from services.aligner import align
+from services.lazy import Lazy
+from services.summary_cache import summary_cache, chunk_cache, make_cache_key
+from services.job_queue import JobQueue, JobStore
+from services.llm_scheduler import llm_scheduler, priority_scope, BACKGROUND
+from services.metrics import record_retry, render_latest, stage_timer, timed
+from services.fast_summary import fast_summary
+from services.pipeline import Pipeline, THREAD
+from services.single_flight import SingleFlight
+from services.summary_context import SummaryContext, context_scope
+from services.uploads import UploadTooLarge, link_upload, save_upload
+from services.references import strip_references_section
+from services.text_normalizer import normalize_pdf_text
 # from services.related import get_related_papers
 import re
 
@@ -34,8 +41,44 @@ app.add_middleware(
 )
 
 
-summarizer = PdfSummarizer()
-chatbot = SummaryRefiner()
+# Heavy subsystems load on first use (or from a warm-up hook), so a replica
+# only pays for the ones its traffic needs: OpenAI client and BPE tables for
+# summarize/chat, PyMuPDF for parsing, moviepy and pdfplumber for video, aeneas, gTTS, Firebase
+def _build_summarizer():
+    from textSummarize import AsyncPdfSummarizer
+    return AsyncPdfSummarizer(chunk_cache=chunk_cache)
+
+
+def _build_chatbot():
+    from chatbot import SummaryRefiner
+    return SummaryRefiner()
+
+
+summarizer = Lazy(_build_summarizer)
+chatbot = Lazy(_build_chatbot)
+ParsedDocument = Lazy.attribute("services.parsed_document", "ParsedDocument")
+gTTS = Lazy.attribute("gtts", "gTTS")
+extract_images = Lazy.attribute("imageExtract", "extract_images")
+extract_visual_elements = Lazy.attribute("extractVisuals", "extract_visual_elements")
+generate_visuals_video = Lazy.attribute("extractVisuals", "generate_visuals_video")
+align = Lazy.attribute("services.aligner", "align")
+storage_service = Lazy.attribute("storage_service", "storage_service")
+firestore_service = Lazy.attribute("firestore_service", "firestore_service")
+
+# Loaded in the background right after startup instead of on the first request that needs them
+WARMUP_HOOKS = {
+    "summarizer": lambda: (summarizer.load(), ParsedDocument.load()),
+    "chatbot": chatbot.load,
+    # The video modules import moviepy inside the functions that render, so load it here too
+    "video": lambda: (extract_visual_elements.load(), generate_visuals_video.load(),
+                      importlib.import_module("moviepy.editor")),
+    "audio": lambda: (gTTS.load(), align.load()),
+    "firebase": lambda: (storage_service.load(), firestore_service.load()),
+}
+WARMUP = [name.strip() for name in os.getenv("WARMUP", "summarizer,chatbot").split(",") if name.strip()]
+for _name in WARMUP:
+    if _name not in WARMUP_HOOKS:
+        raise ValueError(f"Unknown WARMUP hook {_name!r}. Choose from: {', '.join(WARMUP_HOOKS)}")
 
 AUDIO_FOLDER = "generated_audios"
 os.makedirs(AUDIO_FOLDER, exist_ok=True)
@@ -49,24 +92,161 @@ os.makedirs(IMAGE_FOLDER, exist_ok=True)
 VIDEO_FOLDER = Path("videos")
 os.makedirs(VIDEO_FOLDER, exist_ok=True)
 
+JOB_UPLOAD_FOLDER = UPLOAD_FOLDER / "jobs"
+os.makedirs(JOB_UPLOAD_FOLDER, exist_ok=True)
+
+job_queue = JobQueue(JobStore())
+# Identical summarizations in progress (same PDF content and options), shared by every caller
+summary_flights = SingleFlight("summarize")
+
 app.mount("/images", StaticFiles(directory=IMAGE_FOLDER),name="images")
+# /summarize modes: the LLM pipeline, or a local extractive summary
+SUMMARY_MODES = ("full", "fast")
+
 class AudioRequest(BaseModel):
     summary: Optional[str] = None
     text_name: Optional[str] = None
 
 def clean_pdf_text(text: str) -> str:
-    # Remove page numbers like "\n12\n" or "12\n" or "\n12"
-    text = re.sub(r'\n\d+\n', '\n', text)
-    text = re.sub(r'\n\d+\s', '\n', text)
-    text = re.sub(r'\s\d+\n', '\n', text)
+    # Strip page numbers and control characters and collapse whitespace in one pass
+    return normalize_pdf_text(text)
+
+
+def keyword_text(text: str) -> str:
+    # Body text for keyword extraction: the reference list would only add author names and venues
+    return clean_pdf_text(strip_references_section(text))
+
+
+@timed("summarize_pipeline")
+async def run_summarize_pipeline(file_path, pdf_hash, is_detailed, include_citations, emit=None):
+    """
+    Summarize a saved PDF and extract its images and keywords.
+    Returns the /summarize response body. If emit is given, progress events
+    are sent to it as each stage finishes.
+    """
+    # Parse the PDF once and share it between all stages
+    document = await asyncio.to_thread(ParsedDocument.from_pdf, file_path)
+    with document:
+        def extract_document_images(document):
+            #extracting images into a per-document folder so cached URLs stay valid
+            return extract_images(str(file_path), str(IMAGE_FOLDER / pdf_hash), document=document)
+
+        async def publish_images(image_files):
+            image_urls = [f"/images/{pdf_hash}/{name}" for name in image_files]
+            if emit:
+                await emit("images", {"images": image_urls})
+            return image_urls
+
+        async def extract_document_keywords(clean_text):
+            # Extract keywords from cleaned text; references come from the summary stages
+            keywords = []
+            try:
+                keywords = await summarizer.extract_keywords(clean_text)
+            except Exception as e:
+                print(f"[!] Error extracting keywords: {str(e)}")
+            if emit:
+                await emit("keywords", {"keywords": keywords})
+            return keywords
+
+        # Images, keywords and references depend only on the PDF, so they run alongside the summary
+        pipeline = summarizer.add_summary_stages(Pipeline(), "sentence", is_detailed, include_citations, emit)
+        pipeline.add("image_files", extract_document_images, inputs=("document",), executor=THREAD)
+        pipeline.add("images", publish_images, inputs=("image_files",))
+        pipeline.add("clean_text", keyword_text, inputs=("text",), executor=THREAD)
+        pipeline.add("keywords", extract_document_keywords, inputs=("clean_text",))
+        # Per-request state lives here, not on the shared summarizer
+        context = SummaryContext()
+        with context_scope(context):
+            result = await pipeline.run(
+                {"pdf_path": file_path, "document": document},
+                targets=("summary", "references", "keywords", "images")
+            )
+        context.references = result['references']
+        print(f"[✓] Summarized {pdf_hash[:12]}: {context.llm_calls} LLM calls, {context.tokens_used:,} tokens")
+
+    return {
+        "summary": result['summary'], 
+        "references": result['references'], 
+        "referenceCount": len(result['references']),
+        "hasCitations": include_citations,
+        "keywords": result['keywords'],
+        "images": result['images']
+    }
 
-    # Remove stray control characters
-    text = re.sub(r'[\x00-\x1F\x7F]', '', text)
 
-    # Normalize multiple spaces/newlines
-    text = re.sub(r'\s+', ' ', text)
+@timed("fast_summarize_pipeline")
+async def run_fast_summarize_pipeline(file_path, pdf_hash, is_detailed, include_citations):
+    """
+    mode=fast: an extractive summary, local references and keywords and the document's images,
+    with no LLM calls. Returns the same body as run_summarize_pipeline.
+    """
+    document = await asyncio.to_thread(ParsedDocument.from_pdf, file_path)
+    with document:
+        def extract_document_images(document):
+            return extract_images(str(file_path), str(IMAGE_FOLDER / pdf_hash), document=document)
+
+        def summarize(document):
+            return fast_summary(document.text, detailed=is_detailed)
+
+        pipeline = Pipeline()
+        pipeline.add("result", summarize, inputs=("document",), executor=THREAD)
+        pipeline.add("image_files", extract_document_images, inputs=("document",), executor=THREAD)
+        result = await pipeline.run({"document": document})
+
+    return {
+        "summary": result["result"]["summary"],
+        "references": result["result"]["references"],
+        "referenceCount": result["result"]["reference_count"],
+        "hasCitations": include_citations,
+        "keywords": result["result"]["keywords"],
+        "images": [f"/images/{pdf_hash}/{name}" for name in result["image_files"]]
+    }
+
+
+def get_cached_summary(cache_key, pdf_hash):
+    """Return the cached /summarize body if present and its images still exist on disk"""
+    cached = summary_cache.get(cache_key)
+    if cached is None:
+        return None
+    image_dir = IMAGE_FOLDER / pdf_hash
+    if all((image_dir / Path(url).name).exists() for url in cached.get("images", [])):
+        return cached
+    summary_cache.invalidate(cache_key)
+    return None
+
+
+async def summarize_cached(file_path, pdf_hash, is_detailed, include_citations, emit=None):
+    """
+    The /summarize body for a saved upload: from the cache, from an identical
+    summarization already running, or from a new run that is then cached.
+    Never removes file_path: the caller owns its upload (a request deletes it
+    when it ends, a job only once it has succeeded, so a failed or
+    interrupted job is retried from it).
+    """
+    cache_key = make_cache_key(pdf_hash, is_detailed, include_citations, summarizer.model, summarizer.output_options())
+    # Disk reads, writes and evictions: kept off the event loop like the other blocking work here
+    content = await asyncio.to_thread(get_cached_summary, cache_key, pdf_hash)
+    if content is not None:
+        print(f"[✓] Cache hit for {pdf_hash[:12]}")
+        return content
+
+    async def compute(emit):
+        # A run for this key may have finished between the cache check and joining
+        content = await asyncio.to_thread(get_cached_summary, cache_key, pdf_hash)
+        if content is not None:
+            return content
+        # The flight reads its own link to the leader's upload, so it keeps going for the
+        # other callers when the leader goes away and deletes its file
+        flight_path = await asyncio.to_thread(link_upload, file_path, UPLOAD_FOLDER)
+        try:
+            content = await run_summarize_pipeline(flight_path, pdf_hash, is_detailed, include_citations, emit=emit)
+        finally:
+            if os.path.exists(flight_path):
+                os.remove(flight_path)
+        await asyncio.to_thread(summary_cache.put, cache_key, content)
+        return content
 
-    return text
+    return await summary_flights.run(cache_key, compute, emit=emit)
 
 
 @app.post("/summarize")
@@ -74,70 +254,254 @@ async def summarize_pdf_endpoint(
     file: UploadFile = File(...),
     detailed: str = Form("false"),
     citations: str = Form("false"),
+    mode: str = Form("full"),
     current_user: Optional[UserInfo] = None  # Made optional to allow anonymous usage
 ):
+    """
+    Summarize an uploaded PDF. mode="full" (default) runs the LLM pipeline;
+    mode="fast" returns a local extractive summary in the same shape, without
+    calling OpenAI.
+    """
+    if mode not in SUMMARY_MODES:
+        return JSONResponse(content={"error": f"Unknown mode {mode!r}. Choose from: {', '.join(SUMMARY_MODES)}"},
+                            status_code=400)
     try:
         # Convert string values to booleans
         is_detailed = detailed.lower() == "true"
         include_citations = citations.lower() == "true"
         
-        # Create temporary file path
-        file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        
-        # Save the uploaded file
-        with open(file_path, 'wb') as f:
-            f.write(await file.read())
-        
-        # Process the PDF to generate summary
-        result = summarizer.summarize_pdf(
-            file_path, 
-            chunk_method="sentence",
-            parallel=True,
-            detailed=is_detailed,
-            include_citations=include_citations
-        )
+        # Stream the upload to a unique temporary file, hashing it on the way
+        upload = await save_upload(file, UPLOAD_FOLDER)
+        file_path, pdf_hash = upload.path, upload.sha256
 
-        #extracting images
-        image_files = extract_images(str(file_path), str(IMAGE_FOLDER))
-        image_urls = [f"/images/{name}" for name in image_files]
-        
-        # Extract keywords & references from cleaned text
-        keywords = []
-        references = []
+        if mode == "fast":
+            # Local and sub-second, so neither cached nor queued behind LLM work
+            try:
+                content = await run_fast_summarize_pipeline(file_path, pdf_hash, is_detailed, include_citations)
+            finally:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            return JSONResponse(content=content)
+
+        # Repeat uploads of the same paper with the same options are served from the
+        # cache, or share the run already in progress
+        try:
+            content = await summarize_cached(file_path, pdf_hash, is_detailed, include_citations)
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        return JSONResponse(content=content)
+
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except Exception as e:
+        print(f"[!] Error in /summarize: {str(e)}")
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@app.post("/summarize/stream")
+async def summarize_pdf_stream_endpoint(
+    file: UploadFile = File(...),
+    detailed: str = Form("false"),
+    citations: str = Form("false")
+):
+    """
+    Server-Sent Events version of /summarize. Emits "extracted", "chunk",
+    "references", "keywords", "images" and "summary_delta" events as work
+    progresses, then "done" with the same body /summarize returns (or "error").
+    """
+    is_detailed = detailed.lower() == "true"
+    include_citations = citations.lower() == "true"
+
+    # Save the upload before streaming starts; the request body is gone once the response begins
+    try:
+        upload = await save_upload(file, UPLOAD_FOLDER)
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    file_path, pdf_hash = upload.path, upload.sha256
+
+    async def event_stream():
+        queue = asyncio.Queue()
 
+        async def emit(event, data):
+            await queue.put((event, data))
+
+        async def run():
+            try:
+                content = await summarize_cached(file_path, pdf_hash, is_detailed, include_citations, emit=emit)
+                await emit("done", content)
+            except Exception as e:
+                print(f"[!] Error in /summarize/stream: {str(e)}")
+                await emit("error", {"error": str(e)})
+            finally:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                await queue.put(None)
+
+        task = asyncio.create_task(run())
         try:
-            with open(file_path, 'rb') as f:
-                raw_text = summarizer.extract_text_from_pdf(file_path)
-                clean_text = clean_pdf_text(raw_text)
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # Client went away: stop spending on a result nobody will read
+            if not task.done():
+                task.cancel()
 
-                keywords = summarizer.extract_keywords(clean_text)
-                references = summarizer.extract_references(clean_text)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-                # Optional: Debug print
-                print(f"[DEBUG] Extracted {len(references)} references")
-        
+
+async def run_summarize_job(job):
+    """Job handler for "summarize" jobs queued by POST /jobs/summarize"""
+    params = job["params"]
+    file_path = params["file_path"]
+    cache_key = make_cache_key(params["pdf_hash"], params["detailed"], params["citations"], summarizer.model,
+                               summarizer.output_options())
+
+    cached = await asyncio.to_thread(get_cached_summary, cache_key, params["pdf_hash"])
+    if cached is None and cache_key not in summary_flights and not os.path.exists(file_path):
+        raise FileNotFoundError("Uploaded PDF for this job is no longer available")
+    # Queued work yields to interactive and in-request LLM calls
+    with priority_scope(BACKGROUND):
+        content = await summarize_cached(file_path, params["pdf_hash"], params["detailed"], params["citations"])
+
+    # Only once the result is cached: a failed or interrupted attempt is retried from this upload
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    return content
+
+
+def discard_job_upload(job):
+    """Failure callback for "summarize" jobs: the upload is only kept around for retries"""
+    file_path = job["params"]["file_path"]
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
+job_queue.register("summarize", run_summarize_job, on_failure=discard_job_upload)
+
+
+@app.on_event("startup")
+async def check_tokenizer_cache():
+    # Imported here so the tokenizer stays out of `import main` (see benchmarks.bench_startup)
+    from services.tokenizer import check_encoder_cache
+
+    # Refuse to start rather than download BPE files (or fail) on the first summarization
+    check_encoder_cache()
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+
+warmup_tasks: List[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def start_warmup():
+    async def warm(name):
+        started = time.perf_counter()
+        try:
+            with stage_timer(f"warmup_{name}"):
+                await asyncio.to_thread(WARMUP_HOOKS[name])
+            print(f"[✓] Warmed up {name} in {time.perf_counter() - started:.2f}s")
         except Exception as e:
-            print(f"[!] Error extracting keywords/references: {str(e)}")
-        
-        # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+            # The subsystem will load (or fail loudly) on first use instead
+            print(f"[!] Warm-up of {name} failed: {e}")
 
-        
-        
-        return JSONResponse(content={
-            "summary": result['summary'], 
-            "references": result['references'], 
-            "referenceCount": result['reference_count'],
-            "hasCitations": include_citations,
-            "keywords": keywords
+    # Not awaited: the server accepts requests while these load (the list keeps the tasks alive)
+    warmup_tasks.extend(asyncio.create_task(warm(name)) for name in WARMUP)
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+
+@app.post("/jobs/summarize", status_code=202)
+async def enqueue_summarize_job(
+    file: UploadFile = File(...),
+    detailed: str = Form("false"),
+    citations: str = Form("false")
+):
+    """
+    Queue a summarization and return its job id immediately.
+    Poll GET /jobs/{job_id} for status and the /summarize result body.
+    """
+    try:
+        upload = await save_upload(file, JOB_UPLOAD_FOLDER)
+
+        job_id = await job_queue.submit("summarize", {
+            "file_path": str(upload.path),
+            "filename": upload.filename,
+            "pdf_hash": upload.sha256,
+            "detailed": detailed.lower() == "true",
+            "citations": citations.lower() == "true"
         })
+        return {"job_id": job_id, "status": "queued"}
 
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
     except Exception as e:
-        print(f"[!] Error in /summarize: {str(e)}")
+        print(f"[!] Error in /jobs/summarize: {str(e)}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
-    
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status of a queued job: queued, running, succeeded (with result) or failed (with error)
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Prometheus metrics: per-stage latency histograms, LLM call latency and tokens, cache hits, retries and errors
+    """
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/llm/stats")
+async def llm_stats_endpoint():
+    """
+    Rate budgets, queue depth and wait times of the LLM scheduler per model and priority
+    """
+    return llm_scheduler.stats()
+
+
+@app.get("/cache/stats")
+async def cache_stats_endpoint():
+    """
+    Hit/miss counters and occupancy of the /summarize result cache and the chunk summary cache
+    """
+    return {
+        "summaries": summary_cache.stats(),
+        "chunks": chunk_cache.stats()
+    }
+
+
 @app.post("/generate-visuals-video")
 async def generate_visuals_video_endpoint(
     file: UploadFile = File(...),
@@ -148,10 +512,7 @@ async def generate_visuals_video_endpoint(
         # Save uploaded PDF
         pdf_id = str(uuid.uuid4())
         pdf_filename = f"{pdf_id}.pdf"
-        pdf_path = UPLOAD_FOLDER / pdf_filename
-
-        with open(pdf_path, "wb") as f:
-            f.write(await file.read())
+        pdf_path = (await save_upload(file, UPLOAD_FOLDER, name=pdf_filename)).path
 
         print(f"[✓] Saved PDF: {pdf_path}")
 
@@ -194,6 +555,8 @@ async def generate_visuals_video_endpoint(
             "video_name": video_filename
         }
 
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
     except Exception as e:
         print(f"[!] Error in /generate-visuals-video: {str(e)}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -259,16 +622,16 @@ async def generate_audio(req: AudioRequest):
             try:
                 print(f"[DEBUG] Attempting TTS generation (attempt {attempt + 1}/{max_retries})")
                 
-                # Create gTTS object with explicit language and slow=False for better reliability
-                tts = gTTS(text=summary, lang='en', slow=False)
-                tts.save(audio_path)
-                
-                # Verify the file was created and has content
-                if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                    print(f"[✓] TTS generation successful on attempt {attempt + 1}")
-                    break
-                else:
-                    raise Exception("Generated audio file is empty or corrupted")
+                with stage_timer("tts"):
+                    # Create gTTS object with explicit language and slow=False for better reliability
+                    tts = gTTS(text=summary, lang='en', slow=False)
+                    tts.save(audio_path)
+                    
+                    # Verify the file was created and has content
+                    if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
+                        raise Exception("Generated audio file is empty or corrupted")
+                print(f"[✓] TTS generation successful on attempt {attempt + 1}")
+                break
                 
             except Exception as e:
                 error_msg = str(e)
@@ -287,6 +650,7 @@ async def generate_audio(req: AudioRequest):
                     specific_error = f"TTS generation error: {error_msg}"
                 
                 if attempt < max_retries - 1:
+                    record_retry("tts")
                     print(f"[DEBUG] Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
@@ -355,7 +719,8 @@ class ChatRequest(BaseModel):
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     try:
-        result = chatbot.refine_summary(
+        result = await asyncio.to_thread(
+            chatbot.refine_summary,
             original_summary=request.summary,
             user_request=request.user_message,
             chat_history=request.chat_history,
@@ -380,7 +745,8 @@ class QuestionRequest(BaseModel):
 @app.post("/answer-question")
 async def answer_question_endpoint(request: QuestionRequest):
     try:
-        result = chatbot.answer_question(
+        result = await asyncio.to_thread(
+            chatbot.answer_question,
             summary=request.summary,
             user_question=request.user_question,
             chat_history=request.chat_history,
@@ -503,10 +869,7 @@ async def generate_visuals_video_authenticated(
         # Save uploaded PDF
         pdf_id = str(uuid.uuid4())
         pdf_filename = f"{pdf_id}.pdf"
-        pdf_path = UPLOAD_FOLDER / pdf_filename
-
-        with open(pdf_path, "wb") as f:
-            f.write(await file.read())
+        pdf_path = (await save_upload(file, UPLOAD_FOLDER, name=pdf_filename)).path
 
         print(f"[✓] Saved PDF: {pdf_path}")
 
@@ -655,6 +1018,8 @@ async def generate_visuals_video_authenticated(
             "display_name": display_name
         }
 
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
     except Exception as e:
         total_time = time.time() - start_time
         print(f"[!] Error in /generate-visuals-video-auth: {str(e)}")
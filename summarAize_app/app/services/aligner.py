@@ -3,10 +3,13 @@ from aeneas.executetask import ExecuteTask
 from pathlib import Path
 import uuid
 
+from services.metrics import timed
+
 GENERATED = Path(__file__).resolve().parent.parent / "generated_audios"
 ALIGN_DIR = GENERATED / "alignments"
 ALIGN_DIR.mkdir(parents=True, exist_ok=True)
 
+@timed("alignment")
 def align(audio_path: Path, text_path: Path, lang: str = "eng") -> Path:
     """
     Run Aeneas forced alignment and return JSON path.
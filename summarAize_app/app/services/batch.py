@@ -0,0 +1,254 @@
+"""
+Batch summarization of many PDFs across a process pool, with JSONL output
+and a resumable manifest
+"""
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from services.extractive import PREFILTER_KEEP_RATIO, PREFILTER_MAX_TOKENS, prefilter_options
+from services.llm_scheduler import SUMMARIZER_MODEL
+from services.summary_cache import hash_file, make_cache_key
+from services.summary_context import SummaryContext
+from services.tokenizer import check_encoder_cache
+
+DONE = "done"
+FAILED = "failed"
+
+# Per-process state, set up once by _init_worker
+_summarizer = None
+_options: Dict[str, Any] = {}
+
+
+def collect_pdfs(sources: Iterable[str]) -> List[str]:
+    """
+    Expand the batch inputs into a de-duplicated, ordered list of PDF paths.
+    Each source may be a directory (searched recursively), a glob pattern, a
+    PDF, or a list file with one path per line ('#' starts a comment).
+    """
+    paths: List[str] = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(str(p) for p in Path(source).rglob("*") if p.suffix.lower() == ".pdf"))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source, recursive=True)))
+        elif source.lower().endswith(".pdf"):
+            paths.append(source)
+        else:
+            base = os.path.dirname(os.path.abspath(source))
+            with open(source, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.split("#", 1)[0].strip()
+                    if line:
+                        paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+
+    seen: Set[str] = set()
+    unique = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+
+def load_manifest(manifest_path) -> Set[str]:
+    """Keys of the documents a previous run finished. A torn last line is ignored."""
+    done: Set[str] = set()
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("status") == DONE:
+                done.add(entry["key"])
+    return done
+
+
+def _append_line(f, record: Dict[str, Any]):
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _init_worker(options: Dict[str, Any], llm_slots, processes: int):
+    """Build one summarizer per worker process, so tiktoken and the OpenAI client load once."""
+    global _summarizer, _options
+    from services.llm_scheduler import llm_scheduler
+    from textSummarize import PdfSummarizer
+
+    # Every worker gets an equal share of the per-model rate budgets
+    llm_scheduler.share(processes)
+    _options = options
+    _summarizer = PdfSummarizer(
+        api_key=options["api_key"],
+        model=options["model"],
+        max_workers=options["max_workers"],
+        pdf_backend=options["pdf_backend"],
+        llm_slots=llm_slots,
+        prefilter_ratio=options["prefilter_ratio"],
+        prefilter_tokens=options["prefilter_tokens"]
+    )
+
+
+def _summarize_one(path: str, sha256: str, key: str) -> Dict[str, Any]:
+    """Summarize a single PDF in a worker process and return its output record."""
+    context = SummaryContext()
+    start = time.perf_counter()
+    result = _summarizer.summarize_pdf(
+        path,
+        chunk_method=_options["chunk_method"],
+        detailed=_options["detailed"],
+        include_citations=_options["include_citations"],
+        context=context
+    )
+    return {
+        "path": path,
+        "sha256": sha256,
+        "key": key,
+        "model": _options["model"],
+        "detailed": _options["detailed"],
+        "summary": result["summary"],
+        "references": result["references"],
+        "reference_count": result["reference_count"],
+        "tokens": context.tokens_used,
+        "elapsed_s": round(time.perf_counter() - start, 3)
+    }
+
+
+def run_batch(sources: Iterable[str], output_path, manifest_path=None, processes: Optional[int] = None,
+              llm_concurrency: int = 16, api_key: Optional[str] = None, model: str = SUMMARIZER_MODEL,
+              chunk_method: str = "sentence", detailed: bool = False, include_citations: bool = False,
+              max_workers: int = 5, pdf_backend: Optional[str] = None, prefilter_ratio: Optional[float] = None,
+              prefilter_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize every PDF in sources and append one JSON record per document to output_path.
+
+    Progress is recorded in manifest_path (default: <output>.manifest.jsonl)
+    after each result is durably written, so re-running the same command
+    skips the documents that already finished; failed documents are retried.
+    Documents are keyed by content hash and summarization options, so a
+    changed file or option is processed again, and copies of one document
+    under several paths are summarized once (one record per path).
+    llm_concurrency caps the LLM requests in flight across all worker
+    processes. Returns run statistics.
+    """
+    processes = processes or os.cpu_count() or 1
+    manifest_path = manifest_path or f"{output_path}.manifest.jsonl"
+    options = {
+        "api_key": api_key or os.environ.get("OPENAI_API_KEY"),
+        "model": model,
+        "chunk_method": chunk_method,
+        "detailed": detailed,
+        "include_citations": include_citations,
+        "max_workers": max_workers,
+        "pdf_backend": pdf_backend,
+        "prefilter_ratio": PREFILTER_KEEP_RATIO if prefilter_ratio is None else prefilter_ratio,
+        "prefilter_tokens": PREFILTER_MAX_TOKENS if prefilter_tokens is None else prefilter_tokens
+    }
+    if not options["api_key"]:
+        raise ValueError("OpenAI API key not found")
+    # Fail before spawning workers rather than in each of them
+    check_encoder_cache([model])
+
+    done = load_manifest(manifest_path)
+    pending = []
+    # Further paths with the same content and options as a pending document, by key:
+    # summarized once, with one output record per path
+    duplicates: Dict[str, List[str]] = {}
+    skipped = 0
+    for path in collect_pdfs(sources):
+        try:
+            sha256 = hash_file(path)
+        except OSError as e:
+            print(f"[!] Skipping unreadable {path}: {e}", file=sys.stderr)
+            continue
+        key = make_cache_key(sha256, detailed, include_citations, model,
+                             prefilter_options(options["prefilter_ratio"], options["prefilter_tokens"]))
+        if key in done:
+            skipped += 1
+        elif key in duplicates:
+            duplicates[key].append(path)
+        else:
+            duplicates[key] = []
+            pending.append((path, sha256, key))
+    coalesced = sum(len(paths) for paths in duplicates.values())
+    print(f"{len(pending)} PDFs to summarize ({skipped} already done, {coalesced} duplicates)")
+
+    stats = {"total": len(pending) + coalesced + skipped, "skipped": skipped, "coalesced": coalesced,
+             "succeeded": 0, "failed": 0, "tokens": 0}
+    if not pending:
+        return stats
+
+    # spawn, not fork: workers build their own OpenAI clients and threads
+    context = multiprocessing.get_context("spawn")
+    llm_slots = context.BoundedSemaphore(llm_concurrency)
+    processes = min(processes, len(pending))
+    start = time.perf_counter()
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as output, \
+            open(manifest_path, "a", encoding="utf-8") as manifest, \
+            ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=_init_worker,
+                                initargs=(options, llm_slots, processes)) as pool:
+        queue = iter(pending)
+        in_flight = {}
+
+        def submit_next():
+            item = next(queue, None)
+            if item is not None:
+                in_flight[pool.submit(_summarize_one, *item)] = item
+
+        # Keep a small window queued per worker rather than submitting thousands of futures up front
+        for _ in range(processes * 2):
+            submit_next()
+
+        try:
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path, sha256, key = in_flight.pop(future)
+                    try:
+                        record = future.result()
+                    except BrokenProcessPool:
+                        # A worker died (or failed to start); nothing more can run in this pool
+                        raise
+                    except Exception as e:
+                        stats["failed"] += 1
+                        _append_line(manifest, {"key": key, "path": path, "sha256": sha256, "status": FAILED, "error": str(e)})
+                        print(f"[!] {path}: {e}", file=sys.stderr)
+                    else:
+                        stats["succeeded"] += 1
+                        stats["tokens"] += record["tokens"]
+                        _append_line(output, record)
+                        # Copies of the same document share the result; the tokens were spent once
+                        for duplicate in duplicates[key]:
+                            _append_line(output, {**record, "path": duplicate, "tokens": 0, "coalesced": True})
+                        _append_line(manifest, {"key": key, "path": path, "sha256": sha256, "status": DONE, "tokens": record["tokens"]})
+
+                    minutes = (time.perf_counter() - start) / 60
+                    completed = stats["succeeded"] + stats["failed"]
+                    print(f"[{completed}/{len(pending)}] {os.path.basename(path)} | "
+                          f"{completed / minutes:.1f} docs/min | {stats['tokens'] / minutes:,.0f} tokens/min")
+                    submit_next()
+        except KeyboardInterrupt:
+            print("Interrupted; re-run the same command to resume", file=sys.stderr)
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    minutes = (time.perf_counter() - start) / 60
+    stats["elapsed_s"] = round(minutes * 60, 3)
+    stats["docs_per_min"] = (stats["succeeded"] + stats["failed"]) / minutes if minutes else 0.0
+    stats["tokens_per_min"] = stats["tokens"] / minutes if minutes else 0.0
+    return stats
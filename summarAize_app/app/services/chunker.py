@@ -0,0 +1,138 @@
+"""
+Token-aware text chunker that tokenizes a document exactly once
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence, Tuple
+
+# Sentence breaks are searched in the UTF-8 bytes so they line up with token byte offsets
+_SENTENCE_BREAK = re.compile(rb'(?<=[.!?])\s+')
+
+
+class TokenChunker:
+    """
+    Splits text into chunks of at most chunk_tokens tokens.
+
+    The text is encoded once; every token's byte offset is derived from that
+    single pass and sentence boundaries are mapped onto token indices with a
+    binary search, so chunking is linear in the document size. Chunks are
+    produced as (start_token, end_token) ranges and only turned into text by
+    slicing the original bytes.
+
+    method="sentence" packs whole sentences (hard-splitting any sentence that is
+    longer than a chunk on its own); method="token" cuts at fixed token
+    positions. Both repeat up to overlap tokens at the start of the next chunk,
+    the sentence method rounding the overlap to whole sentences.
+    """
+
+    def __init__(self, encoding, chunk_tokens: int, overlap: int = 0):
+        if chunk_tokens <= 0:
+            raise ValueError("chunk_tokens must be positive")
+        self.encoding = encoding
+        self.chunk_tokens = chunk_tokens
+        self.overlap = max(0, min(overlap, chunk_tokens - 1))
+
+    def chunk_ranges(self, text: str, method: str = "sentence", tokens: Optional[Sequence[int]] = None) -> Tuple[List[Tuple[int, int]], List[int], bytes]:
+        """
+        Return (ranges, byte_offsets, data): token ranges for each chunk, the
+        byte offset of every token boundary (len(tokens) + 1 entries) and the
+        UTF-8 bytes the offsets index into.
+        """
+        if tokens is None:
+            tokens = self.encoding.encode(text)
+
+        token_bytes = self.encoding.decode_tokens_bytes(tokens)
+        byte_offsets = list(accumulate((len(b) for b in token_bytes), initial=0))
+        data = text.encode("utf-8", errors="surrogatepass")
+        if byte_offsets[-1] != len(data):
+            # Text that does not round-trip (e.g. lone surrogates): index the token bytes instead
+            data = b"".join(token_bytes)
+
+        n_tokens = len(tokens)
+        if n_tokens <= self.chunk_tokens:
+            return [(0, n_tokens)], byte_offsets, data
+
+        if method == "sentence":
+            ranges = self._sentence_ranges(data, byte_offsets, n_tokens)
+        else:
+            ranges = self._token_ranges(n_tokens)
+        return ranges, byte_offsets, data
+
+    def split(self, text: str, method: str = "sentence", tokens: Optional[Sequence[int]] = None) -> List[str]:
+        """Return the chunk texts for text."""
+        ranges, byte_offsets, data = self.chunk_ranges(text, method, tokens)
+        if len(ranges) == 1:
+            return [text]
+
+        chunks = []
+        for start, end in ranges:
+            chunk = data[byte_offsets[start]:byte_offsets[end]].decode("utf-8", errors="replace")
+            if method == "sentence":
+                chunk = chunk.strip()
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def _token_ranges(self, n_tokens: int) -> List[Tuple[int, int]]:
+        step = self.chunk_tokens - self.overlap
+        ranges = []
+        start = 0
+        while True:
+            end = min(start + self.chunk_tokens, n_tokens)
+            ranges.append((start, end))
+            if end == n_tokens:
+                return ranges
+            start += step
+
+    def _sentence_ranges(self, data: bytes, byte_offsets: List[int], n_tokens: int) -> List[Tuple[int, int]]:
+        # Token index at which each sentence starts; a break inside a token snaps to that token's start
+        boundaries = [0]
+        for match in _SENTENCE_BREAK.finditer(data):
+            index = bisect_right(byte_offsets, match.end()) - 1
+            if index > boundaries[-1]:
+                boundaries.append(index)
+        if boundaries[-1] != n_tokens:
+            boundaries.append(n_tokens)
+
+        ranges = []
+        i = 0  # index into boundaries of the current chunk start
+        covered = 0  # index into boundaries up to which text has been emitted
+        last = len(boundaries) - 1
+        while i < last:
+            start = boundaries[i]
+            limit = start + self.chunk_tokens
+
+            # Furthest sentence boundary that still fits in this chunk
+            j = bisect_right(boundaries, limit, lo=i + 1) - 1
+            if j <= covered and i < covered:
+                # The overlap leaves no room for the next sentence: drop it for this chunk
+                i = covered
+                continue
+            if j == i:
+                # A single sentence longer than a chunk: hard split it at token positions
+                sentence_end = boundaries[i + 1]
+                ranges.append((start, limit))
+                split_start = limit - self.overlap
+                while sentence_end - split_start > self.chunk_tokens:
+                    ranges.append((split_start, split_start + self.chunk_tokens))
+                    split_start += self.chunk_tokens - self.overlap
+                ranges.append((split_start, sentence_end))
+                i += 1
+                covered = i
+                continue
+
+            end = boundaries[j]
+            ranges.append((start, end))
+            covered = j
+            if j == last:
+                break
+
+            # Start the next chunk at the earliest sentence that keeps the overlap within budget
+            next_i = j
+            if self.overlap:
+                k = bisect_right(boundaries, end - self.overlap - 1, lo=i + 1, hi=j)
+                next_i = max(k, i + 1)
+            i = next_i
+
+        return ranges
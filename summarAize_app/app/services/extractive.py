@@ -0,0 +1,194 @@
+"""
+Local extractive scoring of a document's sentences with TF-IDF and TextRank
+
+Sentences become rows of a sparse TF-IDF matrix kept as NumPy coordinate
+arrays. TextRank runs power iteration over the sentence-similarity graph
+without ever building the N x N matrix: S @ v is computed as X @ (X.T @ v),
+so each iteration is O(non-zeros). Used to cut boilerplate, proofs and data
+tables before the map step (select_sentences).
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Keep this fraction of the document's tokens before chunking (1 disables the prefilter)
+PREFILTER_KEEP_RATIO = float(os.getenv("PREFILTER_KEEP_RATIO", "1"))
+# Optional cap on the tokens kept by the prefilter (0 = no cap)
+PREFILTER_MAX_TOKENS = int(os.getenv("PREFILTER_MAX_TOKENS", "0"))
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+# Words of two or more letters; numbers and symbols carry no topical weight
+_WORD = re.compile(r"[A-Za-z][A-Za-z\-]+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each et al few for from further had has have having he her
+here hers him his how however i if in into is it its itself just may me might more most must my no nor not now
+of off on once one only or other our ours out over own same she should so some such than that the their theirs
+them then there these they this those through thus to too two under until up upon us use used using very via was
+we were what when where which while who whom why will with within without would yet you your
+""".split())
+
+
+@dataclass
+class SentenceScores:
+    sentences: List[str]
+    # Spans of each sentence in the scored text
+    spans: List[Tuple[int, int]]
+    # Combined score in [0, 1], higher is more central
+    scores: np.ndarray
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """(start, end) spans of the sentences in text, split after . ! or ? followed by whitespace."""
+    spans = []
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    end = len(text.rstrip())
+    if end > start:
+        spans.append((start, end))
+    return spans
+
+
+def tfidf_matrix(sentences: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    L2-normalized TF-IDF rows for sentences as coordinate arrays (rows, cols,
+    values) plus the vocabulary. Term frequency is sublinear (1 + log count).
+    """
+    row_ids: List[int] = []
+    words: List[str] = []
+    for index, sentence in enumerate(sentences):
+        found = [word for word in _WORD.findall(sentence.lower()) if word not in STOP_WORDS]
+        words.extend(found)
+        row_ids.extend([index] * len(found))
+    if not words:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), []
+
+    vocabulary, term_ids = np.unique(np.array(words), return_inverse=True)
+    n_terms = len(vocabulary)
+    pairs, counts = np.unique(np.asarray(row_ids, dtype=np.int64) * n_terms + term_ids, return_counts=True)
+    rows, cols = np.divmod(pairs, n_terms)
+
+    document_frequency = np.bincount(cols, minlength=n_terms)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    values = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(sentences)))
+    values = values / norms[rows]
+    return rows, cols, values, vocabulary.tolist()
+
+
+def textrank(rows: np.ndarray, cols: np.ndarray, values: np.ndarray, n_sentences: int,
+             damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    PageRank over the cosine-similarity graph of the TF-IDF rows. Self-similarity
+    is excluded; sentences with no shared terms only get the teleport share.
+    """
+    n_terms = int(cols.max()) + 1 if len(cols) else 0
+
+    def similarity_times(vector):
+        # (X @ X.T - diag) @ vector, diag being each row's squared norm
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=n_terms)
+        product = np.bincount(rows, weights=values * projected[cols], minlength=n_sentences)
+        return product - self_similarity * vector
+
+    self_similarity = np.bincount(rows, weights=values ** 2, minlength=n_sentences)
+    degree = similarity_times(np.ones(n_sentences))
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(n_sentences), where=degree > 1e-12)
+
+    rank = np.full(n_sentences, 1.0 / n_sentences)
+    for _ in range(iterations):
+        updated = (1 - damping) / n_sentences + damping * similarity_times(rank * inverse_degree)
+        if np.abs(updated - rank).sum() < tolerance:
+            return updated
+        rank = updated
+    return rank
+
+
+def score_sentences(text: str, textrank_weight: float = 0.5) -> SentenceScores:
+    """
+    Score every sentence of text by a blend of its TextRank centrality and its
+    cosine similarity to the document's TF-IDF centroid, each scaled to [0, 1].
+    """
+    spans = split_sentences(text)
+    sentences = [text[start:end] for start, end in spans]
+    n_sentences = len(sentences)
+    if n_sentences == 0:
+        return SentenceScores(sentences, spans, np.zeros(0))
+
+    rows, cols, values, _ = tfidf_matrix(sentences)
+    if len(values) == 0:
+        return SentenceScores(sentences, spans, np.zeros(n_sentences))
+
+    centroid = np.bincount(cols, weights=values) / n_sentences
+    centroid_similarity = np.bincount(rows, weights=values * centroid[cols], minlength=n_sentences)
+    centroid_similarity /= np.linalg.norm(centroid) or 1.0
+    ranks = textrank(rows, cols, values, n_sentences)
+
+    def scaled(array):
+        top = array.max()
+        return array / top if top > 0 else array
+
+    scores = textrank_weight * scaled(ranks) + (1 - textrank_weight) * scaled(centroid_similarity)
+    return SentenceScores(sentences, spans, scores)
+
+
+def prefilter_options(keep_ratio: float, max_tokens: Optional[int]) -> Dict[str, Any]:
+    """Cache-key fields describing a prefilter setting (empty when the prefilter is off)."""
+    if keep_ratio >= 1 and not max_tokens:
+        return {}
+    return {"prefilter": [keep_ratio, max_tokens or 0]}
+
+
+def select_sentences(text: str, keep_ratio: float = PREFILTER_KEEP_RATIO, max_tokens: Optional[int] = None,
+                     encoding=None) -> str:
+    """
+    Keep text's highest-scoring sentences, up to keep_ratio of its tokens and
+    no more than max_tokens, joined in their original order. Tokens are
+    counted with encoding, or estimated at 4 characters each without one.
+    """
+    if max_tokens is None:
+        max_tokens = PREFILTER_MAX_TOKENS
+    if keep_ratio >= 1 and not max_tokens:
+        return text
+
+    scored = score_sentences(text)
+    if not scored.sentences:
+        return text
+
+    if encoding is not None:
+        lengths = np.array([len(tokens) for tokens in encoding.encode_ordinary_batch(scored.sentences)])
+    else:
+        lengths = np.array([len(sentence) // 4 + 1 for sentence in scored.sentences])
+    budget = lengths.sum() * min(keep_ratio, 1.0)
+    if max_tokens:
+        budget = min(budget, max_tokens)
+
+    # Best first (ties keep document order), always at least one sentence
+    order = np.argsort(-scored.scores, kind="stable")
+    within = np.cumsum(lengths[order]) <= budget
+    within[0] = True
+    keep = np.sort(order[within])
+    return " ".join(scored.sentences[i] for i in keep)
+
+
+def top_sentences(text: str, count: int, min_words: int = 6, max_words: int = 60) -> List[str]:
+    """
+    The count highest-scoring sentences of text in document order, skipping
+    fragments (headings, captions, table cells) and run-ons outside
+    min_words..max_words words.
+    """
+    scored = score_sentences(text)
+    if not scored.sentences:
+        return []
+    word_counts = np.array([len(sentence.split()) for sentence in scored.sentences])
+    eligible = (word_counts >= min_words) & (word_counts <= max_words)
+    scores = np.where(eligible, scored.scores, -1.0)
+    order = np.argsort(-scores, kind="stable")[:count]
+    return [scored.sentences[i] for i in np.sort(order[scores[order] >= 0])]
@@ -0,0 +1,52 @@
+"""
+Local extractive summary used by mode=fast: no network, no API key
+
+The summary is the most central sentences of the body text (the reference
+list is left out), picked by services.extractive; references come from the
+same local parsers the full pipeline tries first.
+"""
+from typing import Any, Dict, List
+
+from services.extractive import top_sentences
+from services.keywords import extract_keywords_local
+from services.references import (
+    find_in_text_citations, find_numbered_references, find_references_span, split_reference_entries,
+    strip_references_section
+)
+from services.text_normalizer import normalize_pdf_text
+
+FAST_SUMMARY_SENTENCES = 8
+FAST_SUMMARY_SENTENCES_DETAILED = 16
+# Sentences per paragraph of the summary
+_PARAGRAPH_SENTENCES = 4
+
+
+def local_references(text: str) -> List[str]:
+    """Reference list entries found without the LLM, with the same fallback messages as extract_references."""
+    span = find_references_span(text)
+    if span is not None:
+        references = split_reference_entries(text[span[1]:span[2]].strip())
+        if references:
+            return references
+    references = find_numbered_references(text)
+    if references:
+        return references
+    citations = find_in_text_citations(text)
+    if citations:
+        return [f"This document contains {len(citations)} in-text citations but no complete reference list was found."]
+    return ["No references were found in this document."]
+
+
+def fast_summary(text: str, detailed: bool = False) -> Dict[str, Any]:
+    """Summarize text locally; returns the same fields as PdfSummarizer.summarize_pdf, plus its keywords."""
+    body = normalize_pdf_text(strip_references_section(text))
+    sentences = top_sentences(body,
+                              FAST_SUMMARY_SENTENCES_DETAILED if detailed else FAST_SUMMARY_SENTENCES)
+    paragraphs = [" ".join(sentences[i:i + _PARAGRAPH_SENTENCES]) for i in range(0, len(sentences), _PARAGRAPH_SENTENCES)]
+    references = local_references(text)
+    return {
+        "summary": "\n\n".join(paragraphs),
+        "references": references,
+        "reference_count": len(references),
+        "keywords": extract_keywords_local(body)
+    }
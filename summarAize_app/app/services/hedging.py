@@ -0,0 +1,177 @@
+"""
+Hedged LLM requests: if a call has not returned by an adaptive deadline, send
+the same request again and take whichever answer arrives first
+
+The deadline is a high percentile of the call's recent latencies, so only the
+slow tail is duplicated. Hedges are paid for out of a budget that earns
+LLM_HEDGE_BUDGET credits per request (e.g. 0.05 allows at most one hedge per
+20 requests), which caps the extra spend even when every call is slow.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from services.metrics import record_hedge
+
+# Extra requests allowed per request sent (0 disables hedging)
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0"))
+# Hedge a call once it has taken longer than this percentile of recent calls
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Latencies needed before the percentile is trusted; no hedging until then
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Never hedge earlier than this many seconds into a call
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+
+_WINDOW = 200
+# Unused budget saved up for a burst of slow calls, in hedges
+_MAX_CREDIT = 10.0
+
+
+class HedgePolicy:
+    """
+    Latency window and hedge budget per call type ("chunk", ...), shared by
+    every summarizer in the process.
+    """
+
+    def __init__(self, budget: float = LLM_HEDGE_BUDGET, percentile: float = LLM_HEDGE_PERCENTILE,
+                 min_samples: int = LLM_HEDGE_MIN_SAMPLES, min_delay: float = LLM_HEDGE_MIN_DELAY):
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._credit: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def observe(self, call: str, seconds: float):
+        """Record the latency of one completed attempt."""
+        with self._lock:
+            self._latencies.setdefault(call, deque(maxlen=_WINDOW)).append(seconds)
+
+    def deadline(self, call: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while there are too few samples."""
+        with self._lock:
+            window = self._latencies.get(call)
+            if window is None or len(window) < max(1, self.min_samples):
+                return None
+            samples = np.fromiter(window, dtype=float, count=len(window))
+        return max(self.min_delay, float(np.percentile(samples, self.percentile)))
+
+    def expected_remaining(self, call: str, elapsed: float) -> float:
+        """Mean extra time recent calls slower than elapsed needed beyond it (0 if none were)."""
+        with self._lock:
+            window = self._latencies.get(call)
+            samples = np.fromiter(window, dtype=float, count=len(window)) if window else np.zeros(0)
+        slower = samples[samples > elapsed]
+        return float(slower.mean() - elapsed) if len(slower) else 0.0
+
+    def earn(self, call: str):
+        """Credit the budget for one request sent."""
+        with self._lock:
+            self._credit[call] = min(_MAX_CREDIT, self._credit.get(call, 0.0) + self.budget)
+
+    def spend(self, call: str) -> bool:
+        """Take one hedge from the budget; False if it cannot afford one."""
+        with self._lock:
+            if self._credit.get(call, 0.0) < 1:
+                return False
+            self._credit[call] -= 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {}
+            for call, window in self._latencies.items():
+                calls[call] = {"samples": len(window), "credit": self._credit.get(call, 0.0)}
+        for call in calls:
+            calls[call]["deadline_s"] = self.deadline(call)
+        return {"budget": self.budget, "percentile": self.percentile, "calls": calls}
+
+    async def run(self, call: str, attempt: Callable[[Callable[[], None]], Awaitable[Any]]) -> Any:
+        """
+        Await attempt(sent), starting a second attempt if the first outlives
+        the deadline and the budget allows. The first to succeed wins and the
+        other is cancelled; if one fails, the other's result is still used.
+
+        attempt calls sent() once its request has been admitted by the
+        concurrency and rate limits, right before sending it. Latencies and
+        the deadline run from there, so a call still queued is never hedged
+        and its queueing time stays out of the window.
+        """
+        if not self.enabled:
+            return await attempt(lambda: None)
+        self.earn(call)
+        record_hedge(call, "request")
+        deadline = self.deadline(call)
+        started = time.perf_counter()
+        sent: Dict[str, float] = {}
+        primary_sent = asyncio.Event()
+
+        def mark_primary():
+            sent["primary"] = time.perf_counter()
+            primary_sent.set()
+
+        def mark_hedge():
+            sent["hedge"] = time.perf_counter()
+
+        primary = asyncio.ensure_future(attempt(mark_primary))
+        hedge = None
+        pending = {primary}
+        try:
+            if deadline is not None:
+                admitted = asyncio.ensure_future(primary_sent.wait())
+                try:
+                    await asyncio.wait({primary, admitted}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    admitted.cancel()
+                if not primary.done():
+                    await asyncio.wait(pending, timeout=deadline)
+                if not primary.done():
+                    if self.spend(call):
+                        record_hedge(call, "issued")
+                        hedge = asyncio.ensure_future(attempt(mark_hedge))
+                        pending.add(hedge)
+                    else:
+                        record_hedge(call, "over_budget")
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if not succeeded:
+                    if not pending:
+                        raise next(iter(done)).exception()
+                    continue
+                winner = primary if primary in succeeded else succeeded[0]
+                now = time.perf_counter()
+                if winner is primary:
+                    self.observe(call, now - sent.get("primary", started))
+                    if hedge is not None:
+                        record_hedge(call, "primary_won")
+                else:
+                    self.observe(call, now - sent.get("hedge", started))
+                    # The primary was still running: estimate how much longer it would have taken
+                    record_hedge(call, "hedge_won",
+                                 self.expected_remaining(call, now - sent.get("primary", started)))
+                return winner.result()
+        finally:
+            # A primary cut off past its deadline (the hedge won, or the caller gave up) is
+            # at least that slow; leaving it out would pull the percentile down
+            if primary in pending and "primary" in sent and deadline is not None:
+                elapsed = time.perf_counter() - sent["primary"]
+                if elapsed >= deadline:
+                    self.observe(call, elapsed)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+hedge_policy = HedgePolicy()
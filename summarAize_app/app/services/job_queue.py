@@ -0,0 +1,330 @@
+"""
+Durable background job queue for summarization, persisted in SQLite
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import record_error, record_retry
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A running job whose owner has not renewed its lease for this long is taken to be orphaned
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def make_owner_id() -> str:
+    """host:pid:nonce identifying one queue instance (the nonce tells restarts that reuse a pid apart)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _owner_gone(owner: Optional[str]) -> bool:
+    """True when owner is known to be dead: a process on this host that no longer exists."""
+    if not owner:
+        return True
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+        return False  # another replica, or this process: only its lease can tell
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+class JobStore:
+    """SQLite-backed job table. All methods are blocking and thread-safe."""
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    heartbeat REAL
+                )
+                """
+            )
+            # Databases created before leases existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def create(self, kind: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), now, now)
+            )
+        return job_id
+
+    def claim_next(self, owner: str) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running under owner's lease and return it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?, owner = ?, heartbeat = ? "
+                    "WHERE id = ?",
+                    (RUNNING, now, owner, now, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._row_to_job(row)
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        return job
+
+    def succeed(self, job_id: str, result: Dict[str, Any]):
+        self._finish(job_id, SUCCEEDED, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str, retry: bool = False):
+        self._finish(job_id, QUEUED if retry else FAILED, error=error)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def heartbeat(self, owner: str) -> int:
+        """Renew the lease on every job owner is running."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE status = ? AND owner = ?", (time.time(), RUNNING, owner)
+            )
+            return cursor.rowcount
+
+    def requeue_interrupted(self, max_attempts: int = JOB_MAX_ATTEMPTS, lease_seconds: float = JOB_LEASE_SECONDS,
+                            owner: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Put orphaned running jobs back in the queue, or fail them if they are
+        out of attempts. A job is orphaned when its owner is a dead process on
+        this host or its lease has expired; with owner given, that owner's
+        jobs are released instead (it is shutting down). Returns the number
+        requeued and the jobs failed.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if owner is not None:
+                    rows = self._conn.execute(
+                        "SELECT * FROM jobs WHERE status = ? AND owner = ?", (RUNNING, owner)
+                    ).fetchall()
+                else:
+                    rows = [
+                        row for row in self._conn.execute("SELECT * FROM jobs WHERE status = ?", (RUNNING,))
+                        if row["heartbeat"] is None or row["heartbeat"] < now - lease_seconds
+                        or _owner_gone(row["owner"])
+                    ]
+                failed = [row for row in rows if row["attempts"] >= max_attempts]
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ?, owner = NULL WHERE id = ?",
+                    [(FAILED, "Interrupted too many times", now, row["id"]) for row in failed]
+                )
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, updated_at = ?, owner = NULL WHERE id = ?",
+                    [(QUEUED, now, row["id"]) for row in rows if row["attempts"] < max_attempts]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows) - len(failed), [self._row_to_job(row) for row in failed]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "owner": row["owner"],
+            "heartbeat": row["heartbeat"]
+        }
+
+
+class JobQueue:
+    """
+    Pool of asyncio workers that drains a JobStore.
+
+    Handlers are registered per job kind and receive the job dict; whatever
+    they return is stored as the job result. A failing job is retried until
+    it has been attempted max_attempts times, after which the kind's
+    on_failure callback (if any) gets the job to clean up after it. Because
+    state lives in SQLite, jobs interrupted by a restart are picked up again:
+    jobs hold a lease this queue renews while running them, and any queue
+    requeues jobs whose lease expired or whose owner process is gone.
+    """
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 lease_seconds: float = JOB_LEASE_SECONDS, heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS):
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.owner = make_owner_id()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {}
+        self._on_failure: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 on_failure: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """on_failure (blocking, run in a thread) is called once a job of this kind has failed for good."""
+        self._handlers[kind] = handler
+        if on_failure is not None:
+            self._on_failure[kind] = on_failure
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        await self._requeue_orphaned()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand our unfinished jobs straight back instead of waiting for their lease to run out
+        await self._requeue_orphaned(owner=self.owner)
+
+    async def _requeue_orphaned(self, owner: Optional[str] = None):
+        requeued, failed = await asyncio.to_thread(
+            self.store.requeue_interrupted, self.max_attempts, self.lease_seconds, owner
+        )
+        if requeued:
+            print(f"[✓] Requeued {requeued} interrupted job(s)")
+            if self._wakeup is not None:
+                self._wakeup.set()
+        for job in failed:
+            print(f"[!] Job {job['id']} failed: {job['error']}")
+            record_error(f"job_{job['kind']}")
+            await self._failed(job)
+
+    async def _failed(self, job: Dict[str, Any]):
+        on_failure = self._on_failure.get(job["kind"])
+        if on_failure is None:
+            return
+        try:
+            await asyncio.to_thread(on_failure, job)
+        except Exception as e:
+            print(f"[!] Cleanup after job {job['id']} failed: {e}")
+
+    async def _heartbeat(self):
+        """Renew our leases and pick up jobs orphaned by other (crashed) queues."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await asyncio.to_thread(self.store.heartbeat, self.owner)
+                await self._requeue_orphaned()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[!] Job lease renewal failed: {e}")
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        job_id = await asyncio.to_thread(self.store.create, kind, params)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            # Cleared before claiming, so a submit() that lands meanwhile still wakes us
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next, self.owner)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            handler = self._handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind '{job['kind']}'")
+                result = await handler(job)
+                await asyncio.to_thread(self.store.succeed, job["id"], result)
+                print(f"[✓] Job {job['id']} finished")
+            except asyncio.CancelledError:
+                # Shutting down: leave the job running so requeue_interrupted picks it up next start
+                raise
+            except Exception as e:
+                retry = job["attempts"] < self.max_attempts
+                print(f"[!] Job {job['id']} failed (attempt {job['attempts']}/{self.max_attempts}): {e}")
+                if retry:
+                    record_retry(f"job_{job['kind']}")
+                else:
+                    record_error(f"job_{job['kind']}")
+                await asyncio.to_thread(self.store.fail, job["id"], str(e), retry)
+                if not retry:
+                    await self._failed(job)
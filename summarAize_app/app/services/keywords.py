@@ -0,0 +1,186 @@
+"""
+Local keyword extraction: RAKE candidate phrases ranked together with a
+TF-IDF weight computed over sections of the same document
+
+Candidates are runs of content words between stop words and punctuation
+(RAKE). Each phrase gets its RAKE score (sum of word degree / frequency)
+and a TF-IDF score in which the "documents" are equal-sized sections of
+the paper, so words spread evenly through every section ("results",
+"approach") are damped. Occurrence counts are NumPy arrays and all scoring
+is vectorized; a typical paper takes a few tens of milliseconds.
+
+Returns the same [{"keyword", "score", "explanation"}] schema as the LLM
+extractor in PdfSummarizer. KEYWORD_MODE picks how the two are combined:
+"fallback" (LLM, local when it fails; the default, so /summarize returns
+the same keywords as before), "primary" (local only, no LLM call) or
+"prefilter" (local candidates handed to the LLM to choose from). Both LLM
+modes fall back to the local result when the call fails or returns nothing.
+"""
+import os
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+from services.extractive import STOP_WORDS
+
+KEYWORD_MODES = ("primary", "fallback", "prefilter")
+KEYWORD_MODE = os.getenv("KEYWORD_MODE", "fallback")
+if KEYWORD_MODE not in KEYWORD_MODES:
+    raise ValueError(f"Unknown KEYWORD_MODE {KEYWORD_MODE!r}. Choose from: {', '.join(KEYWORD_MODES)}")
+# Candidate phrases offered to the LLM in "prefilter" mode
+KEYWORD_CANDIDATES = int(os.getenv("KEYWORD_CANDIDATES", "20"))
+
+# A word (letters, inner hyphens) or a single character that breaks a phrase
+_WORD_OR_BREAK = re.compile(r"[a-z](?:[a-z\-]*[a-z])?|[^a-z\s]")
+# Common in papers but never a keyword on their own
+_PAPER_WORDS = frozenset("""
+paper work approach method methods result results show shows shown table figure fig section et al proposed
+based propose new different first second number set given well large small high low also however respectively
+mean std author authors contributed performed university licence license creative commons arxiv preprint
+""".split())
+_MAX_PHRASE_WORDS = 3
+_SECTION_WORDS = 200
+_MAX_SECTIONS = 50
+
+
+def _stem(word: str) -> str:
+    """Fold plain plurals together ("networks" -> "network", but not "loss")."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _phrases(text: str):
+    """
+    Yield (word position, words) for each RAKE candidate: maximal runs of up to
+    _MAX_PHRASE_WORDS content words not broken by a stop word or punctuation.
+    """
+    run: List[str] = []
+    start = 0
+    position = 0
+    for match in _WORD_OR_BREAK.finditer(text):
+        token = match.group()
+        is_word = token[0].isalpha()
+        if is_word and token not in STOP_WORDS and token not in _PAPER_WORDS and len(token) > 2:
+            if not run:
+                start = position
+            run.append(token)
+            if len(run) == _MAX_PHRASE_WORDS:
+                yield start, run
+                run = []
+        elif run:
+            yield start, run
+            run = []
+        if is_word:
+            position += 1
+    if run:
+        yield start, run
+
+
+def _snippet(text: str, phrase: str, width: int = 120) -> str:
+    """The sentence around the first occurrence of phrase, clipped to width characters."""
+    # Matched in text itself (lower() can change its length), across any whitespace between the words
+    match = re.search(r"\s+".join(map(re.escape, phrase.split())), text, re.IGNORECASE)
+    if match is None:
+        return ""
+    index = match.start()
+    start = max(text.rfind(". ", 0, index) + 2, index - width // 2, 0)
+    # Never start mid-word
+    if start and not text[start - 1].isspace():
+        space = text.find(" ", start, index)
+        start = space + 1 if space >= 0 else index
+    end = text.find(". ", index)
+    end = min(end + 1 if end >= 0 else len(text), start + width)
+    snippet = " ".join(text[start:end].split())
+    return snippet if end >= len(text) or text[end - 1] == "." else snippet + "..."
+
+
+def extract_keywords_local(text: str, top_n: int = 8, rake_weight: float = 0.3) -> List[Dict[str, Any]]:
+    """
+    Rank candidate phrases of text by a blend of RAKE and section TF-IDF and
+    return the top_n as {"keyword", "score" (1-10), "explanation"}.
+    """
+    phrase_ids: Dict[tuple, int] = {}
+    surface_counts: List[Dict[str, int]] = []
+    word_ids: Dict[str, int] = {}
+    occurrence_phrase: List[int] = []
+    occurrence_position: List[int] = []
+    slot_word: List[int] = []
+    slot_occurrence: List[int] = []
+
+    for position, words in _phrases(text.lower()):
+        key = tuple(_stem(word) for word in words)
+        phrase = phrase_ids.setdefault(key, len(phrase_ids))
+        if phrase == len(surface_counts):
+            surface_counts.append({})
+        surface = " ".join(words)
+        surface_counts[phrase][surface] = surface_counts[phrase].get(surface, 0) + 1
+        occurrence = len(occurrence_phrase)
+        occurrence_phrase.append(phrase)
+        occurrence_position.append(position)
+        for stem in key:
+            slot_word.append(word_ids.setdefault(stem, len(word_ids)))
+            slot_occurrence.append(occurrence)
+    if not phrase_ids:
+        return []
+
+    n_phrases = len(phrase_ids)
+    occurrence_phrase = np.asarray(occurrence_phrase)
+    slot_word = np.asarray(slot_word)
+    slot_occurrence = np.asarray(slot_occurrence)
+    phrase_length = np.array([len(key) for key in phrase_ids])
+
+    # RAKE: a word's score is its degree (words it co-occurs with in phrases, itself included) over its frequency
+    frequency = np.bincount(slot_word, minlength=len(word_ids))
+    degree = np.bincount(slot_word, weights=phrase_length[occurrence_phrase[slot_occurrence]], minlength=len(word_ids))
+    word_score = degree / np.maximum(frequency, 1)
+    # A phrase's RAKE score sums its words' scores; take them from each phrase's first occurrence
+    first_occurrence = np.full(n_phrases, len(occurrence_phrase))
+    np.minimum.at(first_occurrence, occurrence_phrase, np.arange(len(occurrence_phrase)))
+    first_slot = np.isin(slot_occurrence, first_occurrence)
+    rake = np.bincount(occurrence_phrase[slot_occurrence[first_slot]], weights=word_score[slot_word[first_slot]],
+                       minlength=n_phrases)
+
+    # TF-IDF with equal word-count sections of the document as the documents
+    positions = np.asarray(occurrence_position)
+    n_sections = int(min(_MAX_SECTIONS, max(1, (positions[-1] + 1) // _SECTION_WORDS)))
+    section = positions * n_sections // (positions[-1] + 1)
+    pairs = np.unique(occurrence_phrase * n_sections + section)
+    section_frequency = np.bincount(pairs // n_sections, minlength=n_phrases)
+    term_frequency = np.bincount(occurrence_phrase, minlength=n_phrases)
+    tfidf = term_frequency * np.log(1 + n_sections / section_frequency)
+
+    def scaled(array):
+        top = array.max()
+        return array / top if top > 0 else array
+
+    scores = rake_weight * scaled(rake) + (1 - rake_weight) * scaled(tfidf)
+    # Phrases seen once are noise unless the document is tiny
+    if term_frequency.max() > 1:
+        scores[term_frequency < 2] = 0
+
+    keys = list(phrase_ids)
+    keywords: List[Dict[str, Any]] = []
+    chosen: List[set] = []
+    best = None
+    for phrase in np.argsort(-scores, kind="stable"):
+        if len(keywords) == top_n or scores[phrase] <= 0:
+            break
+        stems = set(keys[phrase])
+        # Skip phrases that repeat (part of) one already chosen: "neural network" after "spiking neural network"
+        if any(stems <= other or other <= stems for other in chosen):
+            continue
+        best = best or scores[phrase]
+        surface = max(surface_counts[phrase], key=surface_counts[phrase].get)
+        count, spread = int(term_frequency[phrase]), int(section_frequency[phrase])
+        snippet = _snippet(text, surface)
+        explanation = (f"Mentioned {count} {'time' if count == 1 else 'times'} across {spread} of {n_sections} "
+                       f"section{'' if n_sections == 1 else 's'} of the document")
+        keywords.append({
+            "keyword": surface,
+            "score": max(1, int(round(10 * scores[phrase] / best))),
+            "explanation": f"{explanation}, e.g. \"{snippet}\"" if snippet else f"{explanation}."
+        })
+        chosen.append(stems)
+    return keywords
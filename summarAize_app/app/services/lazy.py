@@ -0,0 +1,56 @@
+"""
+Deferred construction of heavy objects and imports, so the API process
+starts without loading subsystems (video, TTS, Firebase, tokenizers) that
+a given replica may never use
+"""
+import importlib
+import threading
+from typing import Any, Callable
+
+
+class Lazy:
+    """
+    Stand-in for the object factory() returns, built on first use.
+
+        chatbot = Lazy(lambda: SummaryRefiner())
+        gTTS = Lazy.attribute("gtts", "gTTS")
+
+    Attribute access and calls are forwarded to the real object. Building is
+    thread-safe and happens once; load() forces it (for warm-up hooks).
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = ""):
+        self._factory = factory
+        self._name = name or getattr(factory, "__qualname__", "lazy object")
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+    @classmethod
+    def attribute(cls, module: str, name: str) -> "Lazy":
+        """module.name, imported on first use."""
+        return cls(lambda: getattr(importlib.import_module(module), name), name=f"{module}.{name}")
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> Any:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._factory()
+                    self._loaded = True
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names not set in __init__; protocol lookups (copy, pickle) must not trigger a load
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<Lazy {self._name} ({'loaded' if self._loaded else 'not loaded'})>"
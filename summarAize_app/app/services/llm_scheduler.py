@@ -0,0 +1,336 @@
+"""
+Process-wide LLM request scheduler: per-model token buckets for requests and
+tokens per minute, with priority classes
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Priority classes, most urgent first
+INTERACTIVE = 0  # /chat and /answer-question
+COMPILE = 1      # final compile and merge calls
+MAP = 2          # chunk summaries, keywords, references
+BACKGROUND = 3   # queued jobs and batch runs
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", COMPILE: "compile", MAP: "map", BACKGROUND: "background"}
+
+LLM_DEFAULT_RPM = int(os.getenv("LLM_DEFAULT_RPM", "500"))
+LLM_DEFAULT_TPM = int(os.getenv("LLM_DEFAULT_TPM", "150000"))
+# Per-model overrides, e.g. {"gpt-4o": {"rpm": 500, "tpm": 30000}}
+LLM_LIMITS = json.loads(os.getenv("LLM_LIMITS", "{}"))
+# Models the API calls: summaries, keywords and references; /chat and summary refinement
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "gpt-4o")
+CHATBOT_MODEL = os.getenv("CHATBOT_MODEL", "gpt-4-turbo")
+
+
+
+class PriorityFloor:
+    """
+    The floor of work done on behalf of several callers at once (one
+    coalesced summarization): the most urgent floor among the callers
+    currently waiting for it, or none while any of them has none. Requests
+    already queued under it are re-ranked when that changes.
+    """
+
+    def __init__(self):
+        self._floors: List[Optional[int]] = []
+
+    @property
+    def value(self) -> Optional[int]:
+        if not self._floors or None in self._floors:
+            return None
+        return min(self._floors)
+
+    def add(self, floor: Optional[int]):
+        before = self.value
+        self._floors.append(floor)
+        if self.value != before:
+            llm_scheduler.reprioritize(self)
+
+    def remove(self, floor: Optional[int]):
+        before = self.value
+        self._floors.remove(floor)
+        if self._floors and self.value != before:
+            llm_scheduler.reprioritize(self)
+
+
+# Lets a whole call tree (e.g. a background job) run at a lower priority than its calls ask for
+_priority_floor: contextvars.ContextVar[Union[int, PriorityFloor, None]] = contextvars.ContextVar(
+    "llm_priority_floor", default=None
+)
+
+
+def _floored(priority: int, floor: Optional[int]) -> int:
+    return priority if floor is None else max(priority, floor)
+
+
+def current_priority_floor() -> Optional[int]:
+    """The floor LLM calls made here run under (None: at the priority they ask for)."""
+    floor = _priority_floor.get()
+    return floor.value if isinstance(floor, PriorityFloor) else floor
+
+
+@contextmanager
+def priority_scope(priority: Union[int, PriorityFloor]):
+    """
+    Run every LLM call made inside this block (including spawned tasks) at no
+    higher than priority, a priority class or a PriorityFloor that may change
+    while the calls wait.
+    """
+    token = _priority_floor.set(priority)
+    try:
+        yield
+    finally:
+        _priority_floor.reset(token)
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Rough token cost of a chat completion request: prompt chars / 4 plus the completion budget."""
+    prompt_chars = sum(len(message.get("content") or "") for message in request.get("messages", []))
+    return prompt_chars // 4 + int(request.get("max_tokens") or 0)
+
+
+class _Bucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class _ModelLimits:
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+
+
+class Grant:
+    """Admission of one request: how long it queued and how many tokens its model's bucket was charged."""
+    __slots__ = ("waited", "cost")
+
+    def __init__(self, waited: float, cost: float):
+        self.waited = waited
+        self.cost = cost
+
+
+class _Waiter:
+    __slots__ = ("model", "tokens", "requested", "floor", "priority", "enqueued", "grant", "waited", "cancelled",
+                 "cost")
+
+    def __init__(self, model: str, tokens: int, requested: int, floor: Union[int, PriorityFloor, None],
+                 grant: Callable[[], None]):
+        self.model = model
+        self.tokens = tokens
+        # Priority the call asked for, and the floor it was made under
+        self.requested = requested
+        self.floor = floor
+        self.priority = _floored(requested, floor.value if isinstance(floor, PriorityFloor) else floor)
+        self.enqueued = time.monotonic()
+        self.grant = grant
+        self.waited = 0.0
+        self.cancelled = False
+        # Tokens debited once granted (None until then)
+        self.cost: Optional[float] = None
+
+
+class LLMScheduler:
+    """
+    Admits LLM requests in priority order while keeping each model within its
+    requests-per-minute and tokens-per-minute budgets.
+
+    Callers block in acquire() (threads) or await acquire_async() (asyncio);
+    a single dispatcher thread grants waiters as the buckets refill. Within a
+    model the highest-priority waiter is always served first, so interactive
+    requests never queue behind bulk chunk summaries.
+    """
+
+    def __init__(self, default_rpm: int = LLM_DEFAULT_RPM, default_tpm: int = LLM_DEFAULT_TPM,
+                 limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.limit_config = limits if limits is not None else LLM_LIMITS
+
+        self._cond = threading.Condition()
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._queues: Dict[str, List] = {}
+        self._seq = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stats: Dict[tuple, Dict[str, float]] = {}
+
+    def share(self, parts: int):
+        """
+        Shrink every budget to 1/parts, for one of parts processes that share
+        the same API key and rate limits. Call before the first request.
+        """
+        with self._cond:
+            self.default_rpm = max(1, self.default_rpm // parts)
+            self.default_tpm = max(1, self.default_tpm // parts)
+            self.limit_config = {
+                model: {name: max(1, value // parts) for name, value in config.items()}
+                for model, config in self.limit_config.items()
+            }
+            self._limits.clear()
+
+    def _limits_for(self, model: str) -> _ModelLimits:
+        limits = self._limits.get(model)
+        if limits is None:
+            config = self.limit_config.get(model, {})
+            limits = _ModelLimits(config.get("rpm", self.default_rpm), config.get("tpm", self.default_tpm))
+            self._limits[model] = limits
+        return limits
+
+    def _stat(self, model: str, priority: int) -> Dict[str, float]:
+        key = (model, priority)
+        if key not in self._stats:
+            self._stats[key] = {"waiting": 0, "granted": 0, "total_wait_s": 0.0, "max_wait_s": 0.0}
+        return self._stats[key]
+
+    def _enqueue(self, model: str, tokens: int, priority: int, grant: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(model, tokens, priority, _priority_floor.get(), grant)
+        priority = waiter.priority
+        with self._cond:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="llm-scheduler", daemon=True)
+                self._dispatcher.start()
+            heapq.heappush(self._queues.setdefault(model, []), (priority, next(self._seq), waiter))
+            self._stat(model, priority)["waiting"] += 1
+            self._cond.notify()
+        return waiter
+
+    def acquire(self, model: str, tokens: int, priority: int = MAP) -> Grant:
+        """Block until the request may be sent. Pass the grant's cost to record_usage once it completes."""
+        event = threading.Event()
+        waiter = self._enqueue(model, tokens, priority, event.set)
+        event.wait()
+        return Grant(waiter.waited, waiter.cost)
+
+    async def acquire_async(self, model: str, tokens: int, priority: int = MAP) -> Grant:
+        """Wait without blocking the event loop until the request may be sent."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            try:
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+            except RuntimeError:
+                pass  # loop already closed
+
+        waiter = self._enqueue(model, tokens, priority, grant)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._cond:
+                waiter.cancelled = True
+                if waiter.cost is not None:
+                    # Granted just before the cancellation: the request is never sent, so hand its budget back
+                    limits = self._limits_for(model)
+                    limits.requests.level = min(limits.requests.capacity, limits.requests.level + 1)
+                    limits.tokens.level = min(limits.tokens.capacity, limits.tokens.level + waiter.cost)
+                    self._cond.notify()
+            raise
+        return Grant(waiter.waited, waiter.cost)
+
+    def reprioritize(self, floor: PriorityFloor):
+        """Re-rank the queued requests made under floor after its value changed."""
+        with self._cond:
+            for model, queue in self._queues.items():
+                changed = False
+                for i, (priority, seq, waiter) in enumerate(queue):
+                    if waiter.floor is not floor or waiter.cancelled:
+                        continue
+                    new_priority = _floored(waiter.requested, floor.value)
+                    if new_priority != priority:
+                        self._stat(model, priority)["waiting"] -= 1
+                        self._stat(model, new_priority)["waiting"] += 1
+                        waiter.priority = new_priority
+                        queue[i] = (new_priority, seq, waiter)
+                        changed = True
+                if changed:
+                    heapq.heapify(queue)
+            self._cond.notify()
+
+    def record_usage(self, model: str, charged: float, actual: Optional[int]):
+        """Correct the token bucket once the real usage of a request is known (charged: its Grant.cost)."""
+        if actual is None:
+            return
+        with self._cond:
+            bucket = self._limits_for(model).tokens
+            bucket.level = min(bucket.capacity, bucket.level + (charged - actual))
+
+    def _dispatch(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                next_wake = None
+                for model, queue in self._queues.items():
+                    limits = self._limits_for(model)
+                    limits.requests.refill(now)
+                    limits.tokens.refill(now)
+                    while queue:
+                        priority, _, waiter = queue[0]
+                        if waiter.cancelled:
+                            heapq.heappop(queue)
+                            self._stat(model, priority)["waiting"] -= 1
+                            continue
+
+                        # A request bigger than the whole budget is admitted once the bucket is full
+                        cost = min(waiter.tokens, limits.tokens.capacity)
+                        wait = max(limits.requests.wait_time(1), limits.tokens.wait_time(cost))
+                        if wait > 0:
+                            next_wake = wait if next_wake is None else min(next_wake, wait)
+                            break
+
+                        heapq.heappop(queue)
+                        limits.requests.level -= 1
+                        limits.tokens.level -= cost
+                        waiter.cost = cost
+                        waiter.waited = now - waiter.enqueued
+
+                        stat = self._stat(model, priority)
+                        stat["waiting"] -= 1
+                        stat["granted"] += 1
+                        stat["total_wait_s"] += waiter.waited
+                        stat["max_wait_s"] = max(stat["max_wait_s"], waiter.waited)
+                        waiter.grant()
+
+                self._cond.wait(timeout=next_wake)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time statistics per model and priority class."""
+        with self._cond:
+            models: Dict[str, Any] = {}
+            for (model, priority), stat in sorted(self._stats.items()):
+                limits = self._limits_for(model)
+                entry = models.setdefault(model, {
+                    "rpm": int(limits.requests.capacity),
+                    "tpm": int(limits.tokens.capacity),
+                    "queue_depth": 0,
+                    "priorities": {}
+                })
+                entry["queue_depth"] += stat["waiting"]
+                entry["priorities"][PRIORITY_NAMES.get(priority, str(priority))] = {
+                    "waiting": stat["waiting"],
+                    "granted": stat["granted"],
+                    "avg_wait_s": stat["total_wait_s"] / stat["granted"] if stat["granted"] else 0.0,
+                    "max_wait_s": stat["max_wait_s"]
+                }
+            return models
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,141 @@
+"""
+Prometheus metrics for the summarization, audio and video pipelines, served at /metrics
+"""
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Stage latencies span milliseconds (chunking) to minutes (video encode)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "summaraize_stage_seconds",
+    "Wall time of a pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+LLM_CALL_SECONDS = Histogram(
+    "summaraize_llm_call_seconds",
+    "Wall time of one LLM API call (including SDK retries, excluding scheduler wait)",
+    ["call", "model"],
+    buckets=LLM_BUCKETS
+)
+LLM_QUEUE_SECONDS = Histogram(
+    "summaraize_llm_queue_seconds",
+    "Time an LLM call waited in the rate-limit scheduler",
+    ["call", "model"],
+    buckets=STAGE_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "summaraize_llm_tokens_total",
+    "Tokens consumed by LLM calls",
+    ["call", "model", "kind"]
+)
+CACHE_LOOKUPS = Counter(
+    "summaraize_cache_lookups_total",
+    "Result cache lookups",
+    ["cache", "result"]
+)
+COALESCED = Counter(
+    "summaraize_coalesced_requests_total",
+    "Requests that started a computation (leader) or joined one already running (follower)",
+    ["flight", "role"]
+)
+RETRIES = Counter(
+    "summaraize_retries_total",
+    "Retried operations (LLM calls retried by the SDK, TTS attempts, background jobs)",
+    ["operation"]
+)
+LLM_HEDGES = Counter(
+    "summaraize_llm_hedges_total",
+    "Hedged LLM calls: requests eligible for hedging, hedges issued or refused by the budget, and which attempt won",
+    ["call", "event"]
+)
+LLM_HEDGE_SAVED_SECONDS = Histogram(
+    "summaraize_llm_hedge_saved_seconds",
+    "Estimated latency saved when a hedge beat the original request",
+    ["call"],
+    buckets=LLM_BUCKETS
+)
+ERRORS = Counter(
+    "summaraize_errors_total",
+    "Failed pipeline stages and LLM calls",
+    ["stage"]
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the enclosed block as one observation of stage; exceptions are counted as errors and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer for plain and async functions."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_call(call: str, model: str, seconds: float, usage: Any = None, retries: int = 0,
+                    queued_seconds: Optional[float] = None):
+    """Record latency, token usage and SDK retries of one completed LLM call."""
+    LLM_CALL_SECONDS.labels(call=call, model=model).observe(seconds)
+    if queued_seconds is not None:
+        LLM_QUEUE_SECONDS.labels(call=call, model=model).observe(queued_seconds)
+    if retries:
+        RETRIES.labels(operation=f"llm_{call}").inc(retries)
+    if usage is not None:
+        LLM_TOKENS.labels(call=call, model=model, kind="prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        LLM_TOKENS.labels(call=call, model=model, kind="completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_coalesced(flight: str, role: str):
+    COALESCED.labels(flight=flight, role=role).inc()
+
+
+def record_hedge(call: str, event: str, saved_seconds: Optional[float] = None):
+    """Count a hedging event; saved_seconds is the estimated latency a winning hedge saved."""
+    LLM_HEDGES.labels(call=call, event=event).inc()
+    if saved_seconds is not None:
+        LLM_HEDGE_SAVED_SECONDS.labels(call=call).observe(saved_seconds)
+
+
+def record_retry(operation: str):
+    RETRIES.labels(operation=operation).inc()
+
+
+def record_error(stage: str):
+    ERRORS.labels(stage=stage).inc()
+
+
+def render_latest():
+    """Return (body, content type) of the Prometheus text exposition for the default registry."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,151 @@
+"""
+Single-parse PDF representation shared by the summarization, keyword,
+reference and image stages of a request
+"""
+import bisect
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from services.metrics import timed
+from services.pdf_text import PDF_PARALLEL_MIN_PAGES, PDF_TEXT_BACKEND, extract_page_texts, fitz_lock
+
+
+@dataclass
+class ImageRef:
+    """An embedded image, identified by its xref in the PDF."""
+    page_number: int
+    index: int
+    xref: int
+
+
+@dataclass
+class PageInfo:
+    """Text and geometry of a single page (page numbers start at 1)."""
+    number: int
+    text: str
+    width: float
+    height: float
+    images: List[ImageRef] = field(default_factory=list)
+
+
+class ParsedDocument:
+    """
+    A PDF opened and parsed exactly once.
+
+    Page text, page geometry and embedded image references are read up front;
+    image bytes are pulled lazily from the still-open document so that only
+    the images that are actually written out are ever decoded. Use it as a
+    context manager (or call close()) to release the underlying file. All
+    access to the open document goes through services.pdf_text.fitz_lock.
+    """
+
+    def __init__(self, path: str, pages: List[PageInfo], doc=None):
+        self.path = path
+        self.pages = pages
+        self._doc = doc
+        self._text: Optional[str] = None
+        # Offset in text at which each non-empty page starts, and that page's number
+        self._page_starts: List[int] = []
+        self._page_numbers: List[int] = []
+
+    @classmethod
+    @timed("pdf_extraction")
+    def from_pdf(cls, path, backend: Optional[str] = None, workers: Optional[int] = None) -> "ParsedDocument":
+        """
+        Parse a PDF. backend selects the text extractor ("pymupdf" or "pypdf2",
+        default PDF_TEXT_BACKEND); large documents are extracted in parallel
+        across up to workers processes.
+        """
+        try:
+            with fitz_lock:
+                doc = fitz.open(str(path))
+        except Exception as e:
+            raise Exception(f"Error opening PDF: {e}")
+
+        try:
+            backend = backend or PDF_TEXT_BACKEND
+            with fitz_lock:
+                page_count = len(doc)
+                if backend == "pymupdf" and (workers == 1 or page_count < PDF_PARALLEL_MIN_PAGES):
+                    # Small document: read the text from the handle we already have open
+                    texts = [page.get_text() for page in doc]
+                else:
+                    texts = None
+            if texts is None:
+                # Outside the lock: the worker processes have their own PyMuPDF (PyPDF2 needs none)
+                texts = extract_page_texts(path, backend=backend, workers=workers, page_count=page_count)
+
+            pages = []
+            with fitz_lock:
+                for page_number, (page, text) in enumerate(zip(doc, texts), start=1):
+                    images = [
+                        ImageRef(page_number=page_number, index=img_index, xref=img_info[0])
+                        for img_index, img_info in enumerate(page.get_images(full=True), start=1)
+                    ]
+                    pages.append(PageInfo(
+                        number=page_number,
+                        text=text,
+                        width=page.rect.width,
+                        height=page.rect.height,
+                        images=images
+                    ))
+        except Exception as e:
+            with fitz_lock:
+                doc.close()
+            raise Exception(f"Error extracting text from PDF: {e}")
+
+        return cls(str(path), pages, doc)
+
+    @property
+    def text(self) -> str:
+        """Full document text, pages joined by newlines (empty pages skipped)."""
+        if self._text is None:
+            offset = 0
+            for page in self.pages:
+                if page.text:
+                    self._page_starts.append(offset)
+                    self._page_numbers.append(page.number)
+                    offset += len(page.text) + 1
+            self._text = "\n".join(page.text for page in self.pages if page.text)
+        return self._text
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """
+        Number of the page that character offset of text falls on, or None if
+        the document has no text. Offsets into normalized text can be mapped
+        back first with services.text_normalizer.OffsetMap.source_offset.
+        """
+        if self._text is None:
+            self.text
+        index = bisect.bisect_right(self._page_starts, offset) - 1
+        return self._page_numbers[index] if index >= 0 else None
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def image_refs(self) -> List[ImageRef]:
+        return [ref for page in self.pages for ref in page.images]
+
+    def extract_image(self, xref: int) -> Tuple[bytes, str]:
+        """Return (image bytes, file extension) for an embedded image."""
+        with fitz_lock:
+            if self._doc is None:
+                raise ValueError("ParsedDocument is closed; image data is no longer available")
+            base_image = self._doc.extract_image(xref)
+        return base_image["image"], base_image.get("ext", "png")
+
+    def close(self):
+        with fitz_lock:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,86 @@
+"""
+Per-page PDF text extraction with selectable backends and page-range sharding
+across a process pool
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pymupdf")
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+# Below this many pages the cost of shipping work to other processes outweighs the gain
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+
+BACKENDS = ("pymupdf", "pypdf2")
+
+# PyMuPDF is not thread-safe (MuPDF shares one context across documents): every call into it in this
+# process, on any document, holds this lock. Pool workers are separate processes and need not.
+fitz_lock = threading.RLock()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process is multi-threaded
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _extract_range(path: str, backend: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) using the given backend. Runs in pool workers."""
+    if backend == "pymupdf":
+        import fitz  # PyMuPDF
+        with fitz_lock, fitz.open(path) as doc:
+            return [doc[i].get_text() for i in range(start, stop)]
+    if backend == "pypdf2":
+        from PyPDF2 import PdfReader
+        reader = PdfReader(path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    raise ValueError(f"Unknown PDF text backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+
+def count_pages(path: str) -> int:
+    import fitz  # PyMuPDF
+    with fitz_lock, fitz.open(path) as doc:
+        return len(doc)
+
+
+def extract_page_texts(path, backend: Optional[str] = None, workers: Optional[int] = None,
+                       page_count: Optional[int] = None) -> List[str]:
+    """
+    Return the text of every page, in page order.
+
+    Large documents are split into one contiguous page range per worker and
+    extracted in parallel; results are reassembled by range so the output is
+    identical to a serial run. workers=1 forces serial extraction.
+    """
+    path = str(path)
+    backend = backend or PDF_TEXT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF text backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+    if page_count is None:
+        page_count = count_pages(path)
+    workers = min(workers or PDF_EXTRACT_WORKERS, page_count)
+
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        return _extract_range(path, backend, 0, page_count)
+
+    shard = -(-page_count // workers)  # ceil division
+    ranges = [(start, min(start + shard, page_count)) for start in range(0, page_count, shard)]
+    pool = _get_pool()
+    futures = [pool.submit(_extract_range, path, backend, start, stop) for start, stop in ranges]
+
+    texts: List[str] = []
+    for future in futures:
+        texts.extend(future.result())
+    return texts
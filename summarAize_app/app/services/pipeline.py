@@ -0,0 +1,125 @@
+"""
+Small dependency-graph executor for the per-document pipeline
+
+Each stage names the values it consumes (pipeline inputs or other stages'
+outputs). A stage starts as soon as all of them are available, so
+independent stages overlap and the wall time of a run is its longest
+dependency path rather than the sum of its stages.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Where a stage runs
+ASYNC = "async"      # a coroutine function, awaited on the event loop (LLM calls)
+THREAD = "thread"    # a plain function run in the default thread pool (I/O, C extensions that release the GIL)
+PROCESS = "process"  # a picklable plain function run in the pipeline's process pool (pure-Python CPU work)
+EXECUTORS = (ASYNC, THREAD, PROCESS)
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...]
+    executor: str
+
+
+class Pipeline:
+    """
+    A set of named stages wired together by their inputs.
+
+        pipeline = Pipeline()
+        pipeline.add("text", read_text, inputs=("path",), executor=THREAD)
+        pipeline.add("summary", summarize, inputs=("text",))
+        results = await pipeline.run({"path": path})
+
+    The stage function is called with its inputs as positional arguments in
+    the order they are declared, and its return value becomes the value named
+    after the stage.
+    """
+
+    def __init__(self, process_pool=None):
+        self.stages: Dict[str, Stage] = {}
+        self.process_pool = process_pool
+
+    def add(self, name: str, func: Callable, inputs: Iterable[str] = (), executor: str = ASYNC) -> "Pipeline":
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r} for stage {name}. Choose from: {', '.join(EXECUTORS)}")
+        if executor == PROCESS and self.process_pool is None:
+            raise ValueError(f"Stage {name} runs in a process but the pipeline has no process_pool")
+        self.stages[name] = Stage(name, func, tuple(inputs), executor)
+        return self
+
+    def plan(self, provided: Iterable[str], targets: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Stages needed to produce targets (default: every stage) from the provided
+        values, in dependency order. A provided value is used as is, even if a
+        stage could compute it. Raises ValueError on a missing input or a cycle.
+        """
+        provided = set(provided)
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, needed_by: str):
+            if name in provided:
+                return
+            if name not in self.stages:
+                raise ValueError(f"Pipeline value {name!r} needed by {needed_by} is neither an input nor a stage")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Pipeline stages form a cycle through {name}")
+            state[name] = "visiting"
+            for dependency in self.stages[name].inputs:
+                visit(dependency, name)
+            state[name] = "done"
+            order.append(name)
+
+        for target in (list(self.stages) if targets is None else targets):
+            visit(target, "the caller")
+        return order
+
+    async def _run_stage(self, stage: Stage, args: List[Any], threads: List[asyncio.Future]) -> Any:
+        if stage.executor == ASYNC:
+            return await stage.func(*args)
+        if stage.executor == THREAD:
+            # Cancelling the stage cannot stop its thread: shielded, so run() can wait for it
+            thread = asyncio.ensure_future(asyncio.to_thread(stage.func, *args))
+            threads.append(thread)
+            return await asyncio.shield(thread)
+        return await asyncio.get_running_loop().run_in_executor(self.process_pool, stage.func, *args)
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None, targets: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Run the stages needed for targets and return every input and stage output
+        by name. If a stage raises (or the run is cancelled), the stages still
+        running are cancelled and the exception propagates once every THREAD
+        stage has returned, so the caller may release what they use (e.g.
+        close a shared document) as soon as run() does.
+        """
+        values = dict(inputs or {})
+        tasks: Dict[str, asyncio.Task] = {}
+        threads: List[asyncio.Future] = []
+
+        async def start(stage: Stage):
+            args = [await tasks[name] if name in tasks else values[name] for name in stage.inputs]
+            return await self._run_stage(stage, args, threads)
+
+        # Tasks are created in dependency order, so each one's inputs already have tasks to await
+        for name in self.plan(values, targets):
+            tasks[name] = asyncio.create_task(start(self.stages[name]), name=f"pipeline:{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            await asyncio.gather(*threads, return_exceptions=True)
+            raise
+
+        values.update((name, task.result()) for name, task in tasks.items())
+        return values
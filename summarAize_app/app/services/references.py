@@ -0,0 +1,203 @@
+"""
+Linear-time location and splitting of a paper's reference list.
+
+Everything here works line by line with precompiled patterns that are
+anchored at the start or end of a single line, so no pattern can scan
+past a newline or backtrack across the document: the total cost is
+O(len(text)) whatever the input looks like.
+"""
+import bisect
+import re
+from typing import List, Optional, Tuple
+
+# A line consisting only of a references header (case-insensitive, surrounding whitespace ignored)
+_HEADER = re.compile(r"(?:references?|bibliography|works?\s+cited|literature\s+cited|citations?)", re.IGNORECASE)
+_HEADER_MAX_LEN = len("literature   cited")
+# A line consisting only of one of these headings (optionally numbered; appendices may carry a title) ends the list
+_SECTION_END = re.compile(
+    r"(?:(?:[A-Z]|\d+)\.?\s+)?"
+    r"(?:appendi(?:x|ces)(?:\s+[A-Z0-9]+)?(?:\s*[.:\u2013\u2014-]\s*\S.*)?"
+    r"|supplement|supplementa(?:ry|l)(?:\s+(?:materials?|information))?"
+    r"|acknowledge?ments?"
+    r"|authors?(?:\s+(?:contributions?|information|biograph(?:y|ies)))?|affiliations?"
+    r"|(?:list\s+of\s+)?(?:figures?|tables?))",
+    re.IGNORECASE,
+)
+_SECTION_END_MAX_LEN = 100
+
+# A reference ending with its year at the end of a line, tried in this order
+_YEAR_ENDINGS = (
+    re.compile(r"(?:19|20)\d{2}[a-z]?\.$"),      # ... 2020.
+    re.compile(r"\((?:19|20)\d{2}[a-z]?\)\.$"),  # ... (2020).
+    re.compile(r"\((?:19|20)\d{2}[a-z]?\)$"),    # ... (2020)
+)
+_NUMBERED_START = re.compile(r"(?:\[\d+\]|\d+\.)\s*[A-Z]")
+_AUTHOR_START = re.compile(r"[A-Z][a-z]+,\s+[A-Z]\.(?:\s+[A-Z]\.)*\s+(?:\(\d{4}\)|[\"']|[A-Z])")
+_AUTHOR_START_LOOSE = re.compile(r"[A-Z][a-z]+,\s+[A-Z]\.")
+_LOOSE_YEAR_ENDING = re.compile(r"(?:19|20)\d{2}[a-z]?[.)]$")
+_LEADING_NUMBER = re.compile(r"(?:\[\d+\]|\d+\.)\s*")
+_ANY_YEAR = re.compile(r"\b(?:19|20)\d{2}[a-z]?\b")
+# Longest text still taken for a single entry (the longest in the bundled papers is 9 lines, 661 chars)
+_MAX_ENTRY_LINES = 12
+_MAX_ENTRY_CHARS = 1000
+
+# [12] Author ... anywhere in the text; any [12] ends the previous entry
+_NUMBERED_MARKER = re.compile(r"\[\d+\]\s*(?=[A-Z])")
+_ANY_MARKER = re.compile(r"\[\d+\]")
+_BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+_WHITESPACE = re.compile(r"\s+")
+# (Author, 2020), (Author et al., 2020), (Author & Author, 2020), [Author, 2020]
+_IN_TEXT_CITATIONS = (
+    re.compile(r"\([A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s+\d{4}[a-z]?\)"),
+    re.compile(r"\([A-Z][a-z]+(?:\s+&\s+[A-Z][a-z]+)?,?\s+\d{4}[a-z]?\)"),
+    re.compile(r"\[[A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s+\d{4}[a-z]?\]"),
+)
+
+
+def find_references_span(text: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Locate the reference list: (header start, list start, list end) offsets
+    into text, or None if there is no header.
+
+    The header is the last line of the document that consists only of a
+    references heading (scanning backward from the end, since the list sits
+    at the back of a paper and earlier matches are usually a table of
+    contents). The list runs until the first following line that consists
+    only of an appendix, supplement, acknowledgments, author, affiliation,
+    figure or table heading, or the end of the text; entries and captions
+    that merely begin with such a word do not end it.
+    """
+    end = len(text)
+    header_start = body_start = None
+    while end > 0:
+        start = text.rfind("\n", 0, end) + 1
+        line = text[start:end]
+        if len(line) <= _HEADER_MAX_LEN * 2 and _HEADER.fullmatch(line.strip()):
+            header_start, body_start = start, end + 1
+            break
+        end = start - 1
+    if body_start is None:
+        return None
+
+    position = body_start
+    section_end = len(text)
+    while position < len(text):
+        line_end = text.find("\n", position)
+        if line_end == -1:
+            line_end = len(text)
+        line = text[position:line_end].strip()
+        if len(line) <= _SECTION_END_MAX_LEN and _SECTION_END.fullmatch(line):
+            section_end = position
+            break
+        position = line_end + 1
+    return header_start, min(body_start, section_end), section_end
+
+
+def strip_references_section(text: str) -> str:
+    """text without its reference list (header included), or unchanged if it has none."""
+    span = find_references_span(text)
+    return text[:span[0]] + text[span[2]:] if span else text
+
+
+def find_references_section(text: str) -> Optional[str]:
+    """Return the text of the reference list (see find_references_span), or None if there is none."""
+    span = find_references_span(text)
+    if span is None:
+        return None
+    section = text[span[1]:span[2]].strip()
+    return section or None
+
+
+def _group(lines: List[str], starts: List[int]) -> List[str]:
+    """Join lines into entries that begin at each index in starts (the first entry always begins at 0)."""
+    bounds = [0] + [i for i in starts if i > 0] + [len(lines)]
+    return ["\n".join(lines[a:b]) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _looks_like_reference(entry: str) -> bool:
+    return bool(_ANY_YEAR.search(entry)) and len(entry) <= _MAX_ENTRY_CHARS and entry.count("\n") < _MAX_ENTRY_LINES
+
+
+def split_reference_entries(section: str, limit: int = 100) -> List[str]:
+    """
+    Split a reference list into entries, trying in order: a year at the end
+    of a line, [n] / n. numbering, "Last, F." author starts, a line-by-line
+    merge of the two, and finally any year followed by a capitalised line.
+    Leading numbering is removed and duplicates are dropped.
+    """
+    lines = [line.strip() for line in section.split("\n")]
+    lines = [line for line in lines if line]
+    references: List[str] = []
+
+    for ending in _YEAR_ENDINGS:
+        ends = [i + 1 for i, line in enumerate(lines) if ending.search(line)]
+        if ends:
+            entries = _group(lines, ends)
+            if ends[-1] < len(lines) and not _looks_like_reference(entries[-1]):
+                # What follows the last year-ended line is only kept if it reads as one more
+                # entry; otherwise it is whatever comes after the list (appendix, figure text)
+                entries.pop()
+            references = [entry for entry in entries if len(entry) > 10]
+            if references:
+                break
+
+    if not references:
+        starts = [i for i, line in enumerate(lines) if i > 0 and _NUMBERED_START.match(line)]
+        if starts:
+            references = [entry for entry in _group(lines, starts) if len(entry) > 10]
+
+    if not references:
+        starts = [i for i, line in enumerate(lines) if i > 0 and _AUTHOR_START.match(line)]
+        if starts:
+            references = [entry for entry in _group(lines, starts) if len(entry) > 10]
+
+    if not references:
+        starts = [i for i, line in enumerate(lines) if _NUMBERED_START.match(line) or _AUTHOR_START_LOOSE.match(line)]
+        references = [entry.replace("\n", " ") for entry in _group(lines, starts) if len(entry) > 10]
+
+    if not references:
+        starts = [i for i, line in enumerate(lines)
+                  if i > 0 and line[0].isupper() and _LOOSE_YEAR_ENDING.search(lines[i - 1])]
+        references = [entry for entry in _group(lines, starts) if len(entry) > 5]
+
+    unique = []
+    seen = set()
+    for reference in references:
+        numbering = _LEADING_NUMBER.match(reference)
+        if numbering:
+            reference = reference[numbering.end():]
+        reference = reference.strip()
+        if len(reference) > 5 and reference not in seen:
+            seen.add(reference)
+            unique.append(reference)
+    return unique[:limit]
+
+
+def find_numbered_references(text: str) -> List[str]:
+    """
+    Collect "[n] Author ..." entries from anywhere in the text. Each entry runs
+    to the next [n] marker, the next blank line or the end of the text.
+    """
+    all_markers = [match.start() for match in _ANY_MARKER.finditer(text)]
+    blank_lines = [match.start() for match in _BLANK_LINE.finditer(text)]
+
+    references = []
+    for marker in _NUMBERED_MARKER.finditer(text):
+        start = marker.end()
+        stop = len(text)
+        for positions in (all_markers, blank_lines):
+            following = bisect.bisect_left(positions, start)
+            if following < len(positions):
+                stop = min(stop, positions[following])
+        reference = _WHITESPACE.sub(" ", text[start:stop]).strip()
+        if len(reference) > 5:
+            references.append(reference)
+    return references
+
+
+def find_in_text_citations(text: str, limit: int = 20) -> List[str]:
+    """Distinct author-year citations such as (Smith et al., 2020), up to limit."""
+    citations = set()
+    for pattern in _IN_TEXT_CITATIONS:
+        citations.update(pattern.findall(text))
+    return list(citations)[:limit]
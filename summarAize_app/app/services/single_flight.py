@@ -0,0 +1,111 @@
+"""
+Single-flight coalescing: concurrent calls for the same key share one
+running computation instead of each doing the work
+
+Used for summarization, keyed like the result cache (content hash plus
+options), so a burst of uploads of the same paper costs one set of LLM
+calls. The cache covers requests that arrive after a result exists; this
+covers the ones that arrive while it is still being computed.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.llm_scheduler import PriorityFloor, current_priority_floor, priority_scope
+from services.metrics import record_coalesced
+
+Emit = Callable[[str, Any], Awaitable[None]]
+
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.listeners: List[Emit] = []
+        self.waiters = 0
+        # The computation's LLM calls follow the most urgent caller still waiting
+        self.priority = PriorityFloor()
+        # Events so far, replayed to callers that join later
+        self.history: List[Tuple[str, Any]] = []
+        self._emit_lock = asyncio.Lock()
+
+    def __bool__(self):
+        # Listening callers (for func's `if emit:` checks; see SingleFlight)
+        return bool(self.listeners)
+
+    async def __call__(self, event: str, data: Any):
+        async with self._emit_lock:
+            self.history.append((event, data))
+            for listener in list(self.listeners):
+                await listener(event, data)
+
+    async def listen(self, emit: Emit):
+        async with self._emit_lock:
+            for event, data in self.history:
+                await emit(event, data)
+            self.listeners.append(emit)
+
+
+class SingleFlight:
+    """
+    In-flight computations by key, for one event loop.
+
+        result = await flights.run(key, lambda emit: compute(emit=emit), emit=my_emit)
+
+    The first caller for a key starts func; callers arriving before it
+    finishes wait for the same result (or exception). func runs as its own
+    task, so a caller that goes away does not cancel it for the others; it is
+    cancelled only once every caller has gone. Its LLM calls run at the
+    priority of the most urgent caller still waiting (see PriorityFloor), not
+    just the first one's.
+
+    func gets an emit callable whose events go to every caller that passed
+    an emit, including the events sent before it joined. It is truthy only
+    while such a caller is waiting, so func can skip work only they need.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    def __len__(self):
+        return len(self._flights)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def run(self, key: str, func: Callable[[Emit], Awaitable[Any]], emit: Optional[Emit] = None) -> Any:
+        floor = current_priority_floor()
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+
+            async def compute():
+                with priority_scope(flight.priority):
+                    return await func(flight)
+
+            flight.priority.add(floor)
+            flight.task = asyncio.ensure_future(compute())
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            record_coalesced(self.name, "leader")
+        else:
+            flight.priority.add(floor)
+            record_coalesced(self.name, "follower")
+
+        flight.waiters += 1
+        try:
+            if emit:
+                await flight.listen(emit)
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            flight.priority.remove(floor)
+            if emit in flight.listeners:
+                flight.listeners.remove(emit)
+            if not flight.waiters and not flight.task.done():
+                # Nobody is left to read the result
+                flight.task.cancel()
+                self._forget(key, flight)
@@ -0,0 +1,208 @@
+"""
+Content-addressed, size-bounded caches for /summarize results and chunk summaries
+"""
+import hashlib
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics import record_cache_lookup
+
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", "cache/summaries")
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CHUNK_CACHE_DIR = os.getenv("CHUNK_CACHE_DIR", "cache/chunks")
+CHUNK_CACHE_MAX_BYTES = int(os.getenv("CHUNK_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def hash_file(path, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_cache_key(pdf_hash: str, detailed: bool, include_citations: bool, model: str,
+                   extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cache key for a summarization request from the PDF hash and the options that affect the output.
+    extra holds any other output-changing settings; it is left out when empty so existing keys stay valid.
+    """
+    fields = {"pdf": pdf_hash, "detailed": detailed, "citations": include_citations, "model": model}
+    if extra:
+        fields.update(extra)
+    options = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(options.encode("utf-8")).hexdigest()
+
+
+def make_chunk_key(chunk: str, is_first: bool, is_last: bool, detailed: bool, model: str) -> str:
+    """Build the memoization key for one map-step chunk summary."""
+    options = json.dumps(
+        {
+            "chunk": hashlib.sha256(chunk.encode("utf-8", errors="surrogatepass")).hexdigest(),
+            "first": is_first,
+            "last": is_last,
+            "detailed": detailed,
+            "model": model
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(options.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent LRU cache of JSON results stored as one file per key on local disk.
+
+    Recency is tracked in memory and mirrored to file mtimes, so the LRU order
+    survives a restart. When the total size exceeds max_bytes the least recently
+    used entries are deleted.
+    """
+
+    def __init__(self, cache_dir=SUMMARY_CACHE_DIR, max_bytes: int = SUMMARY_CACHE_MAX_BYTES, name: str = "summaries"):
+        self.cache_dir = Path(cache_dir)
+        self.name = name
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> (size in bytes, version), oldest first; the version tells a rewritten entry from the one a read saw
+        self._entries: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._versions = itertools.count()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk."""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = (size, next(self._versions))
+            self._total_bytes += size
+
+        with self._lock:
+            evicted = self._evict_locked()
+        self._unlink(evicted)
+
+    # The lock only guards the index and counters; file reads, writes and deletes happen
+    # outside it, so one slow disk operation does not hold up every other lookup. Files
+    # are replaced atomically, and an entry whose file has gone is dropped on its next read.
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+        if entry is None:
+            record_cache_lookup(self.name, False)
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            # Unless the entry was evicted or rewritten meanwhile, its file is gone or corrupt
+            if self._discard(key, entry[1]):
+                print(f"[!] Dropping unreadable cache entry {key}: {e}")
+            with self._lock:
+                self.misses += 1
+            record_cache_lookup(self.name, False)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        record_cache_lookup(self.name, True)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store value under key, evicting least recently used entries if needed."""
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, (0, None))[0]
+            self._entries[key] = (len(data), next(self._versions))
+            self._total_bytes += len(data)
+            evicted = self._evict_locked()
+        self._unlink(evicted)
+
+    def invalidate(self, key: str):
+        """Remove a single entry, e.g. when its side files have gone missing."""
+        self._discard(key)
+
+    def _discard(self, key: str, version: Optional[int] = None) -> bool:
+        """Remove key (only if still at version, when given); True if it was removed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (version is not None and entry[1] != version):
+                return False
+            del self._entries[key]
+            self._total_bytes -= entry[0]
+        self._unlink([key])
+        return True
+
+    def _unlink(self, keys):
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict_locked(self) -> List[str]:
+        """Drop least recently used entries from the index until it fits; returns their keys for _unlink."""
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, (size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+summary_cache = SummaryCache()
+chunk_cache = SummaryCache(CHUNK_CACHE_DIR, CHUNK_CACHE_MAX_BYTES, name="chunks")
@@ -0,0 +1,62 @@
+"""
+Per-document state of one summarization, kept out of the shared summarizer
+
+A PdfSummarizer (and its HTTP connection pool, tokenizer and caches) is
+shared by every request in the process; anything that belongs to a single
+document lives in a SummaryContext instead. The context is passed
+explicitly through summarize_pdf and the pipeline stages; LLM token usage is
+attributed to it through a context variable, so calls made deep inside the
+summarizer (or in tasks and threads it spawns) count towards the document
+that caused them.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+_current: contextvars.ContextVar[Optional["SummaryContext"]] = contextvars.ContextVar("summary_context", default=None)
+
+
+@dataclass
+class SummaryContext:
+    # References found in the document, once the references stage has run
+    references: Optional[List[str]] = None
+    # LLM tokens and calls spent on this document (estimated when a response has no usage)
+    tokens_used: int = 0
+    llm_calls: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_usage(self, tokens: int):
+        with self._lock:
+            self.tokens_used += tokens
+            self.llm_calls += 1
+
+
+def current_context() -> Optional[SummaryContext]:
+    """The SummaryContext of the summarization this code runs for, if any."""
+    return _current.get()
+
+
+@contextmanager
+def context_scope(context: SummaryContext):
+    """Attribute every LLM call made inside this block (including spawned tasks) to context."""
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+def bind_context(func: Callable) -> Callable:
+    """
+    func wrapped to run with the caller's context variables, for thread pools,
+    which (unlike asyncio tasks and asyncio.to_thread) do not carry them over.
+    """
+    captured = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A Context can only be entered by one thread at a time, so each call gets a copy
+        return captured.copy().run(func, *args, **kwargs)
+
+    return run
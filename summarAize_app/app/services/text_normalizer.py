@@ -0,0 +1,141 @@
+"""
+Single-pass normalization of extracted PDF text: page numbers stripped,
+control characters dropped and whitespace collapsed to single spaces.
+
+The text is walked once, line by line; the only allocation proportional to
+the document is the joined result. normalize_pdf_text_with_offsets also
+returns an OffsetMap from positions in the result back to positions in the
+input, so later stages can cite where a passage came from (see
+ParsedDocument.page_at).
+"""
+import bisect
+import re
+from array import array
+from typing import List, Tuple
+
+# Control characters that are deleted outright (joining what is on either side);
+# tab, newline, vertical tab, form feed and carriage return count as whitespace instead
+_CONTROL = re.compile(r"[\x00-\x08\x0e-\x1f\x7f]")
+# Runs of anything other than str.isspace() whitespace, minus the deleted controls \x1c-\x1f
+_TOKEN = re.compile(r"[^\t\n\x0b\x0c\r \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+")
+_KEPT = re.compile(r"[^\x00-\x08\x0e-\x1f\x7f]+")
+
+
+class OffsetMap:
+    """
+    Maps positions in normalized text back to the text it was built from.
+
+    Normalization only ever deletes characters or replaces a whitespace run
+    with one space, so source = position + delta, with delta constant over
+    long stretches; only the points where it changes are stored.
+    """
+
+    def __init__(self):
+        self._starts = array("q")
+        self._deltas = array("q")
+
+    def add(self, position: int, source: int):
+        """Record that position in the output came from source (and so does what follows it)."""
+        delta = source - position
+        if not self._deltas or self._deltas[-1] != delta:
+            self._starts.append(position)
+            self._deltas.append(delta)
+
+    def source_offset(self, position: int) -> int:
+        """Offset in the source text of the character at position in the normalized text."""
+        index = bisect.bisect_right(self._starts, position) - 1
+        return position + self._deltas[index] if index >= 0 else position
+
+    def source_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Source range covering normalized text[start:end]."""
+        if end <= start:
+            source = self.source_offset(start)
+            return source, source
+        return self.source_offset(start), self.source_offset(end - 1) + 1
+
+    def __len__(self):
+        return len(self._starts)
+
+
+def _page_number_bounds(tokens: List[str], index: int, last: int) -> Tuple[int, int]:
+    """
+    Slice of a line's tokens without a number that starts or ends the line,
+    as page headers and footers do. The first line has no line break before
+    it and the last none after, so their leading and trailing numbers
+    respectively are kept.
+    """
+    start, stop = 0, len(tokens)
+    if index and tokens[0].isdecimal():
+        start = 1
+    if index < last and stop > start and tokens[stop - 1].isdecimal():
+        stop -= 1
+    return start, stop
+
+
+def normalize_pdf_text(text: str) -> str:
+    """Strip page numbers and control characters from text and collapse all whitespace to single spaces."""
+    if _CONTROL.search(text):
+        text = _CONTROL.sub("", text)
+    lines = text.split("\n")
+    last = len(lines) - 1
+    words: List[str] = []
+    for index, line in enumerate(lines):
+        tokens = line.split()
+        if tokens:
+            start, stop = _page_number_bounds(tokens, index, last)
+            words.extend(tokens[start:stop])
+    return " ".join(words)
+
+
+def normalize_pdf_text_with_offsets(text: str) -> Tuple[str, OffsetMap]:
+    """normalize_pdf_text(text), plus an OffsetMap from the result back into text."""
+    lines = text.split("\n")
+    last = len(lines) - 1
+    words: List[str] = []
+    offsets = OffsetMap()
+    position = 0
+    line_start = 0
+    for index, line in enumerate(lines):
+        if not _CONTROL.search(line):
+            tokens = line.split()
+            start, stop = _page_number_bounds(tokens, index, last) if tokens else (0, 0)
+            if start == stop:
+                line_start += len(line) + 1
+                continue
+            # Common case: the kept tokens already sit in the line separated by single spaces,
+            # so one entry maps the whole line
+            joined = " ".join(tokens[start:stop])
+            source = len(line) - len(line.lstrip())
+            if start:
+                source = line.find(tokens[1], source + len(tokens[0]))
+            if line.startswith(joined, source):
+                if words:
+                    position += 1
+                offsets.add(position, line_start + source)
+                position += len(joined)
+                words.extend(tokens[start:stop])
+                line_start += len(line) + 1
+                continue
+
+        matches = list(_TOKEN.finditer(line))
+        # A token made only of control characters disappears, like whitespace
+        matches = [match for match in matches if _KEPT.search(match.group())]
+        tokens = [_CONTROL.sub("", match.group()) for match in matches]
+        if tokens:
+            start, stop = _page_number_bounds(tokens, index, last)
+            for match, token in zip(matches[start:stop], tokens[start:stop]):
+                if words:
+                    position += 1
+                source = line_start + match.start()
+                if len(token) == len(match.group()):
+                    offsets.add(position, source)
+                else:
+                    # Control characters were removed from inside the token: map each kept run
+                    run_position = position
+                    for run in _KEPT.finditer(match.group()):
+                        offsets.add(run_position, source + run.start())
+                        run_position += len(run.group())
+                position += len(token)
+                words.append(token)
+        line_start += len(line) + 1
+    return " ".join(words), offsets
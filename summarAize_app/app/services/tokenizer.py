@@ -0,0 +1,169 @@
+"""
+Shared tiktoken encoders, read from a local BPE cache instead of the network
+
+tiktoken downloads an encoding's BPE file the first time it is loaded, which
+fails in air-gapped deployments and stalls every freshly scaled replica. The
+Docker build prefetches the files into TIKTOKEN_CACHE_DIR (tiktoken's own
+cache setting) together with a manifest of what was fetched:
+
+    TIKTOKEN_CACHE_DIR=/opt/tiktoken_cache python -m services.tokenizer --prefetch
+
+(by default for the configured SUMMARIZER_MODEL and CHATBOT_MODEL; pass
+model names to fetch others).
+
+With TIKTOKEN_CACHE_DIR set, loading an encoding that the manifest does not
+cover raises EncoderCacheMissing instead of going to the network, and
+check_encoder_cache() lets the API refuse to start without its encoders.
+Without it (local development) tiktoken downloads into its default cache as
+before. Encoders are loaded once per process and shared by every summarizer.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List
+
+import tiktoken
+import tiktoken.load
+import tiktoken.registry
+
+from services.llm_scheduler import CHATBOT_MODEL, SUMMARIZER_MODEL
+
+TIKTOKEN_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", "")
+# Models whose encoders the API needs; checked at startup and prefetched by default
+TOKENIZER_MODELS = list(dict.fromkeys(
+    model.strip() for model in (os.getenv("TOKENIZER_MODELS") or f"{SUMMARIZER_MODEL},{CHATBOT_MODEL}").split(",")
+    if model.strip()
+))
+MANIFEST_NAME = "manifest.json"
+
+_encodings: Dict[str, tiktoken.Encoding] = {}
+_lock = threading.Lock()
+
+
+class EncoderCacheMissing(RuntimeError):
+    """An encoding's BPE files are not in the configured local cache."""
+
+
+def _manifest_path(cache_dir: str) -> str:
+    return os.path.join(cache_dir, MANIFEST_NAME)
+
+
+def _read_manifest(cache_dir: str) -> Dict[str, List[str]]:
+    try:
+        with open(_manifest_path(cache_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _check_cached(name: str, cache_dir: str):
+    manifest = _read_manifest(cache_dir)
+    if name not in manifest:
+        raise EncoderCacheMissing(
+            f"Encoding {name!r} is not in the tiktoken cache at {cache_dir!r}; "
+            f"prefetch it with `python -m services.tokenizer --prefetch` at build time"
+        )
+    missing = [file for file in manifest[name] if not os.path.isfile(os.path.join(cache_dir, file))]
+    if missing:
+        raise EncoderCacheMissing(f"tiktoken cache at {cache_dir!r} lacks {', '.join(missing)} for {name!r}")
+
+
+def get_encoding(name: str) -> tiktoken.Encoding:
+    """The process-wide encoder for an encoding name, loaded from the local cache when one is configured."""
+    encoding = _encodings.get(name)
+    if encoding is None:
+        with _lock:
+            encoding = _encodings.get(name)
+            if encoding is None:
+                if TIKTOKEN_CACHE_DIR:
+                    _check_cached(name, TIKTOKEN_CACHE_DIR)
+                encoding = _encodings[name] = tiktoken.get_encoding(name)
+    return encoding
+
+
+def encoding_for_model(model: str) -> tiktoken.Encoding:
+    """Drop-in for tiktoken.encoding_for_model, sharing one encoder per encoding across the process."""
+    return get_encoding(tiktoken.encoding_name_for_model(model))
+
+
+def check_encoder_cache(models: Iterable[str] = TOKENIZER_MODELS):
+    """
+    Raise EncoderCacheMissing unless every model's encoding is in the local
+    cache. Only looks at the files, so it is cheap enough for startup; a
+    no-op when no cache is configured.
+    """
+    if not TIKTOKEN_CACHE_DIR:
+        return
+    for model in models:
+        _check_cached(tiktoken.encoding_name_for_model(model), TIKTOKEN_CACHE_DIR)
+
+
+def _load_cache_files(name: str) -> List[str]:
+    """
+    Build encoding name from its BPE files, downloading whichever are not
+    cached yet, and return the cache file names they are kept under (tiktoken
+    names each after the sha1 of its source URL).
+    """
+    blobpaths = []
+    read_file_cached = tiktoken.load.read_file_cached
+
+    def recording(blobpath, *args, **kwargs):
+        blobpaths.append(blobpath)
+        return read_file_cached(blobpath, *args, **kwargs)
+
+    if tiktoken.registry.ENCODING_CONSTRUCTORS is None:
+        tiktoken.registry._find_constructors()
+    constructor = tiktoken.registry.ENCODING_CONSTRUCTORS[name]
+    tiktoken.load.read_file_cached = recording
+    try:
+        # The constructor, not get_encoding: that returns an encoding loaded earlier without reading anything
+        constructor()
+    finally:
+        tiktoken.load.read_file_cached = read_file_cached
+    return sorted({hashlib.sha1(blobpath.encode()).hexdigest() for blobpath in blobpaths})
+
+
+def prefetch(models: Iterable[str], cache_dir: str) -> Dict[str, List[str]]:
+    """
+    Download the encodings of models into cache_dir and record in its
+    manifest which cache files each one reads. Needs network access and
+    TIKTOKEN_CACHE_DIR pointing at cache_dir (tiktoken reads it directly).
+    """
+    if os.path.abspath(os.environ.get("TIKTOKEN_CACHE_DIR", "")) != os.path.abspath(cache_dir):
+        raise ValueError("Set TIKTOKEN_CACHE_DIR to the cache directory before prefetching")
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    for name in sorted({tiktoken.encoding_name_for_model(model) for model in models}):
+        files = _load_cache_files(name)
+        missing = [file for file in files if not os.path.isfile(os.path.join(cache_dir, file))]
+        if not files or missing:
+            # An empty entry would make the startup check pass without any file to back it
+            raise RuntimeError(f"tiktoken did not cache the BPE files of {name!r} in {cache_dir!r}")
+        manifest[name] = files
+    with open(_manifest_path(cache_dir), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local tiktoken encoder cache")
+    parser.add_argument("models", nargs="*", default=TOKENIZER_MODELS, help="Models whose encodings to fetch or check")
+    parser.add_argument("--prefetch", action="store_true", help="Download the encodings (build time)")
+    args = parser.parse_args()
+
+    if not TIKTOKEN_CACHE_DIR:
+        parser.error("TIKTOKEN_CACHE_DIR is not set")
+    if args.prefetch:
+        manifest = prefetch(args.models, TIKTOKEN_CACHE_DIR)
+        print(f"[✓] Cached {', '.join(manifest)} in {TIKTOKEN_CACHE_DIR}")
+    check_encoder_cache(args.models)
+    for model in args.models:
+        # Loads from the cache only; fails here rather than in the first request if a file is unusable
+        encoding_for_model(model).encode("warm up")
+    print(f"[✓] Encoders for {', '.join(args.models)} load from {TIKTOKEN_CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
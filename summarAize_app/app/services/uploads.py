@@ -0,0 +1,91 @@
+"""
+Upload ingestion: stream an uploaded file to disk in fixed-size blocks,
+hashing it on the way, so a request never holds the whole PDF in memory
+
+Starlette already spools multipart bodies over 1 MB to a temporary file;
+reading that back in blocks keeps peak memory per upload at about one
+block whatever the PDF's size.
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The upload is bigger than the configured limit (HTTP 413)."""
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    # SHA-256 hex digest of the content, as summary_cache.hash_file would compute it
+    sha256: str
+    size: int
+    # Name the client gave the file (never used as a path)
+    filename: Optional[str]
+
+
+def _too_large(max_bytes: int) -> UploadTooLarge:
+    return UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+
+
+def copy_hashed(source: BinaryIO, path: Path, max_bytes: int = UPLOAD_MAX_BYTES,
+                block_size: int = UPLOAD_BLOCK_SIZE) -> SavedUpload:
+    """
+    Copy source to a new file at path block by block, hashing as it goes.
+    Raises UploadTooLarge as soon as more than max_bytes have been read
+    (0 = no limit); the partial file is removed on any failure.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        # "xb": never overwrite another request's file
+        with open(path, "xb") as f:
+            for block in iter(lambda: source.read(block_size), b""):
+                size += len(block)
+                if max_bytes and size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(block)
+                f.write(block)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return SavedUpload(path, digest.hexdigest(), size, None)
+
+
+def link_upload(path: Path, folder: Path) -> Path:
+    """
+    A second, randomly named file under folder with path's content (a hard
+    link; a copy across filesystems), so work on the upload can outlive the
+    owner of path deleting it.
+    """
+    target = Path(folder) / f"{uuid.uuid4()}.pdf"
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copyfile(path, target)
+    return target
+
+
+async def save_upload(file, folder: Path, name: Optional[str] = None, max_bytes: int = UPLOAD_MAX_BYTES) -> SavedUpload:
+    """
+    Save a FastAPI UploadFile under folder as name (default: a random
+    <uuid>.pdf) and return where it went with its hash and size. The copy
+    runs in a worker thread; the event loop is never blocked on disk I/O.
+    """
+    # Reject before copying anything when the parser already knows the size
+    if max_bytes and file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+    path = Path(folder) / (name or f"{uuid.uuid4()}.pdf")
+    await file.seek(0)
+    saved = await asyncio.to_thread(copy_hashed, file.file, path, max_bytes)
+    saved.filename = file.filename
+    return saved
@@ -9,6 +9,7 @@ from firebase_admin import storage
 from pathlib import Path
 import mimetypes
 from dotenv import load_dotenv
+from services.metrics import timed
 
 # Load environment variables
 load_dotenv()
@@ -70,6 +71,7 @@ class FirebaseStorageService:
         """Generate the storage path for a user's video"""
         return f"users/{user_id}/videos/{video_name}"
     
+    @timed("firebase_upload")
     def upload_video(self, user_id: str, video_file_path: str, video_name: str = None) -> Dict[str, str]:
         """
         Upload a video file to Firebase Storage under user's folder
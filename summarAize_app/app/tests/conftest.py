@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the app's modules (and benchmarks) the way main.py does, from the app directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
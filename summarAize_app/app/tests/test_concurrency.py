@@ -0,0 +1,63 @@
+"""
+Concurrent summarizations on one shared summarizer must not leak
+per-document state: the check of benchmarks/stress_concurrency.py (mixed
+options, both PDFs), run against the local fake OpenAI server with a
+byte-level stand-in for the tiktoken encoding so no BPE file is needed.
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+
+import pytest
+import tiktoken
+
+from benchmarks.bench_pipeline import _configure_environment, _quiet
+from benchmarks.common import CORPUS
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+from benchmarks.stress_concurrency import _run_async, _run_threads
+
+CONCURRENCY = 8
+
+_BYTE_ENCODING = tiktoken.Encoding(
+    name="bytes",
+    pat_str=r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+""",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={},
+)
+
+
+@pytest.fixture(scope="module")
+def expected_references(tmp_path_factory):
+    """Point the app at a fake server, then find each PDF's references with a solo run."""
+    server = FakeOpenAIServer(config=FakeOpenAIConfig(latency_ms=5, jitter_ms=20)).start()
+    environ, cwd = dict(os.environ), os.getcwd()
+    with pytest.MonkeyPatch.context() as patch:
+        try:
+            _configure_environment(server, str(tmp_path_factory.mktemp("stress")))
+            import services.tokenizer
+            patch.setattr(services.tokenizer, "get_encoding", lambda name: _BYTE_ENCODING)
+            from textSummarize import PdfSummarizer
+
+            with _quiet(True):
+                solo = PdfSummarizer()
+                yield {path: solo.summarize_pdf(path)["references"] for path in CORPUS}
+        finally:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environ)
+            server.stop()
+
+
+def test_async_summaries_keep_their_own_state(expected_references):
+    with _quiet(True):
+        run = asyncio.run(_run_async(CONCURRENCY, expected_references))
+    assert run["reference_mismatches"] == []
+    assert run["tokens_attributed"] == run["tokens_spent"]
+
+
+def test_threaded_summaries_keep_their_own_state(expected_references):
+    with _quiet(True):
+        run = _run_threads(CONCURRENCY, expected_references)
+    assert run["reference_mismatches"] == []
+    assert run["tokens_attributed"] == run["tokens_spent"]
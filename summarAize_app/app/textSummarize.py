@@ -1,13 +1,26 @@
 import os
 import argparse
-from PyPDF2 import PdfReader
-from openai import OpenAI
-import tiktoken
+from openai import OpenAI, AsyncOpenAI
 from tqdm import tqdm
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import re
 import json
+import threading
+import time
+from services.chunker import TokenChunker
+from services.tokenizer import encoding_for_model
+from services.keywords import KEYWORD_CANDIDATES, KEYWORD_MODE, KEYWORD_MODES, extract_keywords_local
+from services.hedging import hedge_policy as default_hedge_policy
+from services.extractive import PREFILTER_KEEP_RATIO, PREFILTER_MAX_TOKENS, prefilter_options, select_sentences
+from services.pdf_text import BACKENDS as PDF_BACKENDS, extract_page_texts
+from services.references import find_in_text_citations, find_numbered_references, find_references_section, split_reference_entries
+from services.summary_cache import make_chunk_key
+from services.summary_context import SummaryContext, bind_context, context_scope, current_context
+from services.llm_scheduler import llm_scheduler, estimate_tokens, COMPILE, MAP, SUMMARIZER_MODEL
+from services.metrics import record_error, record_llm_call, stage_timer, timed
+from services.pipeline import Pipeline, THREAD
 
 load_dotenv()
 
@@ -17,12 +30,42 @@ MATH_INJECTION = (
     "and `$$...$$` for display math.\n\n"
 )
 
+# Completion budgets of chunk and merge summaries (concise / detailed)
+SUMMARY_MAX_TOKENS = 1500
+DETAILED_SUMMARY_MAX_TOKENS = 5000
+
 class PdfSummarizer:
-    def __init__(self, api_key=None, model="gpt-4o", max_tokens=8192, overlap=200, max_workers=5):
+    def __init__(self, api_key=None, model=SUMMARIZER_MODEL, max_tokens=8192, overlap=200, max_workers=5, compile_tokens=24000, chunk_cache=None, pdf_backend=None, llm_slots=None,
+                 prefilter_ratio=None, prefilter_tokens=None, keyword_mode=None):
         self.model = model
+        # Text extractor for extract_text_from_pdf ("pymupdf" or "pypdf2"); None uses PDF_TEXT_BACKEND
+        self.pdf_backend = pdf_backend
         self.max_tokens = max_tokens
         self.overlap = overlap
         self.max_workers = max_workers
+        # Input budget for a single compile/merge prompt; longer inputs are reduced hierarchically.
+        # A merged summary must fit in it, or merging could never bring the input under it
+        if compile_tokens < DETAILED_SUMMARY_MAX_TOKENS:
+            raise ValueError(f"compile_tokens must be at least {DETAILED_SUMMARY_MAX_TOKENS}, "
+                             f"the length of a detailed merged summary (got {compile_tokens})")
+        self.compile_tokens = compile_tokens
+        # Optional SummaryCache memoizing map-step results, so re-runs that only change
+        # compile options (or retry a failed compile) skip the chunk calls
+        self.chunk_cache = chunk_cache
+        # Optional semaphore shared with other processes (e.g. a multiprocessing.BoundedSemaphore)
+        # capping the LLM requests in flight across all of them
+        self.llm_slots = llm_slots
+        # Extractive prefilter before chunking: keep the best sentences up to this fraction
+        # of the document's tokens (1 = off) and at most prefilter_tokens tokens (0 = no cap)
+        self.prefilter_ratio = PREFILTER_KEEP_RATIO if prefilter_ratio is None else prefilter_ratio
+        self.prefilter_tokens = PREFILTER_MAX_TOKENS if prefilter_tokens is None else prefilter_tokens
+        # How extract_keywords uses the local extractor and the LLM (see services.keywords)
+        self.keyword_mode = keyword_mode or KEYWORD_MODE
+        if self.keyword_mode not in KEYWORD_MODES:
+            raise ValueError(f"Unknown keyword mode {self.keyword_mode!r}. Choose from: {', '.join(KEYWORD_MODES)}")
+        # Tokens consumed by this instance's LLM calls (estimated when the response has no usage)
+        self.tokens_used = 0
+        self._usage_lock = threading.Lock()
         
         api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key:
@@ -30,58 +73,45 @@ class PdfSummarizer:
         
         self.client = OpenAI(api_key=api_key)
         
-        self.encoding = tiktoken.encoding_for_model(model)
+        # Shared by every summarizer in the process, read from the local BPE cache
+        self.encoding = encoding_for_model(model)
     
+    @timed("pdf_extraction")
     def extract_text_from_pdf(self, pdf_path):
         try:
-            reader = PdfReader(pdf_path)
-
-            return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
+            page_texts = extract_page_texts(pdf_path, backend=self.pdf_backend)
+            return "\n".join([text for text in page_texts if text])
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {e}")
     
-    def split_into_chunks(self, text, method="sentence"):
-        tokens = self.encoding.encode(text)
-        
-        if len(tokens) <= self.max_tokens - 1500:
-            return [text]
-        
-        if method == "sentence":
-            sentences = re.split(r'(?<=[.!?])\s+', text)
-            chunks, current_chunk = [], ""
-            current_tokens = 0
-
-            for sentence in sentences:
-                sentence_tokens = self.encoding.encode(sentence)
-                if current_tokens + len(sentence_tokens) > self.max_tokens - 1500:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = sentence
-                    current_tokens = len(sentence_tokens)
-                else:
-                    current_chunk += " " + sentence if current_chunk else sentence
-                    current_tokens += len(sentence_tokens)
-
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-        else:
-            # Token-based chunking with overlap
-            chunks = []
-            start_idx = 0
-            
-            while start_idx < len(tokens):
-                # Calculate end index for current chunk
-                end_idx = min(start_idx + self.max_tokens - 1500, len(tokens))
-                # Decode token subset back to text
-                chunk_tokens = tokens[start_idx:end_idx]
-                chunk_text = self.encoding.decode(chunk_tokens)
-                chunks.append(chunk_text)
-                
-                # Move start index for next chunk, considering overlap
-                start_idx = end_idx - self.overlap
-        
-        return chunks
+    def output_options(self):
+        """Settings besides model/detailed/citations that change the summary, for make_cache_key"""
+        return {**prefilter_options(self.prefilter_ratio, self.prefilter_tokens), "keywords": self.keyword_mode}
+
+    @timed("prefilter")
+    def prefilter_text(self, text, tokens):
+        """
+        Keep only the most central sentences (TF-IDF + TextRank) before chunking,
+        when a prefilter is configured. Returns (text, tokens) for the map step.
+        """
+        if not prefilter_options(self.prefilter_ratio, self.prefilter_tokens):
+            return text, tokens
+        filtered = select_sentences(text, self.prefilter_ratio, self.prefilter_tokens, self.encoding)
+        filtered_tokens = self.encoding.encode(filtered)
+        print(f"Prefilter kept {len(filtered_tokens):,} of {len(tokens):,} tokens")
+        return filtered, filtered_tokens
+
+    @timed("chunking")
+    def split_into_chunks(self, text, method="sentence", tokens=None):
+        """
+        Split text into chunks that fit the model's context, tokenizing only once.
+        Pass tokens when the caller has already encoded text.
+        """
+        chunker = TokenChunker(self.encoding, self.max_tokens - 1500, overlap=self.overlap)
+        return chunker.split(text, method=method, tokens=tokens)
     
-    def summarize_chunk(self, chunk, is_first=False, is_last=False, detailed=False):
+    def _chunk_request(self, chunk, is_first=False, is_last=False, detailed=False):
+        """Build the chat completion arguments for summarizing one chunk"""
         if is_first and is_last:
             prompt = f"""
             Please summarize the following research paper. Cover the key findings, methodology, 
@@ -116,55 +146,98 @@ class PdfSummarizer:
             {chunk}
             """
             
-        try:
-            system_msg = MATH_INJECTION + (
-                "You are a research assistant that creates concise yet comprehensive summaries of academic papers."
-                if not detailed
-                else
-                "You are a research assistant that creates comprehensive summaries of academic papers with detailed breakdowns "
-                "of each subtopic and concept within the research paper for complete beginners."
+        system_msg = MATH_INJECTION + (
+            "You are a research assistant that creates concise yet comprehensive summaries of academic papers."
+            if not detailed
+            else
+            "You are a research assistant that creates comprehensive summaries of academic papers with detailed breakdowns "
+            "of each subtopic and concept within the research paper for complete beginners."
+        )
+        if not detailed:
+            return dict(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_msg},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=SUMMARY_MAX_TOKENS
             )
-            # Updated API call for OpenAI SDK 1.0.0+
-            if not detailed:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_msg},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1500
-                )
-                return response.choices[0].message.content
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": f"For any summary, extract keywords and give a long detailed explanation for every keyword for someone with no background knowledge. {prompt}"}
+            ],
+            temperature=0.3,
+            max_tokens=DETAILED_SUMMARY_MAX_TOKENS
+        )
+
+    def _complete(self, request, priority=MAP, call="llm"):
+        """Send a chat completion through the process-wide LLM scheduler; call names it in the metrics"""
+        estimate = estimate_tokens(request)
+        grant = llm_scheduler.acquire(request["model"], estimate, priority)
+        started = time.perf_counter()
+        try:
+            if self.llm_slots is not None:
+                with self.llm_slots:
+                    raw = self.client.chat.completions.with_raw_response.create(**request)
             else:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_msg},
-                        {"role": "user", "content": f"For any summary, extract keywords and give a long detailed explanation for every keyword for someone with no background knowledge. {prompt}"}
-                    ],
-                    temperature=0.3,
-                    max_tokens=5000
-                )
-                return response.choices[0].message.content
+                raw = self.client.chat.completions.with_raw_response.create(**request)
+            response = raw.parse()
+        except Exception:
+            record_error(f"llm_{call}")
+            raise
+        self._record_usage(request["model"], call, estimate, response.usage,
+                           time.perf_counter() - started, raw.retries_taken, grant)
+        return response
+
+    def _record_usage(self, model, call, estimate, usage, seconds, retries=0, grant=None):
+        actual = getattr(usage, "total_tokens", None)
+        queued = None
+        if grant is not None:
+            llm_scheduler.record_usage(model, grant.cost, actual)
+            queued = grant.waited
+        record_llm_call(call, model, seconds, usage, retries, queued)
+        tokens = actual if actual is not None else estimate
+        with self._usage_lock:
+            self.tokens_used += tokens
+        context = current_context()
+        if context is not None:
+            context.record_usage(tokens)
+
+    def _chunk_cache_key(self, chunk, is_first, is_last, detailed):
+        return make_chunk_key(chunk, is_first, is_last, detailed, self.model)
+
+    def summarize_chunk(self, chunk, is_first=False, is_last=False, detailed=False):
+        if self.chunk_cache is not None:
+            cache_key = self._chunk_cache_key(chunk, is_first, is_last, detailed)
+            cached = self.chunk_cache.get(cache_key)
+            if cached is not None:
+                return cached["summary"]
+
+        try:
+            # Updated API call for OpenAI SDK 1.0.0+
+            response = self._complete(self._chunk_request(chunk, is_first, is_last, detailed), MAP, call="chunk")
+            summary = response.choices[0].message.content
         except Exception as e:
             raise Exception(f"Error calling OpenAI API: {e}")
+
+        if self.chunk_cache is not None and summary:
+            self.chunk_cache.put(cache_key, {"summary": summary})
+        return summary
     
-    #compile chunks
-    def compile_summary(self, chunk_summaries, detailed=False, include_citations=False):
-        if len(chunk_summaries) == 1:
-            return chunk_summaries[0]
-        
+    def _compile_request(self, chunk_summaries, detailed=False, include_citations=False, references=None):
+        """Build the chat completion arguments for compiling chunk summaries into one"""
         combined_summary = "\n\n".join([f"Chunk {i+1} Summary:\n{summary}" for i, summary in enumerate(chunk_summaries)])
 
         citation_instruction = ""
         if include_citations:
             # Prepare a list of extracted reference information for citation
             references_info = []
-            # This will be populated later in the summarize_pdf method
-            if hasattr(self, 'extracted_references') and self.extracted_references:
+            if references:
                 # Process up to 25 references to avoid token limits
-                for ref in self.extracted_references[:25]:
+                for ref in references[:25]:
                     # Try to extract author and year information
                     author_year = self._extract_author_year_from_reference(ref)
                     if author_year:
@@ -205,44 +278,134 @@ class PdfSummarizer:
             {combined_summary}
             """
         
+        system_msg = MATH_INJECTION + (
+            "You are a research assistant that creates cohesive summaries from partial summaries of academic papers."
+            if not detailed
+            else
+            "You are a research assistant that creates cohesive summaries from partial summaries of academic papers "
+            "with detailed breakdowns of each subtopic and concept within the research paper for complete beginners."
+        )
+
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=2000 if not detailed else 10000
+        )
+
+    def _merge_request(self, summaries, detailed=False):
+        """Build the chat completion arguments for merging consecutive partial summaries"""
+        combined_summary = "\n\n".join([f"Part {i+1} Summary:\n{summary}" for i, summary in enumerate(summaries)])
+        detail_instruction = (
+            "Keep the detailed explanations of every subtopic and concept."
+            if detailed
+            else
+            "Keep it concise but preserve every key finding, method and result."
+        )
+        prompt = f"""
+            Below are summaries of consecutive parts of a research paper. Merge them into a single summary
+            of this portion of the paper, in the original order. Eliminate redundancies but do not drop
+            information that a final summary of the whole paper would need. {detail_instruction}
+            
+            {combined_summary}
+            """
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": MATH_INJECTION + "You are a research assistant that merges partial summaries of academic papers."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=DETAILED_SUMMARY_MAX_TOKENS if detailed else SUMMARY_MAX_TOKENS
+        )
+
+    def _group_for_compile(self, summaries):
+        """
+        Return None if the summaries fit in one compile prompt (or there is only
+        one, which merging cannot shorten), otherwise split them into
+        consecutive groups that each fit within compile_tokens
+        """
+        if len(summaries) <= 1:
+            return None
+        counts = [len(self.encoding.encode(summary)) for summary in summaries]
+        if sum(counts) <= self.compile_tokens:
+            return None
+
+        groups, current, current_tokens = [], [], 0
+        for summary, count in zip(summaries, counts):
+            if current and current_tokens + count > self.compile_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += count
+        if current:
+            groups.append(current)
+
+        if len(groups) == len(summaries):
+            # Every summary fills a prompt on its own: merge pairs so each level still shrinks
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return groups
+
+    def _merge_summaries(self, summaries, detailed=False):
+        if len(summaries) == 1:
+            return summaries[0]
         try:
-            system_msg = MATH_INJECTION + (
-                "You are a research assistant that creates cohesive summaries from partial summaries of academic papers."
-                if not detailed
-                else
-                "You are a research assistant that creates cohesive summaries from partial summaries of academic papers "
-                "with detailed breakdowns of each subtopic and concept within the research paper for complete beginners."
-            )
+            response = self._complete(self._merge_request(summaries, detailed), COMPILE, call="merge")
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API while merging summaries: {e}")
 
-            if not detailed: 
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_msg},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=2000
-                )
-                return response.choices[0].message.content
-            else:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_msg},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=10000
-                )
-                return response.choices[0].message.content
+    def reduce_summaries(self, summaries, detailed=False):
+        """
+        Tree-reduce summaries level by level, merging groups in parallel, until
+        they fit in a single compile prompt
+        """
+        level = 0
+        groups = self._group_for_compile(summaries)
+        while groups:
+            level += 1
+            print(f"Compile level {level}: merging {len(summaries)} summaries in {len(groups)} groups...")
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as executor:
+                summaries = list(executor.map(bind_context(lambda group: self._merge_summaries(group, detailed)), groups))
+            groups = self._group_for_compile(summaries)
+        return summaries
+
+    #compile chunks
+    @timed("compile")
+    def compile_summary(self, chunk_summaries, detailed=False, include_citations=False, references=None):
+        if len(chunk_summaries) == 1:
+            return chunk_summaries[0]
+
+        chunk_summaries = self.reduce_summaries(chunk_summaries, detailed)
+
+        try:
+            response = self._complete(self._compile_request(chunk_summaries, detailed, include_citations, references), COMPILE, call="compile")
+            return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"Error calling OpenAI API for final summary: {e}")
     
-    def summarize_pdf(self, pdf_path, output_path=None, chunk_method="sentence", parallel=True, detailed=False, include_citations=False):
-        #extract text
-        print(f"Extracting text from {pdf_path}...")
-        text = self.extract_text_from_pdf(pdf_path)
+    def summarize_pdf(self, pdf_path, output_path=None, chunk_method="sentence", parallel=True, detailed=False, include_citations=False, document=None,
+                      context=None):
+        """
+        Summarize a PDF. Per-document state (references, tokens spent) goes in
+        context (a new SummaryContext by default), never on self, so one
+        summarizer can serve many documents at once.
+        """
+        context = context or SummaryContext()
+        with context_scope(context):
+            return self._summarize_pdf(pdf_path, output_path, chunk_method, parallel, detailed, include_citations, document,
+                                       context)
+
+    def _summarize_pdf(self, pdf_path, output_path, chunk_method, parallel, detailed, include_citations, document, context):
+        #extract text (reuse the caller's ParsedDocument when there is one)
+        if document is not None:
+            text = document.text
+        else:
+            print(f"Extracting text from {pdf_path}...")
+            text = self.extract_text_from_pdf(pdf_path)
         
         #total count
         tokens = self.encoding.encode(text)
@@ -251,12 +414,13 @@ class PdfSummarizer:
         
         # Always extract references regardless of citation setting
         print("Extracting references...")
-        self.extracted_references = self.extract_references(text)
-        print(f"Found {len(self.extracted_references)} references")
+        context.references = self.extract_references(text)
+        print(f"Found {len(context.references)} references")
         
         #split chunks
+        summary_text, summary_tokens = self.prefilter_text(text, tokens)
         print(f"Splitting text into chunks using {chunk_method}-based chunking...")
-        chunks = self.split_into_chunks(text, method=chunk_method)
+        chunks = self.split_into_chunks(summary_text, method=chunk_method, tokens=summary_tokens)
         print(f"Split into {len(chunks)} chunks")
         
         #summarize chunks
@@ -266,7 +430,7 @@ class PdfSummarizer:
         if parallel and len(chunks) > 1:
             with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
                 futures = [
-                    executor.submit(self.summarize_chunk, chunk, i == 0, i == len(chunks) - 1, detailed)
+                    executor.submit(bind_context(self.summarize_chunk), chunk, i == 0, i == len(chunks) - 1, detailed)
                     for i, chunk in enumerate(chunks)
                 ]
                 for future in tqdm(futures):
@@ -280,10 +444,7 @@ class PdfSummarizer:
         
         #compile final
         print("Compiling final summary...")
-        final_summary = self.compile_summary(chunk_summaries, detailed, include_citations)
-        
-        # References are extracted and stored in self.extracted_references but not added to summary
-        # They can be accessed separately if needed
+        final_summary = self.compile_summary(chunk_summaries, detailed, include_citations, context.references)
         
         #save to file
         if output_path:
@@ -293,10 +454,11 @@ class PdfSummarizer:
         
         return {
             'summary': final_summary,
-            'references': self.extracted_references,
-            'reference_count': len(self.extracted_references)
+            'references': context.references,
+            'reference_count': len(context.references)
         }
 
+    @timed("references")
     def extract_references(self, text):
         """
         Extract references from the text using multiple strategies
@@ -305,33 +467,9 @@ class PdfSummarizer:
         print("Starting reference extraction...")
         
         try:
-            # Strategy 1: Find references section with comprehensive header patterns
-            reference_patterns = [
-                r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*(?:APPENDIX|Appendix|SUPPLEMENT|Supplement|ACKNOWLEDGMENT|Acknowledgment|AUTHOR|Author|AFFILIATION|Affiliation|FIGURE|Figure|TABLE|Table)|\Z)',
-                r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*\n\s*[A-Z][A-Z\s]+\n|\Z)',
-                r'(?:^|\n)(?:REFERENCES?|Bibliography|Works?\s+Cited|Literature\s+Cited|Citations?)\s*\n([\s\S]+?)(?:\n\s*\n|\Z)'
-            ]
-            
-            references_text = None
-            for pattern in reference_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    references_text = match.group(1).strip()
-                    print(f"Found references section using pattern match (length: {len(references_text)} chars)")
-                    break
-            
-            if references_text:
-                # Strategy 2: Parse the references section using multiple approaches
-                references = self._parse_references_section(references_text)
-                if references and len(references) >= 1:  # Accept even single references
-                    print(f"Successfully extracted {len(references)} references using pattern parsing")
-                    return references
-            
-            # Strategy 3: Look for numbered reference patterns throughout the text
-            numbered_refs = self._extract_numbered_references(text)
-            if numbered_refs and len(numbered_refs) >= 1:
-                print(f"Successfully extracted {len(numbered_refs)} numbered references")
-                return numbered_refs
+            references, references_text = self._extract_references_locally(text)
+            if references:
+                return references
             
             # Strategy 4: AI-powered extraction with specific reference section focus
             if references_text:  # Only if we found a references section
@@ -340,136 +478,63 @@ class PdfSummarizer:
                     print(f"Successfully extracted {len(ai_refs)} references using AI parsing")
                     return ai_refs
             
-            # Strategy 5: Look for in-text citations as last resort
-            citations = self._extract_in_text_citations(text)
-            if citations:
-                print(f"Found {len(citations)} in-text citations (no reference list found)")
-                return [f"This document contains {len(citations)} in-text citations but no complete reference list was found."]
-            
-            print("No references found in document")
-            return ["No references were found in this document."]
+            return self._fallback_references(text)
             
         except Exception as e:
             print(f"Error extracting references: {e}")
             return [f"Error occurred while extracting references: {str(e)}"]
 
-    def _parse_references_section(self, references_text):
-        """Parse a references section using multiple splitting strategies"""
-        references = []
-        
-        # Clean up the text
-        clean_text = re.sub(r'\n+', '\n', references_text.strip())
-        
-        # Strategy 1: Split by year patterns - most reliable since every reference should have a year
-        # Split after year patterns like "2020." or "(2020)." or "2020)" etc.
-        year_patterns = [
-            r'((?:19|20)\d{2}[a-z]?\.)\s*\n',  # "2020." followed by newline
-            r'(\((?:19|20)\d{2}[a-z]?\)\.)\s*\n',  # "(2020)." followed by newline  
-            r'(\((?:19|20)\d{2}[a-z]?\))\s*\n',  # "(2020)" followed by newline
-            r'((?:19|20)\d{2}[a-z]?)\.\s*\n',  # "2020." (with period after) followed by newline
-        ]
-        
-        for pattern in year_patterns:
-            parts = re.split(pattern, clean_text)
-            if len(parts) > 2:  # Need at least 3 parts (text, delimiter, text)
-                # Reconstruct references by combining text with their delimiters
-                reconstructed_refs = []
-                for i in range(0, len(parts) - 1, 2):
-                    if i + 1 < len(parts):
-                        ref_text = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
-                        if ref_text.strip() and len(ref_text.strip()) > 10:
-                            reconstructed_refs.append(ref_text.strip())
-                
-                if len(reconstructed_refs) >= 1:
-                    references.extend(reconstructed_refs)
-                    break  # Found references, use this pattern
-        
-        # Strategy 2: Split by numbered patterns [1], [2] or 1., 2. (if year splitting didn't work)
-        if not references:
-            numbered_pattern = r'\n(?=\s*(?:\[\d+\]|\d+\.)\s*[A-Z])'
-            parts = re.split(numbered_pattern, clean_text)
-            if len(parts) > 1:
-                refs = [part.strip() for part in parts if part.strip() and len(part.strip()) > 10]
-                if len(refs) >= 1:
-                    references.extend(refs)
-        
-        # Strategy 3: Split by author patterns (Last, F. or Last, F. M.)
-        if not references:
-            author_pattern = r'\n(?=\s*[A-Z][a-z]+,\s+[A-Z]\.(?:\s+[A-Z]\.)?(?:\s+[A-Z]\.)*\s+(?:\(\d{4}\)|[\"\']|[A-Z]))'
-            parts = re.split(author_pattern, clean_text)
-            if len(parts) > 1:
-                refs = [part.strip() for part in parts if part.strip() and len(part.strip()) > 10]
-                if len(refs) >= 1:
-                    references.extend(refs)
-        
-        # Strategy 4: Line-by-line parsing for complex formats
-        if not references:
-            lines = clean_text.split('\n')
-            current_ref = ""
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if this line starts a new reference
-                if (re.match(r'^\s*(?:\[\d+\]|\d+\.)\s*[A-Z]', line) or 
-                    re.match(r'^\s*[A-Z][a-z]+,\s+[A-Z]\.', line)):
-                    if current_ref and len(current_ref) > 10:
-                        references.append(current_ref.strip())
-                    current_ref = line
-                else:
-                    current_ref += " " + line if current_ref else line
-            
-            # Add the last reference
-            if current_ref and len(current_ref) > 10:
-                references.append(current_ref.strip())
+    def _extract_references_locally(self, text):
+        """
+        Run the non-AI reference strategies (section parsing, numbered references)
+        Returns (references or None, references section text or None)
+        """
+        # Strategy 1: Find the references section, scanning back from the end of the text
+        references_text = find_references_section(text)
+        if references_text:
+            print(f"Found references section (length: {len(references_text)} chars)")
         
-        # Strategy 5: If still no references, try the most aggressive approach
-        if not references:
-            # Split by any pattern that looks like a year ending
-            aggressive_pattern = r'(?<=(?:19|20)\d{2}[a-z]?[\.\)])\s*\n(?=\s*[A-Z])'
-            parts = re.split(aggressive_pattern, clean_text)
-            if len(parts) > 1:
-                refs = [part.strip() for part in parts if part.strip() and len(part.strip()) > 5]
-                if len(refs) >= 1:
-                    references.extend(refs)
+        if references_text:
+            # Strategy 2: Parse the references section using multiple approaches
+            references = self._parse_references_section(references_text)
+            if references and len(references) >= 1:  # Accept even single references
+                print(f"Successfully extracted {len(references)} references using pattern parsing")
+                return references, references_text
         
-        # Remove duplicates and clean up
-        unique_refs = []
-        seen = set()
-        for ref in references:
-            # Clean up reference but keep it mostly intact
-            ref_clean = re.sub(r'^\s*(?:\[\d+\]|\d+\.)\s*', '', ref).strip()
-            if ref_clean and ref_clean not in seen and len(ref_clean) > 5:
-                seen.add(ref_clean)
-                unique_refs.append(ref_clean)
+        # Strategy 3: Look for numbered reference patterns throughout the text
+        numbered_refs = self._extract_numbered_references(text)
+        if numbered_refs and len(numbered_refs) >= 1:
+            print(f"Successfully extracted {len(numbered_refs)} numbered references")
+            return numbered_refs, references_text
+
+        return None, references_text
+
+    def _fallback_references(self, text):
+        """Strategy 5: report in-text citations when no reference list could be found"""
+        citations = self._extract_in_text_citations(text)
+        if citations:
+            print(f"Found {len(citations)} in-text citations (no reference list found)")
+            return [f"This document contains {len(citations)} in-text citations but no complete reference list was found."]
         
+        print("No references found in document")
+        return ["No references were found in this document."]
+
+    def _parse_references_section(self, references_text):
+        """Split a references section into individual references"""
+        unique_refs = split_reference_entries(references_text)
         print(f"Extracted {len(unique_refs)} unique references from references section")
-        return unique_refs[:100]  # Limit to 100 references max
+        return unique_refs
 
     def _extract_numbered_references(self, text):
         """Extract numbered references from anywhere in the text"""
-        references = []
-        
-        # Look for patterns like [1] Author, Title...
-        pattern = r'\[(\d+)\]\s*([A-Z][^\[\]]+?)(?=\s*\[\d+\]|\s*$|\n\s*\n)'
-        matches = re.findall(pattern, text, re.DOTALL)
-        
-        if matches:
-            for num, ref_text in matches:
-                clean_ref = re.sub(r'\s+', ' ', ref_text.strip())
-                if len(clean_ref) > 5:  # Reduced from 20 to 5
-                    references.append(clean_ref)
-        
-        return references
+        return find_numbered_references(text)
 
-    def _ai_extract_references(self, references_text):
-        """Use AI to extract references from a specific references section"""
-        try:
-            # Limit text to avoid token limits
-            limited_text = references_text[:8000]  # Much more focused than before
-            
-            prompt = f"""You are extracting references from an academic paper's reference section. 
+    def _references_request(self, references_text):
+        """Build the chat completion arguments for AI reference extraction"""
+        # Limit text to avoid token limits
+        limited_text = references_text[:8000]  # Much more focused than before
+        
+        prompt = f"""You are extracting references from an academic paper's reference section. 
 Extract EVERY reference listed in this section, no matter how short or long. Each reference should be on a separate line.
 Do NOT create or invent references. Only extract what is actually written in the text.
 Remove any numbering (like [1], 1., etc.) from the beginning of each reference.
@@ -487,39 +552,45 @@ Instructions:
 - Include URLs, DOIs, and web references if present
 - Extract conference proceedings, books, journal articles, and any other citation types
 """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a precise reference extraction assistant. Only extract actual references from the provided text."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.1  # Very low temperature for precision
-            )
-            
-            result = response.choices[0].message.content.strip()
-            
-            if "No clear references found" in result:
-                return []
-            
-            # Split by lines and clean up
-            refs = [ref.strip() for ref in result.split('\n') if ref.strip()]
-            # Filter out obviously bad references with less restrictive validation
-            valid_refs = []
-            for ref in refs:
-                # Much more permissive validation - just basic quality checks
-                if (len(ref) > 5 and  # Much shorter minimum length
-                    not ref.lower().startswith('no references') and
-                    not ref.lower().startswith('note:') and
-                    not ref.lower().startswith('here are') and
-                    not ref.lower().startswith('the references') and
-                    # Accept any reference that has basic structure (letters and some punctuation)
-                    (any(char.isalpha() for char in ref) and 
-                     any(char in ref for char in '.,;:'))):  # Basic punctuation check
-                    valid_refs.append(ref)
-            
-            return valid_refs[:50]  # Increased limit to 50 references
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a precise reference extraction assistant. Only extract actual references from the provided text."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1500,
+            temperature=0.1  # Very low temperature for precision
+        )
+
+    def _parse_ai_references(self, result):
+        """Turn the model's one-reference-per-line answer into a list of references"""
+        if "No clear references found" in result:
+            return []
+        
+        # Split by lines and clean up
+        refs = [ref.strip() for ref in result.split('\n') if ref.strip()]
+        # Filter out obviously bad references with less restrictive validation
+        valid_refs = []
+        for ref in refs:
+            # Much more permissive validation - just basic quality checks
+            if (len(ref) > 5 and  # Much shorter minimum length
+                not ref.lower().startswith('no references') and
+                not ref.lower().startswith('note:') and
+                not ref.lower().startswith('here are') and
+                not ref.lower().startswith('the references') and
+                # Accept any reference that has basic structure (letters and some punctuation)
+                (any(char.isalpha() for char in ref) and 
+                 any(char in ref for char in '.,;:'))):  # Basic punctuation check
+                valid_refs.append(ref)
+        
+        return valid_refs[:50]  # Increased limit to 50 references
+
+    def _ai_extract_references(self, references_text):
+        """Use AI to extract references from a specific references section"""
+        try:
+            response = self._complete(self._references_request(references_text), MAP, call="references")
+            return self._parse_ai_references(response.choices[0].message.content.strip())
             
         except Exception as e:
             print(f"AI extraction error: {e}")
@@ -527,55 +598,57 @@ Instructions:
 
     def _extract_in_text_citations(self, text):
         """Extract in-text citations as a last resort"""
-        citation_patterns = [
-            r'\([A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s+\d{4}[a-z]?\)',  # (Author, 2020)
-            r'\([A-Z][a-z]+(?:\s+&\s+[A-Z][a-z]+)?,?\s+\d{4}[a-z]?\)',  # (Author & Author, 2020)
-            r'\[[A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s+\d{4}[a-z]?\]'   # [Author, 2020]
-        ]
+        return find_in_text_citations(text)
+
+    def _keywords_request(self, text, candidates=None):
+        """Build the chat completion arguments for keyword extraction"""
+        # Take the first 10000 tokens which likely include abstract and introduction
+        truncated_text = text[:10000] 
         
-        citations = set()
-        for pattern in citation_patterns:
-            matches = re.findall(pattern, text)
-            citations.update(matches)
+        prompt = ("Extract the 5-10 most important keywords or concepts from this document. "
+                 "For each keyword, provide a relevance score from 0-10 and a brief explanation "
+                 "of why it's important to the document's content. "
+                 "Format your response as JSON with the structure: "
+                 "[{\"keyword\": \"example\", \"score\": 8, \"explanation\": \"Brief reason\"}].\n\n")
+        if candidates:
+            # The excerpt is only the start of the document; the candidates come from all of it
+            prompt += ("Candidate terms ranked by how prominent they are in the full document "
+                       "(prefer these where they fit): " + ", ".join(item["keyword"] for item in candidates) + "\n\n")
+        prompt += truncated_text
         
-        return list(citations)[:20]  # Limit to 20 citations
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "system", "content": "You are a keyword extraction assistant."},
+                     {"role": "user", "content": prompt}],
+            max_tokens=800,
+            temperature=0.3
+        )
+
+    def _parse_keywords(self, result):
+        """Parse the JSON keyword list out of the model's answer"""
+        # Extract JSON from the response - handling cases where the model adds extra text
+        json_match = re.search(r'(\[\s*\{.*\}\s*\])', result, re.DOTALL)
+        if json_match:
+            result = json_match.group(1)
             
+        return json.loads(result)
+
+    @timed("keywords")
     def extract_keywords(self, text):
         """
-        Extract keywords from the document using OpenAI
+        Extract keywords from the document locally and/or using OpenAI, per keyword_mode
         Returns a list of keyword dictionaries with keyword, score and explanation
         """
+        if self.keyword_mode == "primary":
+            return extract_keywords_local(text)
         try:
-            # Take the first 10000 tokens which likely include abstract and introduction
-            truncated_text = text[:10000] 
-            
-            prompt = ("Extract the 5-10 most important keywords or concepts from this document. "
-                     "For each keyword, provide a relevance score from 0-10 and a brief explanation "
-                     "of why it's important to the document's content. "
-                     "Format your response as JSON with the structure: "
-                     "[{\"keyword\": \"example\", \"score\": 8, \"explanation\": \"Brief reason\"}].\n\n" + truncated_text)
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "system", "content": "You are a keyword extraction assistant."},
-                         {"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.3
-            )
-            
-            result = response.choices[0].message.content.strip()
-            
-            # Extract JSON from the response - handling cases where the model adds extra text
-            json_match = re.search(r'(\[\s*\{.*\}\s*\])', result, re.DOTALL)
-            if json_match:
-                result = json_match.group(1)
-                
-            keywords = json.loads(result)
-            return keywords
-            
+            candidates = extract_keywords_local(text, top_n=KEYWORD_CANDIDATES) if self.keyword_mode == "prefilter" else None
+            response = self._complete(self._keywords_request(text, candidates), MAP, call="keywords")
+            keywords = self._parse_keywords(response.choices[0].message.content.strip())
         except Exception as e:
             print(f"Error extracting keywords: {e}")
-            return []
+            keywords = []
+        return keywords or extract_keywords_local(text)
     
     def _extract_author_year_from_reference(self, reference):
         """
@@ -622,26 +695,26 @@ Instructions:
         
         return None
 
-    def _format_references_section(self):
+    def _format_references_section(self, references):
         """
         Format the extracted references into a readable section for the summary
         Returns a formatted string with the references section
         """
-        if not hasattr(self, 'extracted_references') or not self.extracted_references:
+        if not references:
             return ""
         
         formatted_section = "## References\n\n"
         
         # Check if references are just error messages or empty
-        if (len(self.extracted_references) == 1 and 
-            ("No references" in self.extracted_references[0] or 
-             "Error occurred" in self.extracted_references[0] or
-             "citations but no complete reference list" in self.extracted_references[0])):
-            formatted_section += self.extracted_references[0]
+        if (len(references) == 1 and 
+            ("No references" in references[0] or 
+             "Error occurred" in references[0] or
+             "citations but no complete reference list" in references[0])):
+            formatted_section += references[0]
             return formatted_section
         
         # Format each reference with numbering
-        for i, reference in enumerate(self.extracted_references, 1):
+        for i, reference in enumerate(references, 1):
             # Clean up the reference text
             clean_ref = reference.strip()
             
@@ -653,11 +726,283 @@ Instructions:
         
         return formatted_section.rstrip()
 
+class AsyncPdfSummarizer(PdfSummarizer):
+    """
+    Asyncio variant of PdfSummarizer built on AsyncOpenAI.
+
+    Prompts and response parsing are shared with PdfSummarizer. LLM calls are
+    awaited instead of blocking the event loop, chunk summaries are fanned out
+    with asyncio.gather, and one semaphore caps the OpenAI requests in flight
+    across every summarization running on this instance. CPU-bound steps
+    (text extraction, tokenizing, reference parsing) run in worker threads.
+    Chunk calls can be hedged against slow responses (LLM_HEDGE_BUDGET).
+    """
+
+    def __init__(self, api_key=None, model=SUMMARIZER_MODEL, max_tokens=8192, overlap=200, max_concurrency=None, compile_tokens=24000, chunk_cache=None,
+                 hedge_policy=None):
+        max_concurrency = max_concurrency or int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+        super().__init__(api_key=api_key, model=model, max_tokens=max_tokens, overlap=overlap,
+                         max_workers=max_concurrency, compile_tokens=compile_tokens, chunk_cache=chunk_cache)
+        self.max_concurrency = max_concurrency
+        self.async_client = AsyncOpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Duplicates chunk calls stuck past the recent latency percentile, within a budget
+        self.hedge_policy = hedge_policy or default_hedge_policy
+
+    async def _create(self, request, priority=MAP, call="llm", sent=None):
+        async with self._semaphore:
+            estimate = estimate_tokens(request)
+            grant = await llm_scheduler.acquire_async(request["model"], estimate, priority)
+            # Admitted: hedging deadlines start here, not while queued (see HedgePolicy.run)
+            if sent is not None:
+                sent()
+            started = time.perf_counter()
+            try:
+                raw = await self.async_client.chat.completions.with_raw_response.create(**request)
+                response = raw.parse()
+            except Exception:
+                record_error(f"llm_{call}")
+                raise
+            self._record_usage(request["model"], call, estimate, response.usage,
+                               time.perf_counter() - started, raw.retries_taken, grant)
+            return response
+
+    async def summarize_chunk(self, chunk, is_first=False, is_last=False, detailed=False):
+        if self.chunk_cache is not None:
+            cache_key = self._chunk_cache_key(chunk, is_first, is_last, detailed)
+            cached = await asyncio.to_thread(self.chunk_cache.get, cache_key)
+            if cached is not None:
+                return cached["summary"]
+
+        try:
+            request = self._chunk_request(chunk, is_first, is_last, detailed)
+            response = await self.hedge_policy.run("chunk", lambda sent: self._create(request, call="chunk", sent=sent))
+            summary = response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {e}")
+
+        if self.chunk_cache is not None and summary:
+            await asyncio.to_thread(self.chunk_cache.put, cache_key, {"summary": summary})
+        return summary
+
+    async def _merge_summaries(self, summaries, detailed=False):
+        if len(summaries) == 1:
+            return summaries[0]
+        try:
+            response = await self._create(self._merge_request(summaries, detailed), COMPILE, call="merge")
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API while merging summaries: {e}")
+
+    async def reduce_summaries(self, summaries, detailed=False):
+        """
+        Tree-reduce summaries level by level, merging groups concurrently, until
+        they fit in a single compile prompt
+        """
+        level = 0
+        groups = await asyncio.to_thread(self._group_for_compile, summaries)
+        while groups:
+            level += 1
+            print(f"Compile level {level}: merging {len(summaries)} summaries in {len(groups)} groups...")
+            summaries = list(await asyncio.gather(*[self._merge_summaries(group, detailed) for group in groups]))
+            groups = await asyncio.to_thread(self._group_for_compile, summaries)
+        return summaries
+
+    @timed("compile")
+    async def compile_summary(self, chunk_summaries, detailed=False, include_citations=False, references=None):
+        if len(chunk_summaries) == 1:
+            return chunk_summaries[0]
+
+        chunk_summaries = await self.reduce_summaries(chunk_summaries, detailed)
+
+        try:
+            response = await self._create(self._compile_request(chunk_summaries, detailed, include_citations, references), COMPILE, call="compile")
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API for final summary: {e}")
+
+    async def _ai_extract_references(self, references_text):
+        """Use AI to extract references from a specific references section"""
+        try:
+            response = await self._create(self._references_request(references_text), call="references")
+            return self._parse_ai_references(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"AI extraction error: {e}")
+            return []
+
+    @timed("references")
+    async def extract_references(self, text):
+        """
+        Extract references from the text using multiple strategies
+        Returns a list of reference strings
+        """
+        print("Starting reference extraction...")
+
+        try:
+            references, references_text = await asyncio.to_thread(self._extract_references_locally, text)
+            if references:
+                return references
+
+            if references_text:
+                ai_refs = await self._ai_extract_references(references_text)
+                if ai_refs:
+                    print(f"Successfully extracted {len(ai_refs)} references using AI parsing")
+                    return ai_refs
+
+            return await asyncio.to_thread(self._fallback_references, text)
+
+        except Exception as e:
+            print(f"Error extracting references: {e}")
+            return [f"Error occurred while extracting references: {str(e)}"]
+
+    @timed("keywords")
+    async def extract_keywords(self, text):
+        """
+        Extract keywords from the document locally and/or using OpenAI, per keyword_mode
+        Returns a list of keyword dictionaries with keyword, score and explanation
+        """
+        if self.keyword_mode == "primary":
+            return await asyncio.to_thread(extract_keywords_local, text)
+        try:
+            candidates = None
+            if self.keyword_mode == "prefilter":
+                candidates = await asyncio.to_thread(extract_keywords_local, text, KEYWORD_CANDIDATES)
+            response = await self._create(self._keywords_request(text, candidates), call="keywords")
+            keywords = self._parse_keywords(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"Error extracting keywords: {e}")
+            keywords = []
+        return keywords or await asyncio.to_thread(extract_keywords_local, text)
+
+    async def compile_summary_stream(self, chunk_summaries, detailed=False, include_citations=False, references=None):
+        """Like compile_summary, but yields the final summary piece by piece as the model produces it"""
+        if len(chunk_summaries) == 1:
+            yield chunk_summaries[0]
+            return
+
+        with stage_timer("compile"):
+            chunk_summaries = await self.reduce_summaries(chunk_summaries, detailed)
+
+            try:
+                request = self._compile_request(chunk_summaries, detailed, include_citations, references)
+                estimate = estimate_tokens(request)
+                async with self._semaphore:
+                    grant = await llm_scheduler.acquire_async(request["model"], estimate, COMPILE)
+                    started = time.perf_counter()
+                    usage = None
+                    stream = await self.async_client.chat.completions.create(
+                        stream=True, stream_options={"include_usage": True}, **request
+                    )
+                    async for part in stream:
+                        # The last chunk carries the usage and no choices
+                        usage = getattr(part, "usage", None) or usage
+                        delta = part.choices[0].delta.content if part.choices else None
+                        if delta:
+                            yield delta
+                    self._record_usage(request["model"], "compile", estimate, usage, time.perf_counter() - started,
+                                       grant=grant)
+            except Exception as e:
+                record_error("llm_compile")
+                raise Exception(f"Error calling OpenAI API for final summary: {e}")
+
+    def add_summary_stages(self, pipeline, chunk_method="sentence", detailed=False, include_citations=False, emit=None):
+        """
+        Add the summarization stages to a services.pipeline.Pipeline and return it.
+
+        Inputs: "pdf_path" and "document" (a ParsedDocument, or None to extract
+        the text here). Stages: "text" -> "tokens" -> "summary_input" (the
+        prefiltered text and tokens) -> "chunks" -> "chunk_summaries" -> "summary",
+        with "references" found from the full "text" alongside the chunk summaries.
+        emit gets the same progress events as summarize_pdf.
+        """
+        def read_text(pdf_path, document):
+            if document is not None:
+                return document.text
+            print(f"Extracting text from {pdf_path}...")
+            return self.extract_text_from_pdf(pdf_path)
+
+        def count_tokens(text):
+            tokens = self.encoding.encode(text)
+            print(f"Extracted {len(tokens):,} tokens from PDF")
+            return tokens
+
+        async def split(summary_input, tokens):
+            summary_text, summary_tokens = summary_input
+            chunks = await asyncio.to_thread(self.split_into_chunks, summary_text, chunk_method, summary_tokens)
+            if emit:
+                await emit("extracted", {"tokens": len(tokens), "chunks": len(chunks)})
+            return chunks
+
+        async def find_references(text):
+            # Only the compile step needs references, so they are found while the chunks are summarized
+            print("Extracting references...")
+            references = await self.extract_references(text)
+            print(f"Found {len(references)} references")
+            if emit:
+                await emit("references", {"references": references, "referenceCount": len(references)})
+            return references
+
+        async def summarize_chunks(chunks):
+            print(f"Summarizing {len(chunks)} chunks concurrently...")
+
+            async def summarize(i, chunk):
+                summary = await self.summarize_chunk(chunk, i == 0, i == len(chunks) - 1, detailed)
+                if emit:
+                    await emit("chunk", {"index": i, "total": len(chunks), "summary": summary})
+                return summary
+
+            return list(await asyncio.gather(*[summarize(i, chunk) for i, chunk in enumerate(chunks)]))
+
+        async def compile_final(chunk_summaries, references):
+            print("Compiling final summary...")
+            if not emit:
+                return await self.compile_summary(chunk_summaries, detailed, include_citations, references)
+            parts = []
+            async for delta in self.compile_summary_stream(chunk_summaries, detailed, include_citations, references):
+                parts.append(delta)
+                await emit("summary_delta", {"text": delta})
+            return "".join(parts)
+
+        pipeline.add("text", read_text, inputs=("pdf_path", "document"), executor=THREAD)
+        pipeline.add("tokens", count_tokens, inputs=("text",), executor=THREAD)
+        pipeline.add("summary_input", self.prefilter_text, inputs=("text", "tokens"), executor=THREAD)
+        pipeline.add("chunks", split, inputs=("summary_input", "tokens"))
+        pipeline.add("references", find_references, inputs=("text",))
+        pipeline.add("chunk_summaries", summarize_chunks, inputs=("chunks",))
+        pipeline.add("summary", compile_final, inputs=("chunk_summaries", "references"))
+        return pipeline
+
+    async def summarize_pdf(self, pdf_path, output_path=None, chunk_method="sentence", detailed=False, include_citations=False, document=None, emit=None,
+                            context=None):
+        """
+        Summarize a PDF. If emit is given it is awaited as emit(event, data) with
+        progress events: "extracted", one "chunk" per finished chunk summary,
+        "references", and "summary_delta" pieces of the streamed final summary.
+        Per-document state goes in context (see PdfSummarizer.summarize_pdf).
+        """
+        context = context or SummaryContext()
+        pipeline = self.add_summary_stages(Pipeline(), chunk_method, detailed, include_citations, emit)
+        with context_scope(context):
+            results = await pipeline.run({"pdf_path": pdf_path, "document": document}, targets=("summary", "references"))
+        final_summary = results["summary"]
+        references = context.references = results["references"]
+
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(final_summary)
+            print(f"Summary saved to {output_path}")
+
+        return {
+            'summary': final_summary,
+            'references': references,
+            'reference_count': len(references)
+        }
+
 def main():
     parser = argparse.ArgumentParser(description='Summarize a research paper PDF using OpenAI')
-    parser.add_argument('pdf_path', help='Path to the PDF file')
-    parser.add_argument('--output', '-o', help='Path to save the summary (optional)')
-    parser.add_argument('--model', '-m', default='gpt-4o', help='OpenAI model to use (default: gpt-4o)')
+    parser.add_argument('pdf_path', nargs='?', help='Path to the PDF file')
+    parser.add_argument('--output', '-o', help='Path to save the summary (optional; the JSONL results file with --batch)')
+    parser.add_argument('--model', '-m', default=SUMMARIZER_MODEL, help=f'OpenAI model to use (default: {SUMMARIZER_MODEL})')
     parser.add_argument('--chunk-method', '-c', choices=['sentence', 'token'], default='sentence', 
                         help='Method for chunking text (default: sentence)')
     parser.add_argument('--sequential', '-s', action='store_true', 
@@ -667,14 +1012,75 @@ def main():
                         help='Maximum number of parallel workers (default: 5)')
     parser.add_argument('--detailed', '-d', action='store_true',
                         help='Include background information in summary')
+    parser.add_argument('--pdf-backend', choices=PDF_BACKENDS, default=None,
+                        help='PDF text extractor (default: $PDF_TEXT_BACKEND or pymupdf)')
+    parser.add_argument('--batch', '-b', action='append', metavar='SOURCE',
+                        help='Summarize many PDFs: a directory, glob or list file (repeatable); results go to --output as JSONL')
+    parser.add_argument('--manifest', help='Batch progress manifest used to resume (default: <output>.manifest.jsonl)')
+    parser.add_argument('--processes', '-p', type=int, default=None,
+                        help='Batch worker processes (default: CPU count)')
+    parser.add_argument('--llm-concurrency', type=int, default=16,
+                        help='Maximum LLM requests in flight across all batch workers (default: 16)')
+    parser.add_argument('--citations', action='store_true',
+                        help='Include in-text citations in batch summaries')
+    parser.add_argument('--prefilter', type=float, default=None, metavar='RATIO',
+                        help='Keep only the most central sentences (TF-IDF + TextRank), up to this fraction of the tokens, before chunking (default: $PREFILTER_KEEP_RATIO or 1)')
+    parser.add_argument('--prefilter-tokens', type=int, default=None,
+                        help='Cap the prefiltered text at this many tokens (default: $PREFILTER_MAX_TOKENS or no cap)')
+    parser.add_argument('--mode', choices=['full', 'fast'], default='full',
+                        help='full: LLM summary; fast: local extractive summary with no API calls (default: full)')
     args = parser.parse_args()
+
+    if args.mode == 'fast':
+        if args.batch:
+            parser.error('--mode fast summarizes a single pdf_path; it does not support --batch')
+        if not args.pdf_path:
+            parser.error('pdf_path is required')
+        from services.fast_summary import fast_summary
+        page_texts = extract_page_texts(args.pdf_path, backend=args.pdf_backend)
+        result = fast_summary("\n".join(text for text in page_texts if text), detailed=args.detailed)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(result['summary'])
+            print(f"Summary saved to {args.output}")
+        else:
+            print("\nSummary:\n")
+            print(result['summary'])
+        print(f"\n{result['reference_count']} references found")
+        return
     
     #apikey
     api_key = args.api_key or os.environ.get("OPENAI_API_KEY")
+
+    if args.batch:
+        if not args.output:
+            parser.error('--batch requires --output for the JSONL results')
+        from services.batch import run_batch
+        stats = run_batch(
+            args.batch,
+            args.output,
+            manifest_path=args.manifest,
+            processes=args.processes,
+            llm_concurrency=args.llm_concurrency,
+            api_key=api_key,
+            model=args.model,
+            chunk_method=args.chunk_method,
+            detailed=args.detailed,
+            include_citations=args.citations,
+            max_workers=args.max_workers,
+            pdf_backend=args.pdf_backend,
+            prefilter_ratio=args.prefilter,
+            prefilter_tokens=args.prefilter_tokens
+        )
+        print(json.dumps(stats, indent=2))
+        return
+    if not args.pdf_path:
+        parser.error('pdf_path is required unless --batch is given')
     
     try:
         # Create summarizer and process PDF
-        summarizer = PdfSummarizer(api_key=api_key, model=args.model, max_workers=args.max_workers)
+        summarizer = PdfSummarizer(api_key=api_key, model=args.model, max_workers=args.max_workers, pdf_backend=args.pdf_backend,
+                                   prefilter_ratio=args.prefilter, prefilter_tokens=args.prefilter_tokens)
         summary = summarizer.summarize_pdf(
             args.pdf_path, 
             args.output,